@@ -0,0 +1,231 @@
+import tracemalloc
+import weakref
+
+from parser import walk
+
+
+class FunctionAllocations:
+    """
+    The allocations made by one language-level function, excluding those of its callees.
+
+    Attributes:
+        calls (int): The number of calls of the function.
+        environments (int): The number of environments created for its calls.
+        closures (int): The number of closures (lambdas and functions) its body created.
+        bytes (int): The net number of bytes its calls allocated and did not free, as traced
+                     by tracemalloc.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.environments = 0
+        self.closures = 0
+        self.bytes = 0
+
+
+class AllocationTracker:
+    """
+    Counts what an interpreter run allocates and attributes it to language-level functions.
+
+    Installing the tracker on an interpreter makes it create counting environments (through
+    Interpreter.environment_class) and overrides, on that instance only, the methods that
+    create closures, so that every closure is wrapped to count its calls. Memory is measured
+    with tracemalloc: the traced size is read as each call starts and ends, and the
+    difference, minus that of the calls it made, is charged to the called function.
+
+    Tokens and AST nodes are counted as they flow from the lexer to the parser and from the
+    parser to the interpreter, by wrapping those streams with count_tokens and count_nodes.
+
+    Attributes:
+        functions (dict): The FunctionAllocations of each function, by name ('lambda:<line>'
+                          for lambdas and '<toplevel>' for code outside any function).
+        tokens (int): The number of tokens produced by the lexer.
+        nodes (int): The number of AST nodes produced by the parser.
+        environments (int): The number of environments created.
+        closures (int): The number of closures created.
+        live_environments (int): The number of environments currently alive.
+        live_closures (int): The number of closures currently alive.
+        peak_environments (int): The largest number of environments alive at once.
+        peak_closures (int): The largest number of closures alive at once.
+        peak_bytes (int): The largest amount of memory traced at once.
+    """
+
+    def __init__(self):
+        """
+        Initializes the AllocationTracker with all counts at zero.
+        """
+        self.functions = {'<toplevel>': FunctionAllocations()}
+        self.tokens = 0
+        self.nodes = 0
+        self.environments = 0
+        self.closures = 0
+        self.live_environments = 0
+        self.live_closures = 0
+        self.peak_environments = 0
+        self.peak_closures = 0
+        self.peak_bytes = 0
+        self._stack = [[self.functions['<toplevel>'], 0, 0]]
+        self._interpreter = None
+        self._started_tracemalloc = False
+
+    def install(self, interpreter):
+        """
+        Starts counting the allocations of an interpreter, starting tracemalloc if needed.
+
+        Parameters:
+            interpreter (Interpreter): The interpreter to instrument.
+        """
+        tracker = self
+        stack = self._stack
+
+        class CountingEnvironment(interpreter.environment_class):
+            def __init__(self, parent=None):
+                super().__init__(parent)
+                tracker.environments += 1
+                tracker.live_environments += 1
+                if tracker.live_environments > tracker.peak_environments:
+                    tracker.peak_environments = tracker.live_environments
+                stack[-1][0].environments += 1
+                self.counted = True
+
+            def __del__(self):
+                # An environment whose construction failed (e.g. over a Meter's budget) was not counted
+                if self.__dict__.get('counted'):
+                    tracker.live_environments -= 1
+
+        def closure_freed():
+            tracker.live_closures -= 1
+
+        def closure_created(name, func):
+            tracker.closures += 1
+            tracker.live_closures += 1
+            if tracker.live_closures > tracker.peak_closures:
+                tracker.peak_closures = tracker.live_closures
+            stack[-1][0].closures += 1
+            allocations = tracker.functions.get(name)
+            if allocations is None:
+                allocations = tracker.functions[name] = FunctionAllocations()
+
+            # Calls are counted by wrapping the closure rather than eval_function_call, so that
+            # the arguments of a call are charged to the caller
+            def counted(*args):
+                allocations.calls += 1
+                frame = [allocations, tracemalloc.get_traced_memory()[0], 0]
+                stack.append(frame)
+                try:
+                    return func(*args)
+                finally:
+                    stack.pop()
+                    current, peak = tracemalloc.get_traced_memory()
+                    if peak > tracker.peak_bytes:
+                        tracker.peak_bytes = peak
+                    total = current - frame[1]
+                    allocations.bytes += total - frame[2]
+                    stack[-1][2] += total
+
+            weakref.finalize(counted, closure_freed)
+            return counted
+
+        eval_lambda = interpreter.eval_lambda
+        eval_function_def = interpreter.eval_function_def
+
+        def counted_lambda(node, env):
+            return closure_created(f"lambda:{node.line}", eval_lambda(node, env))
+
+        def counted_function_def(node, env):
+            result = eval_function_def(node, env)
+            env.define(node.name, closure_created(node.name, env.lookup(node.name)))
+            return result
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._stack[0][1] = tracemalloc.get_traced_memory()[0]
+        interpreter.environment_class = CountingEnvironment
+        interpreter.eval_lambda = counted_lambda
+        interpreter.eval_function_def = counted_function_def
+        self._interpreter = interpreter
+
+    def uninstall(self):
+        """
+        Stops counting, restoring the interpreter's methods and stopping tracemalloc if it
+        was started by install.
+        """
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak_bytes = max(self.peak_bytes, peak)
+            toplevel = self._stack[0]
+            toplevel[0].bytes += current - toplevel[1] - toplevel[2]
+            toplevel[1], toplevel[2] = current, 0
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self._interpreter is not None:
+            for name in ('environment_class', 'eval_lambda', 'eval_function_def'):
+                self._interpreter.__dict__.pop(name, None)
+            self._interpreter = None
+
+    def count_tokens(self, tokens):
+        """
+        Counts the tokens flowing from the lexer to the parser.
+
+        Parameters:
+            tokens (iterable): The tokens.
+
+        Yields:
+            Token: Each token, unchanged.
+        """
+        for token in tokens:
+            self.tokens += 1
+            yield token
+
+    def count_nodes(self, statements):
+        """
+        Counts the AST nodes of the statements flowing from the parser to the interpreter.
+
+        Parameters:
+            statements (iterable): The top-level statements.
+
+        Yields:
+            ASTNode: Each statement, unchanged.
+        """
+        for node in statements:
+            self.nodes += sum(1 for _ in walk(node))
+            yield node
+
+    def report(self):
+        """
+        Returns the counts as a dictionary, e.g. for export as JSON.
+
+        Returns:
+            dict: The totals, the peaks and the allocations of each function.
+        """
+        return {
+            'tokens': self.tokens,
+            'nodes': self.nodes,
+            'environments': self.environments,
+            'closures': self.closures,
+            'peak_environments': self.peak_environments,
+            'peak_closures': self.peak_closures,
+            'peak_bytes': self.peak_bytes,
+            'functions': {name: vars(allocations) for name, allocations in self.functions.items()},
+        }
+
+    def format_report(self):
+        """
+        Formats the counts as a table, functions with the most memory retained first.
+
+        Returns:
+            str: The report.
+        """
+        lines = [
+            f"Tokens: {self.tokens}  AST nodes: {self.nodes}",
+            f"Environments: {self.environments} (peak live {self.peak_environments})  "
+            f"Closures: {self.closures} (peak live {self.peak_closures})  "
+            f"Peak traced memory: {self.peak_bytes / 1024:.1f} KiB",
+            f"{'Function':<24}{'Calls':>10}{'Envs':>10}{'Closures':>10}{'Net KiB':>12}",
+        ]
+        for name, allocations in sorted(self.functions.items(), key=lambda item: -item[1].bytes):
+            lines.append(f"{name:<24}{allocations.calls:>10}{allocations.environments:>10}"
+                         f"{allocations.closures:>10}{allocations.bytes / 1024:>12.1f}")
+        return '\n'.join(lines)
@@ -0,0 +1,235 @@
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from parser import Identifier, walk
+
+
+# Kinds of result stored in BatchResult.kinds
+INT = 0
+BOOL = 1
+OBJECT = 2  # Integers outside the int64 range
+ERROR = 3
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+class BatchResult:
+    """
+    The results of one chunk of calls made by map_call, stored in compact arrays.
+
+    Integer and boolean results are packed into an int64 array alongside a byte array recording
+    the kind of each result. Only the rare results that do not fit (big integers and errors)
+    are kept as objects.
+
+    Attributes:
+        start (int): The index, in the input, of the first call in the chunk.
+        kinds (array): The kind of each result (INT, BOOL, OBJECT or ERROR).
+        values (array): The value of each INT or BOOL result (0 for the other kinds).
+        extras (dict): The value of each OBJECT result and the InterpreterError of each ERROR
+                       result, by position in the chunk.
+    """
+
+    def __init__(self, start):
+        """
+        Initializes an empty BatchResult.
+
+        Parameters:
+            start (int): The index, in the input, of the first call in the chunk.
+        """
+        self.start = start
+        self.kinds = array('B')
+        self.values = array('q')
+        self.extras = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, value):
+        """
+        Appends the result of a successful call.
+
+        Parameters:
+            value: The value returned by the call.
+
+        Raises:
+            InterpreterError: If the value cannot be sent back from a worker (e.g. a function).
+        """
+        if isinstance(value, bool):
+            self.kinds.append(BOOL)
+            self.values.append(value)
+        elif isinstance(value, int) and INT64_MIN <= value <= INT64_MAX:
+            self.kinds.append(INT)
+            self.values.append(value)
+        elif isinstance(value, int):
+            self.extras[len(self.kinds)] = value
+            self.kinds.append(OBJECT)
+            self.values.append(0)
+        else:
+            raise InterpreterError(f"Batch calls must return integers or booleans, not {type(value).__name__}")
+
+    def add_error(self, error):
+        """
+        Appends the error raised by a failed call.
+
+        Parameters:
+            error (InterpreterError): The error raised by the call.
+        """
+        self.extras[len(self.kinds)] = error
+        self.kinds.append(ERROR)
+        self.values.append(0)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        kind = self.kinds[index]
+        if kind == INT:
+            return self.values[index]
+        elif kind == BOOL:
+            return bool(self.values[index])
+        return self.extras[index]
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def errors(self):
+        """
+        Returns the errors raised by failed calls in the chunk.
+
+        Returns:
+            list: (input index, InterpreterError) pairs.
+        """
+        return [(self.start + index, error) for index, error in sorted(self.extras.items())
+                if self.kinds[index] == ERROR]
+
+
+_worker_interpreter = None
+
+
+def definition_order(definitions):
+    """
+    Orders function definitions so that each one can be evaluated in turn: a Defun is rejected
+    if a name it uses as a value (e.g. a function passed as an argument) is not defined yet,
+    so every function comes after the functions it names that way. Calls are not checked when
+    a function is defined, so functions that only call each other can come in any order.
+
+    Parameters:
+        definitions (list): The FunctionDef nodes, e.g. from Interpreter.function_dependencies.
+
+    Returns:
+        list: The same nodes, each after the definitions of the functions it names as values.
+    """
+    by_name = {node.name: node for node in definitions}
+    ordered = {}
+
+    def visit(node):
+        if node.name in ordered:
+            return
+        ordered[node.name] = None  # Reserved, so that a cycle stops here
+        for child in walk(node.body):
+            if isinstance(child, Identifier) and child.name in by_name:
+                visit(by_name[child.name])
+        del ordered[node.name]
+        ordered[node.name] = node
+
+    for node in definitions:
+        visit(node)
+    return list(ordered.values())
+
+
+def init_worker(definitions):
+    """
+    Prepares a worker process by evaluating the shipped function definitions once.
+
+    Parameters:
+        definitions (list): The FunctionDef nodes the called function depends on, in an order
+                            in which they can be evaluated (see definition_order).
+    """
+    global _worker_interpreter
+    _worker_interpreter = Interpreter()
+    for node in definitions:
+        _worker_interpreter.evaluate(node)
+
+
+def run_chunk(name, start, arguments):
+    """
+    Calls a function on a chunk of argument tuples in a worker process.
+
+    Parameters:
+        name (str): The name of the function to call.
+        start (int): The index, in the input, of the first call in the chunk.
+        arguments (list): The argument tuples.
+
+    Returns:
+        BatchResult: The results of the calls.
+    """
+    func = _worker_interpreter.global_env.lookup(name)
+    result = BatchResult(start)
+    for args in arguments:
+        try:
+            result.add(func(*args))
+        except InterpreterError as e:
+            result.add_error(e)
+    return result
+
+
+def map_call(interpreter, name, arguments, workers=None, chunk_size=1024, ordered=True):
+    """
+    Calls a defined function on many argument tuples across a pool of processes.
+
+    The definitions of the function and of every function it refers to are sent to each
+    worker once, when the worker starts. Arguments are read from the iterable lazily and sent
+    in chunks, with only a few chunks in flight per worker, so the input can be an unbounded
+    stream. A call that raises an InterpreterError does not stop the batch: its error is
+    recorded in place of its result.
+
+    Parameters:
+        interpreter (Interpreter): The interpreter in which the function is defined.
+        name (str): The name of the function to call.
+        arguments (iterable): The argument tuples, one per call.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): The number of calls sent to a worker at a time.
+        ordered (bool, optional): Whether to yield chunks in input order rather than as they complete.
+
+    Yields:
+        BatchResult: The results of each chunk of calls.
+
+    Raises:
+        NameError: If the function is not defined.
+    """
+    definitions = definition_order(interpreter.function_dependencies(name))
+    arguments = iter(arguments)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(definitions,)) as executor:
+        max_pending = 2 * workers
+        pending = deque()
+        start = 0
+
+        def submit():
+            nonlocal start
+            chunk = list(islice(arguments, chunk_size))
+            if not chunk:
+                return False
+            pending.append(executor.submit(run_chunk, name, start, chunk))
+            start += len(chunk)
+            return True
+
+        while len(pending) < max_pending and submit():
+            pass
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            result = future.result()
+            submit()
+            yield result
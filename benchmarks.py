@@ -0,0 +1,637 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+import vectorize
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from parallel_frontend import parse_parallel, parse_sequential
+from profiler import Profiler
+from metering import Meter
+from session import Prelude
+from cluster import Coordinator, start_local_workers
+from pvector import PersistentVector
+from rope import Rope
+
+
+def generate_program(statements):
+    """
+    Generates a synthetic .lambda program of roughly the given number of top-level statements.
+
+    The program repeats a block of function definitions (spanning several lines, like the
+    generated files we run in production) followed by calls to them.
+
+    Parameters:
+        statements (int): The approximate number of top-level statements to generate.
+
+    Returns:
+        str: The source code of the program.
+    """
+    blocks = []
+    for i in range(max(1, statements // 4)):
+        blocks.append(
+            f"Defun {{'name': 'f{i}', 'arguments': (a, b)}}\n"
+            f"    (b == 0) or (\n"
+            f"        (a > b) and f{i}(b, a % b)\n"
+            f"    ) or (a * 2 + b - {i} >= 3 and not (a != b))\n"
+            f"Defun {{'name': 'g{i}', 'arguments': (x)}} f{i}(x + 1, {i} * 3 % 7 + 1)\n"
+            f"g{i}({i})\n"
+            f"(Lambda (y) y * {i} - (y / 2))({i % 13})\n"
+        )
+    return "".join(blocks)
+
+
+def measure(func, *args):
+    """
+    Measures the wall time of a function and the peak memory it allocates.
+
+    The function is run twice, since tracing allocations slows it down: once untraced for
+    the timing and once under tracemalloc for the memory peak.
+
+    Parameters:
+        func (callable): The function to run.
+        *args: The arguments to pass to the function.
+
+    Returns:
+        tuple: The function's result, the elapsed time in seconds and the peak traced memory in bytes.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_token_stream(statements=40000):
+    """
+    Compares tokenizing into a list of Token tuples against tokenizing into a compact TokenStream.
+
+    Parameters:
+        statements (int, optional): The size of the generated program, in top-level statements.
+    """
+    code = generate_program(statements)
+    print(f"Tokenizing {len(code) / 1e6:.1f} MB of source")
+    for name, tokenize in (('list of Token', Lexer().tokenize), ('TokenStream', Lexer().tokenize_compact)):
+        tokens, elapsed, peak = measure(tokenize, code)
+        print(f"  {name:<14} {len(tokens):>9} tokens  {elapsed:7.3f} s  peak {peak / 1e6:8.1f} MB")
+
+
+def bench_parallel_frontend(statements=160000):
+    """
+    Measures lexing plus parsing throughput of the parallel front-end for increasing worker counts.
+
+    Parameters:
+        statements (int, optional): The size of the generated program, in top-level statements.
+    """
+    code = generate_program(statements)
+    print(f"Lexing and parsing {len(code) / 1e6:.1f} MB of source ({os.cpu_count()} CPUs)")
+    start = time.perf_counter()
+    parse_sequential(code)
+    baseline = time.perf_counter() - start
+    print(f"  sequential  {baseline:7.3f} s")
+    for workers in (2, 4, 8):
+        start = time.perf_counter()
+        parse_parallel(code, workers, min_chunk_size=1)
+        elapsed = time.perf_counter() - start
+        print(f"  {workers} workers   {elapsed:7.3f} s  speedup {baseline / elapsed:4.2f}x")
+
+
+def generate_expressions(statements):
+    """
+    Generates a synthetic program of operator-heavy top-level expressions.
+
+    Parameters:
+        statements (int): The number of expressions to generate.
+
+    Returns:
+        str: The source code of the program.
+    """
+    return "".join(f"a{i} + {i} * (b - c / 2) % 7 < f(x, y + 1) and not (d >= {i} or e != g * h - i)\n"
+                   for i in range(statements))
+
+
+def bench_parser(statements=40000):
+    """
+    Measures parser throughput on large generated programs.
+
+    Parameters:
+        statements (int, optional): The size of each generated program, in top-level statements.
+    """
+    for name, code in (('definitions', generate_program(statements)), ('expressions', generate_expressions(statements))):
+        tokens = Lexer().tokenize(code)
+        start = time.perf_counter()
+        Parser(tokens).parse()
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<12} {len(tokens):>9} tokens  {elapsed:7.3f} s  {len(tokens) / elapsed / 1e6:5.2f} M tokens/s")
+
+
+def bench_vectorized(rows=1000000):
+    """
+    Compares vectorized evaluation of a lambda over NumPy arrays against calling it row by row.
+
+    Parameters:
+        rows (int, optional): The number of rows of arguments.
+    """
+    if vectorize.np is None:
+        print("  skipped: NumPy is not installed")
+        return
+    np = vectorize.np
+    function = Parser(Lexer().tokenize("Lambda (x, y) (y == 0) or (x / y + x % 3 * 2 > 4)")).parse()[0]
+    x = np.arange(rows)
+    y = np.arange(rows) % 17
+    start = time.perf_counter()
+    vectorize.evaluate_vectorized(function, [x, y])
+    vectorized = time.perf_counter() - start
+    func = Interpreter().evaluate(function)
+    start = time.perf_counter()
+    for a, b in zip(x.tolist(), y.tolist()):
+        func(a, b)
+    scalar = time.perf_counter() - start
+    print(f"  {rows} rows: scalar {scalar:7.3f} s  vectorized {vectorized:7.3f} s  speedup {scalar / vectorized:6.1f}x")
+
+
+def bench_profiler(n=24, repeat=3):
+    """
+    Measures the overhead of the sampling profiler on a tight recursive function.
+
+    Parameters:
+        n (int, optional): The argument of the recursive function.
+        repeat (int, optional): The number of runs with and without the profiler; the best is kept.
+    """
+    code = (f"Defun {{'name': 'fib', 'arguments': (n)}} (n < 3 and 1) or (fib(n - 1) + fib(n - 2))\n"
+            f"fib({n})\n")
+    statements = Parser(Lexer().tokenize(code)).parse()
+
+    def run(profiler):
+        interpreter = Interpreter()
+        if profiler is not None:
+            profiler.start(interpreter)
+        start = time.perf_counter()
+        for node in statements:
+            interpreter.evaluate(node)
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.stop()
+        return elapsed
+
+    plain = min(run(None) for _ in range(repeat))
+    profiler = Profiler()
+    profiled = min(run(profiler) for _ in range(repeat))
+    print(f"  fib({n}): plain {plain:7.3f} s  profiled {profiled:7.3f} s  overhead {profiled / plain - 1:+6.1%}"
+          f"  ({sum(profiler.samples.values())} samples)")
+
+
+def bench_metering(n=22, repeat=5):
+    """
+    Measures the overhead of each metering budget on a tight recursive function.
+
+    Parameters:
+        n (int, optional): The argument of the recursive function.
+        repeat (int, optional): The number of runs per configuration; the best is kept.
+    """
+    code = (f"Defun {{'name': 'fib', 'arguments': (n)}} (n < 3 and 1) or (fib(n - 1) + fib(n - 2))\n"
+            f"fib({n})\n")
+    statements = Parser(Lexer().tokenize(code)).parse()
+
+    def run(budgets):
+        interpreter = Interpreter()
+        if budgets is not None:
+            Meter(**budgets).install(interpreter)
+        start = time.perf_counter()
+        for node in statements:
+            interpreter.evaluate(node)
+        return time.perf_counter() - start
+
+    configurations = (('unmetered', None), ('depth', {'max_depth': 1000}),
+                      ('environments', {'max_environments': 10 ** 9}), ('steps', {'max_steps': 10 ** 12}),
+                      ('all', {'max_depth': 1000, 'max_environments': 10 ** 9, 'max_steps': 10 ** 12}))
+    # Warm up once, then interleave the runs so that drifts in the machine's speed hit every
+    # configuration alike, keeping the best run of each
+    for _, budgets in configurations:
+        run(budgets)
+    best = {name: float('inf') for name, _ in configurations}
+    for _ in range(repeat):
+        for name, budgets in configurations:
+            best[name] = min(best[name], run(budgets))
+    plain = best['unmetered']
+    print(f"  fib({n}) unmetered       {plain:7.3f} s")
+    for name, _ in configurations[1:]:
+        print(f"  {name:<22} {best[name]:7.3f} s  overhead {best[name] / plain - 1:+6.1%}")
+
+
+def bench_startup(runs=20):
+    """
+    Measures the cold-start time of the command-line interface, against that of a bare
+    Python interpreter.
+
+    Parameters:
+        runs (int, optional): The number of launches of each command; the fastest is kept.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    commands = (
+        ('python -c pass', [sys.executable, '-c', 'pass']),
+        ('main.py eval 1', [sys.executable, os.path.join(directory, 'main.py'), 'eval', '1']),
+        ('main.py run', [sys.executable, os.path.join(directory, 'main.py'), 'run',
+                         os.path.join(directory, 'test.lambda')]),
+    )
+    for name, command in commands:
+        best = float('inf')
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+            best = min(best, time.perf_counter() - start)
+        print(f"  {name:<16} {best * 1000:7.1f} ms")
+
+
+def bench_sessions(calls=2000):
+    """
+    Measures evaluation throughput of concurrent sessions sharing one prelude, for an
+    increasing number of threads. Threads only run in parallel on free-threaded CPython.
+
+    Parameters:
+        calls (int, optional): The number of statements each thread evaluates.
+    """
+    prelude = Prelude(
+        "Defun {'name': 'gcd', 'arguments': (a, b)} (b == 0 and a) or gcd(b, a % b)\n"
+        "Defun {'name': 'lcm', 'arguments': (a, b)} a * b / gcd(a, b)\n"
+    )
+    print(f"  GIL enabled: {getattr(sys, '_is_gil_enabled', lambda: True)()}")
+    for threads in (1, 2, 4, 8):
+        def work(index):
+            session = prelude.session()
+            session.run(f"Defun {{'name': 'f', 'arguments': (x)}} lcm(x + {index}, 36) % 97")
+            for i in range(calls):
+                session.run(f"f({i})")
+
+        workers = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        print(f"  {threads} threads  {threads * calls / elapsed:9.0f} statements/s")
+
+
+def bench_pvector(sizes=(10000, 20000, 40000, 80000)):
+    """
+    Measures building, updating and indexing lists of increasing size one element at a time,
+    as a program does through the append, update and get builtins, against a copying
+    immutable representation (a tuple copied on every change). Constant per-element times
+    across sizes show that persistent lists do not degrade into O(n^2) copying.
+
+    Parameters:
+        sizes (tuple, optional): The numbers of elements.
+    """
+    def build_vector(n):
+        vector = PersistentVector()
+        for i in range(n):
+            vector = vector.append(i)
+        return vector
+
+    def build_tuple(n):
+        items = ()
+        for i in range(n):
+            items = items + (i,)
+        return items
+
+    for n in sizes:
+        vector, vector_time, vector_peak = measure(build_vector, n)
+        tuple_time = measure(build_tuple, n)[1] if n <= 40000 else None  # Quadratic, so skipped when large
+        start = time.perf_counter()
+        updated = vector
+        for i in range(0, n, 3):
+            updated = updated.update(i, -i)
+        update_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(n):
+            vector.get(i)
+        get_time = time.perf_counter() - start
+        copying = f"{tuple_time / n * 1e6:8.2f} us" if tuple_time is not None else "   (skipped)"
+        print(f"  {n:6} elements: append {vector_time / n * 1e6:6.2f} us/element (copying {copying})"
+              f"  update {update_time / len(range(0, n, 3)) * 1e6:6.2f} us  get {get_time / n * 1e6:6.2f} us"
+              f"  peak {vector_peak / 1024 / 1024:6.1f} MiB")
+
+
+def bench_ropes(depths=(12, 14, 16)):
+    """
+    Measures building multi-megabyte strings by recursive concatenation in the language, one
+    64-character piece at a time, and the same concatenations on ropes and on flat strings
+    copied on every concatenation (what a naive immutable string would do). Rope times grow
+    linearly with the number of pieces, copying times quadratically.
+
+    Parameters:
+        depths (tuple, optional): The recursion depths; 2 ** depth pieces are concatenated.
+    """
+    piece = 'abcdefghijklmnopqrstuvwxyz0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-_'
+
+    def build_rope(n):
+        text = Rope()
+        for _ in range(n):
+            text = text + Rope(piece)
+        return text
+
+    def build_flat(n):
+        text = ''
+        for _ in range(n):
+            text = ''.join((text, piece))  # join always copies
+        return text
+
+    for depth in depths:
+        pieces = 2 ** depth
+        code = (f"Defun {{'name': 'build', 'arguments': (s, n)}} (n == 0 and s + '{piece}') "
+                f"or build(build(s, n - 1), n - 1)\n"
+                f"build('', {depth})\n")
+        statements = Parser(Lexer().tokenize(code)).parse()
+        interpreter = Interpreter()
+        start = time.perf_counter()
+        result = [interpreter.evaluate(node) for node in statements][-1]
+        language_time = time.perf_counter() - start
+        _, rope_time, rope_peak = measure(build_rope, pieces)
+        flat_time = measure(build_flat, pieces)[1] if pieces <= 16384 else None  # Quadratic, so skipped when large
+        flat = f"{flat_time / pieces * 1e6:8.2f} us" if flat_time is not None else "   (skipped)"
+        print(f"  {len(result) / 1024 / 1024:5.1f} MiB ({pieces:6} pieces, depth {result.depth:2}): "
+              f"language {language_time:6.3f} s  rope {rope_time / pieces * 1e6:6.2f} us/piece "
+              f"(copying {flat})  peak {rope_peak / 1024 / 1024:6.1f} MiB")
+
+
+def bench_streams(counts=(10000, 40000, 160000)):
+    """
+    Measures a map/filter/reduce pipeline over an infinite lazy stream ended by take,
+    against the eager equivalent that materializes a list after every stage. The fused
+    stream keeps a constant memory peak whatever the count; the eager pipeline's grows
+    with it.
+
+    Parameters:
+        counts (tuple, optional): The numbers of values that pass the filter and are summed.
+    """
+    square = "Lambda (x) x * x"
+    odd = "Lambda (x) x % 2 == 1"
+    add = "Lambda (a, b) a + b"
+    for count in counts:
+        lazy = f"reduce({add}, take(filter({odd}, map({square}, range(0))), {count}), 0)\n"
+        eager = f"reduce({add}, list(filter({odd}, list(map({square}, list(range(0, {2 * count})))))), 0)\n"
+        timings = []
+        for code in (lazy, eager):
+            statements = Parser(Lexer().tokenize(code)).parse()
+            interpreter = Interpreter()
+            result, elapsed, peak = measure(lambda: [interpreter.evaluate(node) for node in statements])
+            timings.append((result[-1], elapsed, peak))
+        (lazy_result, lazy_time, lazy_peak), (eager_result, eager_time, eager_peak) = timings
+        assert lazy_result == eager_result
+        print(f"  {count:7} values: stream {lazy_time:6.3f} s, peak {lazy_peak / 1024:8.1f} KiB  "
+              f"eager {eager_time:6.3f} s, peak {eager_peak / 1024:8.1f} KiB")
+
+
+def bench_natives(calls=2000):
+    """
+    Measures calls of native numeric functions against the same functions written in the
+    language.
+
+    Parameters:
+        calls (int, optional): The number of calls of each function.
+    """
+    written = {
+        'abs': ("Defun {'name': 'my_abs', 'arguments': (x)} (x < 0 and 0 - x) or x", "{}(0 - {i})"),
+        'max': ("Defun {'name': 'my_max', 'arguments': (a, b)} (a > b and a) or b", "{}({i}, 977)"),
+        'pow': ("Defun {'name': 'my_pow', 'arguments': (b, e)} (e == 0 and 1) or b * my_pow(b, e - 1)",
+                "{}({i}, 20)"),
+        'isqrt': ("Defun {'name': 'newton', 'arguments': (n, x)} "
+                  "(x * x <= n and (x + 1) * (x + 1) > n and x) or newton(n, (x + n / x) / 2)\n"
+                  "Defun {'name': 'my_isqrt', 'arguments': (n)} newton(n, n)", "{}({i} * 7919 + 1)"),
+        'gcd': ("Defun {'name': 'my_gcd', 'arguments': (a, b)} (b == 0 and a) or my_gcd(b, a % b)",
+                "{}({i} * 7919 + 1, 104729)"),
+    }
+    for name, (definition, call) in written.items():
+        timings = []
+        for function in (name, 'my_' + name):
+            code = '\n'.join(call.format(function, i=i) for i in range(calls))
+            statements = Parser(Lexer().tokenize(definition + '\n' + code)).parse()
+            interpreter = Interpreter()
+            start = time.perf_counter()
+            results = [interpreter.evaluate(node) for node in statements]
+            timings.append((time.perf_counter() - start, results[-calls:]))
+        (native_time, native_results), (written_time, written_results) = timings
+        assert native_results == written_results
+        print(f"  {name:6} native {native_time / calls * 1e6:8.2f} us/call  "
+              f"in the language {written_time / calls * 1e6:8.2f} us/call  ({written_time / native_time:5.1f}x)")
+
+
+def bench_cluster(tasks=64, n=18):
+    """
+    Measures the throughput and task latency of a cluster of local worker processes on
+    loopback, for an increasing number of workers.
+
+    Parameters:
+        tasks (int, optional): The number of programs to run.
+        n (int, optional): The argument of the recursive function each program calls.
+    """
+    prelude = "Defun {'name': 'fib', 'arguments': (n)} (n < 3 and 1) or (fib(n - 1) + fib(n - 2))\n"
+    for workers in (1, 2, 4):
+        coordinator = Coordinator(prelude=prelude)
+        for i in range(tasks):
+            coordinator.submit(f"task{i}", f"fib({n}) + {i}")
+        coordinator.start()
+        processes = start_local_workers(coordinator.address, workers)
+        coordinator.wait()
+        coordinator.close()
+        for process in processes:
+            process.wait()
+        metrics = coordinator.metrics()
+        print(f"  {workers} workers  {metrics['throughput']:7.1f} tasks/s  "
+              f"latency p50 {metrics['latency']['p50'] * 1000:7.1f} ms  p95 {metrics['latency']['p95'] * 1000:7.1f} ms  "
+              f"stolen {metrics['stolen']}")
+
+
+def bench_jsonl(statements=100000):
+    """
+    Measures the output of a program of many small statements, printed as text one line at
+    a time and written as JSON records through the buffered writer, to a line-buffered file
+    (like a terminal) and to a block-buffered one (like a pipe or a file). The statements are
+    evaluated once up front, so that only the output is timed; the last column is the
+    throughput of a whole run in the JSONL mode.
+
+    Parameters:
+        statements (int, optional): The number of top-level statements of the program.
+    """
+    import tempfile
+    from main import execute_file, run_statements
+    from jsonl import JsonlWriter, write_records
+
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, 'statements.lambda')
+    with open(filename, 'w') as file:
+        file.write(''.join(f"{i} * 2 + 1\n" for i in range(statements)))
+    results = list(run_statements(filename))
+    for buffering, label in ((1, 'line-buffered'), (-1, 'block-buffered')):
+        with open(os.path.join(directory, 'output'), 'w', buffering=buffering) as output:
+            start = time.perf_counter()
+            for _, result in results:
+                print(result, file=output)
+            text_time = time.perf_counter() - start
+            start = time.perf_counter()
+            with JsonlWriter(output) as writer:
+                write_records(results, writer)
+            jsonl_time = time.perf_counter() - start
+            start = time.perf_counter()
+            execute_file(filename, use_cache=False, writer=JsonlWriter(output))
+            run_time = time.perf_counter() - start
+        print(f"  {label:14}  print {statements / text_time:9.0f} lines/s  "
+              f"jsonl {statements / jsonl_time:9.0f} records/s  run {statements / run_time:7.0f} statements/s")
+        os.remove(output.name)
+    os.remove(filename)
+    os.rmdir(directory)
+
+
+def bench_workspace(functions=100, expressions=2000, n=12):
+    """
+    Measures redefining one function of a workspace against running the whole program again
+    after the change, as a service without incremental re-evaluation would.
+
+    Parameters:
+        functions (int, optional): The number of functions, each used by as many expressions.
+        expressions (int, optional): The number of cached top-level expressions.
+        n (int, optional): The argument of the recursive function every function calls.
+    """
+    from workspace import Workspace
+
+    definitions = ["Defun {'name': 'fib', 'arguments': (n)} (n < 3 and 1) or (fib(n - 1) + fib(n - 2))"]
+    definitions += [f"Defun {{'name': 'f{i}', 'arguments': (x)}} fib({n}) + x * {i}" for i in range(functions)]
+    calls = [f"f{i % functions}({i})" for i in range(expressions)]
+    workspace = Workspace()
+    workspace.run('\n'.join(definitions + calls))
+    change = f"Defun {{'name': 'f7', 'arguments': (x)}} fib({n}) - x"
+
+    start = time.perf_counter()
+    update = workspace.run(change)
+    incremental_time = time.perf_counter() - start
+    program = '\n'.join(definitions + [change] + calls)
+    start = time.perf_counter()
+    interpreter = Interpreter()
+    results = [interpreter.evaluate(node) for node in Parser(Lexer().tokenize(program)).parse()]
+    full_time = time.perf_counter() - start
+    assert results[-expressions:] == [result for _, result in workspace.results()]
+    print(f"  incremental {incremental_time * 1000:8.1f} ms  ({len(update.recomputed)} recomputed, "
+          f"{len(update.reused)} reused)  full run {full_time * 1000:8.1f} ms  ({full_time / incremental_time:5.1f}x)")
+
+
+def bench_reparse(sizes=(5000, 20000, 80000), edits=10):
+    """
+    Measures incremental reparsing of one-line edits against lexing and parsing the whole
+    edited file, for files of increasing size.
+
+    Parameters:
+        sizes (tuple, optional): The approximate numbers of top-level statements of the files.
+        edits (int, optional): The number of edits of each kind, spread through the file.
+    """
+    import statistics
+    from incremental import Document
+
+    for statements in sizes:
+        document = Document(generate_program(statements))
+        start = time.perf_counter()
+        Parser(Lexer().tokenize(document.text)).parse()
+        full_time = time.perf_counter() - start
+        same_line, new_line = [], []
+        for i in range(edits):
+            offset = document.text.index(f"g{statements // 4 * i // edits}(")
+            start = time.perf_counter()
+            document.edit(offset + 1, 0, "1")  # Renames a call
+            same_line.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            document.edit(offset, 0, "7\n")  # Adds a statement on a line of its own
+            new_line.append(time.perf_counter() - start)
+        print(f"  {statements:6} statements  {len(document.text) / 1e6:5.1f} MB  full parse {full_time * 1000:8.1f} ms  "
+              f"edit {statistics.median(same_line) * 1000:6.2f} ms  "
+              f"edit adding a line {statistics.median(new_line) * 1000:6.2f} ms")
+
+
+def bench_transpiler(n=20, repeat=3):
+    """
+    Measures calls of functions of a program translated ahead of time into a Python module
+    against evaluating the same calls with Interpreter.evaluate.
+
+    Parameters:
+        n (int, optional): The argument of the recursive Fibonacci function.
+        repeat (int, optional): The number of runs of each call; the fastest is reported.
+    """
+    import types
+    from transpiler import transpile
+
+    code = ("Defun {'name': 'fib', 'arguments': (n)} (n < 3 and 1) or (fib(n - 1) + fib(n - 2))\n"
+            "Defun {'name': 'sum_residues', 'arguments': (n, m)}\n"
+            "    reduce(Lambda (total, x) total + x, map(Lambda (x) x * x % m, range(0, n)), 0)\n")
+    start = time.perf_counter()
+    module_code = transpile(code, 'benchmark.lambda')
+    module = types.ModuleType('benchmark')
+    exec(compile(module_code, 'benchmark.py', 'exec'), vars(module))
+    translate_time = time.perf_counter() - start
+    print(f"  translation {translate_time * 1000:6.1f} ms  ({len(module_code.splitlines())} lines)")
+
+    interpreter = Interpreter()
+    for node in Parser(Lexer().tokenize(code)).parse():
+        interpreter.evaluate(node)
+    for call, args in ((f"fib({n})", (n,)), ("sum_residues(20000, 7)", (20000, 7))):
+        node = Parser(Lexer().tokenize(call)).parse()[0]
+        interpreted = compiled = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            expected = interpreter.evaluate(node)
+            interpreted = min(interpreted, time.perf_counter() - start)
+            start = time.perf_counter()
+            result = getattr(module, node.name)(*args)
+            compiled = min(compiled, time.perf_counter() - start)
+        assert result == expected
+        print(f"  {call:22}  Interpreter.evaluate {interpreted * 1000:8.1f} ms  translated {compiled * 1000:7.2f} ms  "
+              f"({interpreted / compiled:5.1f}x)")
+
+
+BENCHMARKS = {
+    'tokens': bench_token_stream,
+    'parallel': bench_parallel_frontend,
+    'parser': bench_parser,
+    'vectorized': bench_vectorized,
+    'profiler': bench_profiler,
+    'metering': bench_metering,
+    'startup': bench_startup,
+    'sessions': bench_sessions,
+    'pvector': bench_pvector,
+    'ropes': bench_ropes,
+    'streams': bench_streams,
+    'natives': bench_natives,
+    'cluster': bench_cluster,
+    'jsonl': bench_jsonl,
+    'workspace': bench_workspace,
+    'reparse': bench_reparse,
+    'transpiler': bench_transpiler,
+}
+
+
+def run_benchmarks(names=None):
+    """
+    Runs the named benchmarks, or all of them.
+
+    Parameters:
+        names (list, optional): The names of the benchmarks to run, as listed in BENCHMARKS.
+
+    Raises:
+        ValueError: If a name is not that of a benchmark, before any benchmark is run.
+    """
+    unknown = [name for name in names or () if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)} (available: {', '.join(BENCHMARKS)})")
+    for name in names or BENCHMARKS:
+        print(f"\n--- {name} ---")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    run_benchmarks(sys.argv[1:])
@@ -0,0 +1,521 @@
+import json
+import math
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from session import Prelude
+from source import SourceBuffer
+
+HEADER = struct.Struct('>I')  # The length of the JSON document that follows
+MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+
+def send_message(sock, message):
+    """
+    Sends a message: a JSON document preceded by its length as a 4-byte big-endian integer.
+
+    Parameters:
+        sock (socket.socket): The connected socket.
+        message (dict): The message.
+    """
+    data = json.dumps(message).encode()
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def receive_message(reader):
+    """
+    Receives a message sent by send_message.
+
+    Parameters:
+        reader (BinaryIO): A buffered reader of the socket (socket.makefile('rb')).
+
+    Returns:
+        dict: The message.
+
+    Raises:
+        ConnectionError: If the connection is closed, or the message is too large.
+    """
+    header = reader.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ConnectionError("Connection closed")
+    size, = HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ConnectionError(f"Message of {size} bytes exceeds the limit")
+    data = reader.read(size)
+    if len(data) < size:
+        raise ConnectionError("Connection closed")
+    return json.loads(data)
+
+
+def run_source(prelude, code):
+    """
+    Runs a program in a fresh interpreter layered over a prelude, collecting its output.
+
+    Parameters:
+        prelude (Prelude): The definitions shared by all tasks.
+        code (str): The source of the program.
+
+    Returns:
+        list: Each line of output, as a [text, is_error] pair; evaluation stops at the first error.
+    """
+    interpreter = Interpreter(prelude=prelude)
+    source = SourceBuffer(code)
+    interpreter.set_source(source)
+    output = []
+    try:
+        parser = Parser(Lexer().tokenize(code))
+        parser.source = source
+        for node in parser.parse():
+            result = interpreter.evaluate(node)
+            if result is not None:
+                output.append([str(result), False])
+    except InterpreterError as e:
+        output.append([str(e), True])
+    except Exception as e:
+        output.append([f"An unexpected error occurred: {e}", True])
+    return output
+
+
+class Task:
+    """
+    A program submitted to the coordinator.
+
+    Attributes:
+        id (int): The task's number, in order of submission.
+        name (str): The name of the program, e.g. its file name.
+        source (str): The source of the program.
+        attempts (int): The number of times the task was given to a worker.
+        dispatched (float): When the task was last given to a worker (time.perf_counter()).
+    """
+
+    __slots__ = ('id', 'name', 'source', 'attempts', 'dispatched')
+
+    def __init__(self, id, name, source):
+        self.id = id
+        self.name = name
+        self.source = source
+        self.attempts = 0
+        self.dispatched = None
+
+
+class Coordinator:
+    """
+    Distributes programs over worker processes connected by TCP, possibly on other machines.
+
+    Workers connect to the coordinator, receive the prelude's source once, and then pull
+    tasks one at a time, sending each task's output back before asking for the next one.
+    Messages are JSON documents framed by send_message and receive_message.
+
+    Tasks are scheduled by work stealing: a worker whose own queue is empty takes its fair
+    share of the unassigned tasks into its queue, and once none are left it steals from the
+    back of the longest queue of another worker. Workers send heartbeats while they run a
+    task; a worker that disconnects, or sends nothing for heartbeat_timeout seconds while
+    running a task, is dropped and its tasks are put back to be run by the others. A task
+    that has lost max_attempts workers is failed with an error instead.
+
+    The coordinator measures the aggregate throughput and the latency of each task, from
+    its dispatch to a worker to the arrival of its output.
+
+    Attributes:
+        address (tuple): The host and port the coordinator listens on.
+        prelude (str): The source of the definitions shared by all tasks.
+        heartbeat_timeout (float): The silence, in seconds, after which a busy worker is dropped.
+        max_attempts (int): The number of lost workers after which a task is failed.
+        tasks (list): The submitted tasks, by id.
+        results (dict): The output of each completed task, by id.
+        workers (int): The number of workers that have connected.
+        requeued (int): The number of tasks put back after losing their worker.
+        stolen (int): The number of tasks stolen from another worker's queue.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, prelude='', heartbeat_timeout=5.0, max_attempts=3):
+        """
+        Initializes the Coordinator and starts listening.
+
+        Parameters:
+            host (str, optional): The interface to listen on; loopback by default.
+            port (int, optional): The port to listen on; 0 picks a free one.
+            prelude (str, optional): The source of the definitions shared by all tasks.
+            heartbeat_timeout (float, optional): The silence, in seconds, after which a busy
+                                                 worker is dropped.
+            max_attempts (int, optional): The number of lost workers after which a task is failed.
+
+        Raises:
+            InterpreterError: If the prelude fails to evaluate, which it would on every worker.
+        """
+        Prelude(prelude)
+        self.prelude = prelude
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.tasks = []
+        self.results = {}
+        self.workers = 0
+        self.requeued = 0
+        self.stolen = 0
+        self.latencies = []
+        self.execution_times = []
+        self._pending = deque()
+        self._queues = {}  # Tasks assigned to each live worker but not started, by worker id
+        self._running = {}  # Tasks each live worker is running, by worker id
+        self._last_seen = {}
+        self._connections = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._started = None
+        self._finished = None
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+
+    def submit(self, name, source):
+        """
+        Adds a program to run.
+
+        Parameters:
+            name (str): The name of the program, e.g. its file name.
+            source (str): The source of the program.
+
+        Returns:
+            int: The id of the task.
+        """
+        with self._condition:
+            task = Task(len(self.tasks), name, source)
+            self.tasks.append(task)
+            self._pending.append(task)
+            self._finished = None
+            self._condition.notify_all()
+            return task.id
+
+    def start(self):
+        """
+        Starts accepting workers, and monitoring their heartbeats, in background threads.
+        """
+        self._started = time.perf_counter()
+        threading.Thread(target=self._accept, name='cluster-accept', daemon=True).start()
+        threading.Thread(target=self._monitor, name='cluster-monitor', daemon=True).start()
+
+    def wait(self, timeout=None):
+        """
+        Waits until every submitted task has completed.
+
+        Parameters:
+            timeout (float, optional): The maximum time to wait, in seconds.
+
+        Returns:
+            bool: True if every task completed, False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.results) == len(self.tasks), timeout)
+
+    def live_workers(self):
+        """
+        Returns the number of workers currently connected.
+
+        Returns:
+            int: The number of workers.
+        """
+        with self._condition:
+            return len(self._queues)
+
+    def fail_remaining(self, reason):
+        """
+        Fails every task that has not completed, e.g. once no worker is left to run it.
+        Output that arrives later for one of these tasks is ignored.
+
+        Parameters:
+            reason (str): Why the tasks failed, reported as their output.
+        """
+        with self._condition:
+            for task in self.tasks:
+                if task.id not in self.results:
+                    self.results[task.id] = [[f"Task failed: {reason}", True]]
+            self._pending.clear()
+            for queue in self._queues.values():
+                queue.clear()
+            self._finished = time.perf_counter()
+            self._condition.notify_all()
+
+    def outputs(self):
+        """
+        Returns the output of the completed tasks, in order of submission.
+
+        Returns:
+            list: A (name, output) pair per completed task; output is a list of
+                  [text, is_error] pairs.
+        """
+        with self._condition:
+            return [(task.name, self.results[task.id]) for task in self.tasks if task.id in self.results]
+
+    def close(self):
+        """
+        Stops accepting workers and tells the connected ones to exit.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return  # Closed
+            threading.Thread(target=self._serve, args=(connection,), name='cluster-worker', daemon=True).start()
+
+    def _serve(self, connection):
+        # Talks to one worker until it disconnects or is dropped
+        reader = connection.makefile('rb')
+        with self._condition:
+            self.workers += 1
+            worker = self.workers
+            self._queues[worker] = deque()
+            self._running[worker] = {}
+            self._last_seen[worker] = time.monotonic()
+            self._connections[worker] = connection
+        try:
+            receive_message(reader)  # hello
+            send_message(connection, {'type': 'welcome', 'worker': worker, 'prelude': self.prelude,
+                                      'heartbeat_interval': self.heartbeat_timeout / 4})
+            while True:
+                message = receive_message(reader)
+                with self._condition:
+                    self._last_seen[worker] = time.monotonic()
+                if message['type'] == 'request':
+                    task = self._next_task(worker)
+                    if task is None:
+                        send_message(connection, {'type': 'shutdown'})
+                        return
+                    send_message(connection, {'type': 'task', 'task': task.id, 'source': task.source})
+                elif message['type'] == 'result':
+                    self._complete(worker, message)
+        except (OSError, ValueError, KeyError):
+            pass  # Disconnected, dropped, or sent a malformed message
+        finally:
+            self._drop(worker)
+            reader.close()
+            connection.close()
+
+    def _next_task(self, worker):
+        # Blocks until there is a task for the worker; None when closing or the worker was dropped
+        with self._condition:
+            while True:
+                queue = self._queues.get(worker)
+                if queue is None or self._closed:
+                    return None
+                if not queue and self._pending:
+                    share = math.ceil(len(self._pending) / len(self._queues))
+                    for _ in range(share):
+                        queue.append(self._pending.popleft())
+                if not queue:
+                    victim = max(self._queues.values(), key=len)
+                    if victim:
+                        queue.append(victim.pop())
+                        self.stolen += 1
+                if queue:
+                    task = queue.popleft()
+                    task.attempts += 1
+                    task.dispatched = time.perf_counter()
+                    self._running[worker][task.id] = task
+                    # The worker was silent while it waited, which is no reason to drop it
+                    self._last_seen[worker] = time.monotonic()
+                    return task
+                self._condition.wait()
+
+    def _complete(self, worker, message):
+        # Records the output of a task
+        with self._condition:
+            task = self._running.get(worker, {}).pop(message['task'], None)
+            if task is None or task.id in self.results:
+                return
+            self.results[task.id] = message['output']
+            self.latencies.append(time.perf_counter() - task.dispatched)
+            self.execution_times.append(message['elapsed'])
+            if len(self.results) == len(self.tasks):
+                self._finished = time.perf_counter()
+            self._condition.notify_all()
+
+    def _drop(self, worker):
+        # Forgets a worker, putting back the tasks it was running or had queued
+        with self._condition:
+            queue = self._queues.pop(worker, None)
+            if queue is None:
+                return
+            lost = list(self._running.pop(worker).values())
+            for task in reversed(lost):
+                if task.attempts >= self.max_attempts:
+                    self.results[task.id] = [[f"Task failed: {task.attempts} workers were lost running it", True]]
+                    self.latencies.append(time.perf_counter() - task.dispatched)
+                    if len(self.results) == len(self.tasks):
+                        self._finished = time.perf_counter()
+                else:
+                    self._pending.appendleft(task)
+                    self.requeued += 1
+            self._pending.extendleft(reversed(queue))
+            del self._last_seen[worker]
+            connection = self._connections.pop(worker)
+            self._condition.notify_all()
+        try:
+            connection.shutdown(socket.SHUT_RDWR)  # Wakes up the thread serving the worker, if any
+        except OSError:
+            pass
+
+    def _monitor(self):
+        # Drops busy workers whose heartbeats stopped
+        while not self._closed:
+            time.sleep(self.heartbeat_timeout / 4)
+            now = time.monotonic()
+            with self._condition:
+                silent = [worker for worker, running in self._running.items()
+                          if running and now - self._last_seen[worker] > self.heartbeat_timeout]
+            for worker in silent:
+                self._drop(worker)
+
+    def metrics(self):
+        """
+        Returns the throughput and latency metrics of the tasks completed so far.
+
+        Returns:
+            dict: The counts of tasks and workers, the elapsed time, the throughput in tasks
+                  per second, and the mean, median, 95th percentile and maximum latencies and
+                  execution times of the tasks, in seconds.
+        """
+        with self._condition:
+            end = self._finished or time.perf_counter()
+            elapsed = end - self._started if self._started is not None else 0.0
+            return {
+                'tasks': len(self.tasks),
+                'completed': len(self.results),
+                'workers': self.workers,
+                'requeued': self.requeued,
+                'stolen': self.stolen,
+                'elapsed': elapsed,
+                'throughput': len(self.results) / elapsed if elapsed else 0.0,
+                'latency': summarize(self.latencies),
+                'execution': summarize(self.execution_times),
+            }
+
+    def format_metrics(self):
+        """
+        Formats the metrics for display.
+
+        Returns:
+            str: The metrics.
+        """
+        metrics = self.metrics()
+        lines = [f"Tasks: {metrics['completed']}/{metrics['tasks']}  Workers: {metrics['workers']}  "
+                 f"Requeued: {metrics['requeued']}  Stolen: {metrics['stolen']}",
+                 f"Elapsed: {metrics['elapsed']:.3f} s  Throughput: {metrics['throughput']:.1f} tasks/s"]
+        for name in ('latency', 'execution'):
+            summary = metrics[name]
+            lines.append(f"{name.capitalize():<10} mean {summary['mean'] * 1000:9.3f} ms  "
+                         f"p50 {summary['p50'] * 1000:9.3f} ms  p95 {summary['p95'] * 1000:9.3f} ms  "
+                         f"max {summary['max'] * 1000:9.3f} ms")
+        return '\n'.join(lines)
+
+
+def summarize(values):
+    """
+    Summarizes a list of durations.
+
+    Parameters:
+        values (list): The durations, in seconds.
+
+    Returns:
+        dict: The mean, median, 95th percentile and maximum, all 0.0 if there are none.
+    """
+    if not values:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': ordered[(len(ordered) - 1) // 2],
+        'p95': ordered[math.ceil(len(ordered) * 0.95) - 1],
+        'max': ordered[-1],
+    }
+
+
+def run_worker(host, port, name=None):
+    """
+    Connects to a coordinator and runs the tasks it hands out until it says to stop.
+
+    A background thread sends heartbeats while the worker is connected, so that the
+    coordinator can tell a worker running a long task from a dead one. If the prelude fails
+    to evaluate, every task the worker is given fails with its error.
+
+    Parameters:
+        host (str): The coordinator's host.
+        port (int): The coordinator's port.
+        name (str, optional): A name identifying the worker. Defaults to its host and process id.
+
+    Returns:
+        int: The number of tasks run.
+    """
+    connection = socket.create_connection((host, port))
+    reader = connection.makefile('rb')
+    lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with lock:
+            send_message(connection, message)
+
+    def heartbeat(interval):
+        while not stopped.wait(interval):
+            try:
+                send({'type': 'heartbeat'})
+            except OSError:
+                return
+
+    tasks = 0
+    try:
+        send({'type': 'hello', 'name': name or f"{socket.gethostname()}:{os.getpid()}"})
+        welcome = receive_message(reader)
+        try:
+            prelude, failure = Prelude(welcome['prelude']), None
+        except InterpreterError as e:
+            # Fail the tasks rather than the worker, so that the coordinator gets an answer for them
+            prelude, failure = None, [[f"Task failed: the prelude did not evaluate\n{e}", True]]
+        threading.Thread(target=heartbeat, args=(welcome['heartbeat_interval'],), daemon=True).start()
+        while True:
+            send({'type': 'request'})
+            message = receive_message(reader)
+            if message['type'] != 'task':
+                break
+            start = time.perf_counter()
+            output = run_source(prelude, message['source']) if failure is None else failure
+            send({'type': 'result', 'task': message['task'], 'output': output,
+                  'elapsed': time.perf_counter() - start})
+            tasks += 1
+    except ConnectionError:
+        pass  # The coordinator went away
+    finally:
+        stopped.set()
+        reader.close()
+        connection.close()
+    return tasks
+
+
+def start_local_workers(address, count):
+    """
+    Starts worker processes on this machine, connected to a coordinator.
+
+    Parameters:
+        address (tuple): The coordinator's host and port.
+        count (int): The number of workers.
+
+    Returns:
+        list: The worker processes (subprocess.Popen).
+    """
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    host, port = address
+    return [subprocess.Popen([sys.executable, main, 'worker', f"{host}:{port}"]) for _ in range(count)]
@@ -36,3 +36,52 @@ class InterpreterError(Exception):
         if self.context:
             error_msg += f"\n\n{self.context}\n{' ' * (self.column - 1)}^"
         return error_msg
+
+
+class BudgetExceededError(InterpreterError):
+    """
+    Exception raised when a metered evaluation exhausts one of its budgets.
+    It is never wrapped by the interpreter, so it reaches the caller as it was raised.
+
+    Attributes:
+        budget (str): The budget that was exhausted ('steps', 'depth' or 'environments').
+        limit (int): The value of that budget.
+    """
+
+    def __init__(self, budget, limit, line=None, column=None, context=None):
+        """
+        Initializes the BudgetExceededError.
+
+        Parameters:
+            budget (str): The budget that was exhausted.
+            limit (int): The value of that budget.
+            line (int, optional): The line number of the node being evaluated.
+            column (int, optional): The column number of the node being evaluated.
+            context (str, optional): The context of the code where the budget ran out.
+        """
+        exceeded = {
+            'steps': f"more than {limit} evaluation steps",
+            'depth': f"call depth above {limit}",
+            'environments': f"more than {limit} environments",
+        }[budget]
+        super().__init__(f"Evaluation budget exceeded: {exceeded}", line, column, context)
+        self.budget = budget
+        self.limit = limit
+
+
+def innermost_error(error):
+    """
+    Finds the error an InterpreterError was raised for.
+
+    The interpreter wraps an error in a new InterpreterError at every level of the tree it
+    propagates through; the innermost one is where the error was raised.
+
+    Parameters:
+        error (InterpreterError): The error, as raised to the caller.
+
+    Returns:
+        InterpreterError: The innermost InterpreterError in its chain of contexts.
+    """
+    while isinstance(error.__context__, InterpreterError) and not error.__suppress_context__:
+        error = error.__context__
+    return error
@@ -0,0 +1,206 @@
+import json
+import time
+
+from parser import walk
+
+
+class Explainer:
+    """
+    Explains where the time of a run went: per phase (lexing, parsing, evaluation) and per
+    top-level statement, together with the size and depth of what was evaluated.
+
+    Lexing, parsing and evaluation are interleaved when a file is run as a stream, so phases
+    are timed by wrapping the streams between them: the time spent producing each token is
+    charged to lexing, the time spent producing each statement (minus the lexing it caused)
+    to parsing, and the time spent evaluating each statement to evaluation. Both wall-clock
+    and CPU time are measured.
+
+    Installing the explainer on an interpreter overrides, on that instance only, its
+    eval_function_call method to track the call depth, and its environment class to track
+    the length of environment chains.
+
+    Attributes:
+        phases (dict): The [wall, CPU] seconds of each phase, by name.
+        statements (list): One dict per evaluated statement, with its line, node type, wall
+                           and CPU seconds, and maximum call depth and environment chain length.
+        tokens (int): The number of tokens lexed.
+        nodes (int): The number of AST nodes parsed.
+        max_depth (int): The maximum call depth reached.
+        max_env_chain (int): The maximum length of an environment chain, the global environment included.
+    """
+
+    def __init__(self):
+        """
+        Initializes the Explainer with all counts at zero.
+        """
+        self.phases = {'lex': [0.0, 0.0], 'parse': [0.0, 0.0], 'evaluate': [0.0, 0.0]}
+        self.statements = []
+        self.tokens = 0
+        self.nodes = 0
+        self.max_depth = 0
+        self.max_env_chain = 1
+        self._depth = 0
+        self._statement_depth = 0
+        self._statement_chain = 1
+
+    def install(self, interpreter):
+        """
+        Starts tracking the call depth and environment chains of an interpreter.
+
+        Parameters:
+            interpreter (Interpreter): The interpreter to explain.
+        """
+        explainer = self
+        eval_function_call = interpreter.eval_function_call
+
+        class ChainEnvironment(interpreter.environment_class):
+            def __init__(self, parent=None):
+                super().__init__(parent)
+                self.chain = getattr(parent, 'chain', 1) + 1 if parent is not None else 1
+                if self.chain > explainer._statement_chain:
+                    explainer._statement_chain = self.chain
+
+        def explained_function_call(node, env):
+            explainer._depth += 1
+            if explainer._depth > explainer._statement_depth:
+                explainer._statement_depth = explainer._depth
+            try:
+                return eval_function_call(node, env)
+            finally:
+                explainer._depth -= 1
+
+        interpreter.environment_class = ChainEnvironment
+        interpreter.eval_function_call = explained_function_call
+
+    def uninstall(self, interpreter):
+        """
+        Stops tracking an interpreter, restoring its methods.
+
+        Parameters:
+            interpreter (Interpreter): The explained interpreter.
+        """
+        for name in ('environment_class', 'eval_function_call'):
+            interpreter.__dict__.pop(name, None)
+
+    def lex(self, tokens):
+        """
+        Times and counts the tokens flowing from the lexer to the parser.
+
+        Parameters:
+            tokens (iterable): The tokens.
+
+        Yields:
+            Token: Each token, unchanged.
+        """
+        phase = self.phases['lex']
+        tokens = iter(tokens)
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                token = next(tokens)
+            except StopIteration:
+                return
+            finally:
+                phase[0] += time.perf_counter() - wall
+                phase[1] += time.process_time() - cpu
+            self.tokens += 1
+            yield token
+
+    def parse(self, statements):
+        """
+        Times and counts the statements flowing from the parser to the interpreter.
+
+        Parameters:
+            statements (iterable): The top-level statements.
+
+        Yields:
+            ASTNode: Each statement, unchanged.
+        """
+        phase = self.phases['parse']
+        lex = self.phases['lex']
+        statements = iter(statements)
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            lex_wall, lex_cpu = lex
+            try:
+                node = next(statements)
+            except StopIteration:
+                return
+            finally:
+                phase[0] += time.perf_counter() - wall - (lex[0] - lex_wall)
+                phase[1] += time.process_time() - cpu - (lex[1] - lex_cpu)
+            self.nodes += sum(1 for _ in walk(node))
+            yield node
+
+    def evaluate(self, interpreter, node):
+        """
+        Evaluates a top-level statement, timing it.
+
+        Parameters:
+            interpreter (Interpreter): The interpreter, on which the explainer is installed.
+            node (ASTNode): The statement.
+
+        Returns:
+            The result of the statement.
+        """
+        self._statement_depth = 0
+        self._statement_chain = 1
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            return interpreter.evaluate(node)
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self.phases['evaluate'][0] += wall
+            self.phases['evaluate'][1] += cpu
+            self.max_depth = max(self.max_depth, self._statement_depth)
+            self.max_env_chain = max(self.max_env_chain, self._statement_chain)
+            self.statements.append({'line': node.line, 'node': type(node).__name__, 'wall': wall, 'cpu': cpu,
+                                    'max_depth': self._statement_depth, 'max_env_chain': self._statement_chain})
+
+    def report(self):
+        """
+        Returns the explanation as a dictionary.
+
+        Returns:
+            dict: The phases, the statements and the totals.
+        """
+        return {
+            'phases': {name: {'wall': wall, 'cpu': cpu} for name, (wall, cpu) in self.phases.items()},
+            'statements': self.statements,
+            'tokens': self.tokens,
+            'nodes': self.nodes,
+            'max_depth': self.max_depth,
+            'max_env_chain': self.max_env_chain,
+        }
+
+    def to_json(self):
+        """
+        Returns the explanation as JSON, for dashboards.
+
+        Returns:
+            str: The JSON document.
+        """
+        return json.dumps(self.report())
+
+    def format_table(self, limit=10):
+        """
+        Formats the explanation as a table, listing the slowest statements.
+
+        Parameters:
+            limit (int, optional): The number of statements to list.
+
+        Returns:
+            str: The table.
+        """
+        lines = [f"{'Phase':<12}{'Wall ms':>12}{'CPU ms':>12}"]
+        for name, (wall, cpu) in self.phases.items():
+            lines.append(f"{name:<12}{wall * 1000:>12.3f}{cpu * 1000:>12.3f}")
+        lines.append(f"Tokens: {self.tokens}  AST nodes: {self.nodes}  Statements: {len(self.statements)}  "
+                     f"Max call depth: {self.max_depth}  Max environment chain: {self.max_env_chain}")
+        lines.append(f"{'Line':>6}  {'Statement':<14}{'Wall ms':>12}{'CPU ms':>12}{'Depth':>8}{'Chain':>8}")
+        slowest = sorted(self.statements, key=lambda statement: -statement['wall'])[:limit]
+        for statement in slowest:
+            lines.append(f"{statement['line']:>6}  {statement['node']:<14}{statement['wall'] * 1000:>12.3f}"
+                         f"{statement['cpu'] * 1000:>12.3f}{statement['max_depth']:>8}{statement['max_env_chain']:>8}")
+        return '\n'.join(lines)
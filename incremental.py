@@ -0,0 +1,368 @@
+from bisect import bisect_left, bisect_right
+
+from lexer import Lexer
+from parser import Parser, walk
+from source import SourceBuffer
+
+
+# The number of statements per block of a Document
+BLOCK_SIZE = 64
+
+
+class Change:
+    """
+    The statements of a Document replaced by an edit.
+
+    Attributes:
+        index (int): The position of the first replaced statement.
+        removed (list): The AST nodes of the old statements that were replaced.
+        added (list): The AST nodes of the new statements that replaced them.
+        relexed (int): The number of characters lexed again.
+    """
+
+    def __init__(self, index, removed, added, relexed):
+        """
+        Initializes a Change.
+
+        Parameters:
+            index (int): The position of the first replaced statement.
+            removed (list): The old statements that were replaced.
+            added (list): The new statements that replaced them.
+            relexed (int): The number of characters lexed again.
+        """
+        self.index = index
+        self.removed = removed
+        self.added = added
+        self.relexed = relexed
+
+
+class Block:
+    """
+    A run of consecutive statements of a Document, with a shift of their positions that has
+    not been applied yet.
+
+    Attributes:
+        statements (list): The AST node of each statement.
+        starts (list): The offset of the first token of each statement, before the shift.
+        lines (list): The line of the first token of each statement, before the shift. The
+                      line numbers in the AST nodes are not shifted either.
+        offset (int): The number of characters to add to the offsets.
+        line (int): The number of lines to add to the line numbers.
+    """
+
+    __slots__ = ('statements', 'starts', 'lines', 'offset', 'line')
+
+    def __init__(self, statements, starts, lines):
+        """
+        Initializes a Block with no pending shift.
+
+        Parameters:
+            statements (list): The AST node of each statement.
+            starts (list): The offset of the first token of each statement.
+            lines (list): The line of the first token of each statement.
+        """
+        self.statements = statements
+        self.starts = starts
+        self.lines = lines
+        self.offset = 0
+        self.line = 0
+
+    def settle(self):
+        """
+        Applies the pending shift to the offsets, lines and AST nodes of the statements.
+        """
+        if self.line:
+            for statement in self.statements:
+                for node in walk(statement):
+                    node.line += self.line
+            self.lines = [line + self.line for line in self.lines]
+            self.line = 0
+        if self.offset:
+            self.starts = [start + self.offset for start in self.starts]
+            self.offset = 0
+
+    def first_start(self):
+        # The shifted offset of the block's first statement
+        return self.starts[0] + self.offset
+
+
+class Document:
+    """
+    A source text together with its top-level statements, kept up to date incrementally as
+    the text is edited.
+
+    An edit lexes and parses the text again from the statement before the one it touches
+    (whose end depends on the token after it) up to the first statement after it that the
+    new parse lines up with, on a later line than the edit. The lexer looks at most one
+    character before a token (keywords and booleans must not follow a word character), so the
+    part lexed again never starts right after a word character, and the parser looks at most
+    one token past a statement, so from a statement that starts at the same token as before,
+    the parse would produce the same statements: those are kept, AST nodes and all.
+
+    The statements are stored in blocks of about BLOCK_SIZE. The blocks after an edit only
+    record by how much their offsets and lines moved, and the line numbers of their AST nodes
+    are updated when they are next read, so an edit costs time in proportion to its size and
+    to the number of blocks rather than to the number of statements after it.
+
+    Attributes:
+        text (str): The current text.
+    """
+
+    def __init__(self, text=''):
+        """
+        Initializes the Document, lexing and parsing the whole text.
+
+        Parameters:
+            text (str, optional): The source code.
+
+        Raises:
+            InterpreterError: If the text cannot be lexed or parsed.
+        """
+        self.text = text
+        self._lexer = Lexer()
+        statements, starts, lines, _ = self._parse(text, 0, len(text), 1, 0, {})
+        self._blocks = make_blocks(statements, starts, lines)
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Loads a Document from a .lambda file.
+
+        Parameters:
+            filename (str): The path to the file.
+
+        Returns:
+            Document: The document.
+        """
+        with open(filename, 'r') as file:
+            return cls(file.read())
+
+    def __len__(self):
+        return sum(len(block.statements) for block in self._blocks)
+
+    @property
+    def statements(self):
+        """
+        The AST node of each top-level statement, as Parser.parse would return them.
+
+        Returns:
+            list: The statements.
+        """
+        result = []
+        for block in self._blocks:
+            block.settle()
+            result.extend(block.statements)
+        return result
+
+    @property
+    def starts(self):
+        """
+        The offset of the first token of each statement.
+
+        Returns:
+            list: The offsets.
+        """
+        return [start + block.offset for block in self._blocks for start in block.starts]
+
+    @property
+    def lines(self):
+        """
+        The line of the first token of each statement.
+
+        Returns:
+            list: The line numbers.
+        """
+        return [line + block.line for block in self._blocks for line in block.lines]
+
+    def edit(self, offset, deleted, inserted):
+        """
+        Replaces part of the text, lexing and parsing again only the statements it affects.
+
+        Parameters:
+            offset (int): The offset at which the edit starts.
+            deleted (int): The number of characters removed from that offset.
+            inserted (str): The text inserted at that offset.
+
+        Returns:
+            Change: The statements that were replaced, and by which.
+
+        Raises:
+            ValueError: If the edit is outside of the text.
+            InterpreterError: If the edited text cannot be lexed or parsed. The document is
+                              left unchanged.
+        """
+        if offset < 0 or deleted < 0 or offset + deleted > len(self.text):
+            raise ValueError(f"Edit of {deleted} characters at offset {offset} is outside of the text")
+        old_text = self.text
+        text = old_text[:offset] + inserted + old_text[offset + deleted:]
+        delta = len(inserted) - deleted
+        line_delta = inserted.count('\n') - old_text.count('\n', offset, offset + deleted)
+
+        # Gather the statements around the edit, with their shifts applied, starting with the
+        # block before the one holding the character before the edit
+        blocks = self._blocks
+        low = max(0, bisect_right(blocks, offset - 1, key=Block.first_start) - 2)
+        high = low
+        statements, starts, lines = [], [], []
+
+        def gather(limit):
+            # Adds blocks until one of the gathered statements starts at the old offset limit or later
+            nonlocal high
+            while high < len(blocks) and (not starts or starts[-1] < limit):
+                block = blocks[high]
+                block.settle()
+                statements.extend(block.statements)
+                starts.extend(block.starts)
+                lines.extend(block.lines)
+                high += 1
+
+        # Later statements starting on a line after the edit are unchanged; the parse can stop at any of them
+        line_end = old_text.find('\n', offset + deleted)
+        if line_end == -1:
+            line_end = len(old_text)
+        gather(line_end + 1)
+
+        # The statement holding the character before the edit may be extended by it, and the
+        # statement before that one ended by looking at its first token
+        first = max(0, bisect_right(starts, offset - 1) - 2)
+        # Nor may the lexing start right after a word character, which would make "5True" a boolean
+        while (first or low) and is_word_character(text[starts[first] - 1]):
+            if first:
+                first -= 1
+            else:
+                low -= 1
+                block = blocks[low]
+                block.settle()
+                statements[:0], starts[:0], lines[:0] = block.statements, block.starts, block.lines
+                first = len(block.statements) - 1
+        candidates = bisect_left(starts, line_end + 1)
+        if low == 0 and first == 0:
+            region_start, first_line = 0, 1
+        else:
+            region_start, first_line = starts[first], lines[first]
+        first_column = offset_column(text, region_start)
+
+        # Lex and parse a window ending at a line break past the first candidate, growing it
+        # when the parse gets to its end without lining up with a candidate
+        window_end = starts[candidates] + delta if candidates < len(starts) else len(text)
+        while True:
+            line_break = text.find('\n', window_end)
+            window_end = len(text) if line_break == -1 else line_break + 1
+            gather(window_end - delta)
+            sync = {starts[j] + delta: j for j in range(candidates, bisect_left(starts, window_end - delta))}
+            try:
+                added, added_starts, added_lines, synced = self._parse(text, region_start, window_end,
+                                                                      first_line, first_column, sync)
+            except Exception:
+                # A window cut short can fail in ways the whole text does not
+                if window_end == len(text):
+                    # Report the error exactly as parsing the whole text would
+                    parser = Parser(self._lexer.tokenize(text))
+                    parser.source = self._lexer.source
+                    parser.parse()
+                    raise
+                synced = None
+            if synced is not None or window_end == len(text):
+                break
+            window_end = region_start + 2 * (window_end - region_start)
+
+        end = len(starts) if synced is None else synced
+        removed = statements[first:end]
+        if line_delta:
+            for statement in statements[end:]:
+                for node in walk(statement):
+                    node.line += line_delta
+        statements[first:end] = added
+        starts[first:] = added_starts + [start + delta for start in starts[end:]]
+        lines[first:] = added_lines + [line + line_delta for line in lines[end:]]
+        for block in blocks[high:]:
+            block.offset += delta
+            block.line += line_delta
+        blocks[low:high] = make_blocks(statements, starts, lines)
+        self.text = text
+        index = sum(len(block.statements) for block in blocks[:low]) + first
+        return Change(index, removed, added, window_end - region_start)
+
+    def _parse(self, text, start, end, first_line, first_column, sync):
+        """
+        Lexes and parses the statements of part of a text, stopping at the first statement
+        that starts at one of the given offsets.
+
+        Parameters:
+            text (str): The whole text.
+            start (int): The offset of the first token of the part.
+            end (int): The offset at which the part ends.
+            first_line (int): The line number at the start offset.
+            first_column (int): The column of the start offset in its line.
+            sync (dict): The offsets at which to stop, each mapped to a value to return.
+
+        Returns:
+            tuple: The statements parsed, the offset and line of the first token of each,
+                   and the value of the offset the parse stopped at (None if it got to the end).
+
+        Raises:
+            InterpreterError: If the part cannot be lexed or parsed.
+        """
+        source = SourceBuffer(text[start:end])
+        tokens = list(self._lexer.scan_source(source, first_line))
+        offsets = [start + source.offset(token.line - first_line + 1, token.column) for token in tokens]
+        if first_column:
+            # The part starts in the middle of its first line
+            for i, token in enumerate(tokens):
+                if token.line != first_line:
+                    break
+                tokens[i] = token._replace(column=token.column + first_column)
+        parser = Parser(tokens)
+        parser.source = source
+        statements, starts, lines = [], [], []
+        while parser.has_token():
+            offset = offsets[parser.pos]
+            if offset in sync:
+                return statements, starts, lines, sync[offset]
+            starts.append(offset)
+            lines.append(tokens[parser.pos].line)
+            statements.append(parser.parse_statement())
+        return statements, starts, lines, None
+
+
+def make_blocks(statements, starts, lines):
+    """
+    Splits statements into blocks of BLOCK_SIZE.
+
+    Parameters:
+        statements (list): The AST node of each statement.
+        starts (list): The offset of the first token of each statement.
+        lines (list): The line of the first token of each statement.
+
+    Returns:
+        list: The blocks.
+    """
+    return [Block(statements[i:i + BLOCK_SIZE], starts[i:i + BLOCK_SIZE], lines[i:i + BLOCK_SIZE])
+            for i in range(0, len(statements), BLOCK_SIZE)]
+
+
+def offset_column(text, offset):
+    """
+    Returns the column of an offset in a text, counted from the start of its line.
+
+    Parameters:
+        text (str): The text.
+        offset (int): The offset.
+
+    Returns:
+        int: The 0-based column.
+    """
+    return offset - (text.rfind('\n', 0, offset) + 1)
+
+
+def is_word_character(character):
+    """
+    Returns whether a character is a word character, which a keyword or a boolean cannot follow.
+
+    Parameters:
+        character (str): The character.
+
+    Returns:
+        bool: True for letters, digits and underscores.
+    """
+    return character.isalnum() or character == '_'
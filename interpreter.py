@@ -1,6 +1,12 @@
+from collections import ChainMap
 from lexer import Lexer
-from parser import Parser, Number, Bool, Identifier, BinaryOp, FunctionDef, FunctionCall, UnaryOp, Lambda
-from errors import InterpreterError
+from parser import (Parser, Number, Bool, String, Identifier, BinaryOp, FunctionDef, FunctionCall, UnaryOp, Lambda,
+                    ListLiteral, walk)
+from errors import InterpreterError, BudgetExceededError
+from natives import NativeFunction, install as install_natives
+from pvector import PersistentVector
+from rope import Rope
+from source import SourceBuffer
 
 
 class Environment:
@@ -60,24 +66,53 @@ class Interpreter:
 
     Attributes:
         global_env (Environment): The global environment where variables and functions are stored.
-        code_lines (list): A list of code lines, used for error reporting.
+        source (SourceBuffer): The source being evaluated, used for error reporting.
+        definitions (dict): The FunctionDef node of each defined function, by name.
+        memo_store (MemoStore): The persistent store of function results, if any.
+        environment_class (type): The class of the environments created for function calls.
     """
 
-    def __init__(self):
+    environment_class = Environment
+
+    def __init__(self, memo_store=None, prelude=None):
         """
-        Initializes the Interpreter with a global environment and an empty code line list.
+        Initializes the Interpreter with a global environment and no source.
+
+        Parameters:
+            memo_store (MemoStore, optional): A persistent store through which calls to
+                                              functions defined with Defun are memoized.
+            prelude (Prelude, optional): Shared definitions layered under the global environment.
+                                         The interpreter's own definitions go into the global
+                                         environment and never modify the prelude.
         """
-        self.global_env = Environment()
-        self.code_lines = []  # Store the lines of code
+        if prelude is None:
+            self.global_env = Environment()
+            install_natives(self.global_env)
+            self.definitions = {}
+        else:
+            self.global_env = Environment(prelude.environment)
+            self.definitions = ChainMap({}, prelude.definitions)
+        self.source = None
+        self.memo_store = memo_store
+        self._definition_hashes = {}
 
     def set_code(self, code):
         """
-        Sets the code to be evaluated, splitting it into lines for error reporting.
+        Sets the code to be evaluated, for error reporting.
 
         Parameters:
             code (str): The source code to evaluate.
         """
-        self.code_lines = code.split('\n')
+        self.source = SourceBuffer(code)
+
+    def set_source(self, source):
+        """
+        Sets the source buffer the evaluated code was read from, for error reporting.
+
+        Parameters:
+            source (SourceBuffer): The source of the code to evaluate.
+        """
+        self.source = source
 
     def get_context(self, node):
         """
@@ -90,8 +125,8 @@ class Interpreter:
             str: A string representing the line of code where the node is found.
         """
         if hasattr(node, 'line') and hasattr(node, 'column'):
-            if 0 <= node.line - 1 < len(self.code_lines):
-                line = self.code_lines[node.line - 1]
+            line = self.source.line_text(node.line) if self.source is not None else None
+            if line is not None:
                 return f"Line {node.line}: {line}\n" + " " * (node.column + 6) + "^"
             else:
                 return f"Line {node.line}: <line not available>"
@@ -120,6 +155,8 @@ class Interpreter:
                 return node.value
             elif isinstance(node, Bool):
                 return node.value
+            elif isinstance(node, String):
+                return Rope(node.value)
             elif isinstance(node, Identifier):
                 return env.lookup(node.name)
             elif isinstance(node, BinaryOp):
@@ -132,8 +169,12 @@ class Interpreter:
                 return self.eval_function_call(node, env)
             elif isinstance(node, Lambda):
                 return self.eval_lambda(node, env)
+            elif isinstance(node, ListLiteral):
+                return self.eval_list(node, env)
             else:
                 raise TypeError(f"Unknown node type: {type(node)}")
+        except BudgetExceededError:
+            raise
         except Exception as e:
             context = self.get_context(node)
             raise InterpreterError(str(e), node.line, node.column, context)
@@ -239,14 +280,107 @@ class Interpreter:
             raise InterpreterError(str(e), node.line, node.column, context)
 
         def func(*args):
-            local_env = Environment(env)
+            local_env = self.environment_class(env)
             for param, arg in zip(node.params, args):
                 local_env.define(param, arg)
             return self.evaluate(node.body, local_env)
 
+        self.definitions[node.name] = node
+        self._definition_hashes.clear()  # A redefinition can change the callees of any function
+        if self.memo_store is not None and self.is_pure(node.name):
+            func = self.memo_store.wrap(self, node.name, func)
         env.define(node.name, func)
         return f"Function '{node.name}' defined"
 
+    def function_dependencies(self, name):
+        """
+        Collects the definition of a function together with those of all functions it
+        (transitively) refers to.
+
+        Parameters:
+            name (str): The name of the function.
+
+        Returns:
+            list: The FunctionDef nodes, starting with the named function's own.
+
+        Raises:
+            NameError: If the function is not defined.
+        """
+        if name not in self.definitions:
+            raise NameError(f"Function '{name}' is not defined")
+        found = {}
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            if current in found or current not in self.definitions:
+                continue
+            found[current] = self.definitions[current]
+            for node in walk(found[current].body):
+                if isinstance(node, Identifier):
+                    pending.append(node.name)
+                elif isinstance(node, FunctionCall) and isinstance(node.name, str):
+                    pending.append(node.name)
+        return list(found.values())
+
+    def is_pure(self, name):
+        """
+        Checks whether a function calls, directly or through the functions it refers to,
+        only native functions declared pure, so that its calls can be memoized.
+
+        Parameters:
+            name (str): The name of the function.
+
+        Returns:
+            bool: True if no impure native function is referred to.
+        """
+        for definition in self.function_dependencies(name):
+            for node in walk(definition.body):
+                if isinstance(node, (Identifier, FunctionCall)) and isinstance(node.name, str) \
+                        and node.name not in self.definitions:
+                    try:
+                        value = self.global_env.lookup(node.name)
+                    except NameError:
+                        continue
+                    if isinstance(value, NativeFunction) and not value.pure:
+                        return False
+        return True
+
+    def definition_hash(self, name):
+        """
+        Returns the structural hash of a function's definition and those of all functions it
+        (transitively) refers to, computed once per set of definitions.
+
+        Parameters:
+            name (str): The name of the function.
+
+        Returns:
+            bytes: The hash.
+        """
+        digest = self._definition_hashes.get(name)
+        if digest is None:
+            from memo import definition_hash
+            digest = self._definition_hashes[name] = definition_hash(self.function_dependencies(name))
+        return digest
+
+    def map_call(self, name, arguments, workers=None, chunk_size=1024, ordered=True):
+        """
+        Calls a defined function on many argument tuples across a pool of processes.
+
+        See batch.map_call for details.
+
+        Parameters:
+            name (str): The name of the function to call.
+            arguments (iterable): The argument tuples, one per call.
+            workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            chunk_size (int, optional): The number of calls sent to a worker at a time.
+            ordered (bool, optional): Whether to yield chunks in input order rather than as they complete.
+
+        Yields:
+            BatchResult: The results of each chunk of calls.
+        """
+        from batch import map_call
+        return map_call(self, name, arguments, workers, chunk_size, ordered)
+
     def check_undefined_variables(self, node, defined_vars, env):
         """
         Helper function to ensure no undefined variables are used in the function body.
@@ -270,6 +404,9 @@ class Interpreter:
         elif isinstance(node, FunctionCall):
             for arg in node.args:
                 self.check_undefined_variables(arg, defined_vars, env)
+        elif isinstance(node, ListLiteral):
+            for element in node.elements:
+                self.check_undefined_variables(element, defined_vars, env)
 
     def eval_function_call(self, node, env):
         """
@@ -290,6 +427,12 @@ class Interpreter:
         else:
             func = env.lookup(node.name)
         args = [self.evaluate(arg, env) for arg in node.args]
+        if type(func) is NativeFunction:
+            # Native functions are called directly: no environment is created
+            minimum, maximum = func.arity
+            if len(args) < minimum or (maximum is not None and len(args) > maximum):
+                func.check_arity(len(args))
+            return func.func(*args)
         return func(*args)
 
     def eval_lambda(self, node, env):
@@ -305,9 +448,22 @@ class Interpreter:
         """
 
         def func(*args):
-            local_env = Environment(env)
+            local_env = self.environment_class(env)
             for param, arg in zip(node.params, args):
                 local_env.define(param, arg)
             return self.evaluate(node.body, local_env)
 
         return func
+
+    def eval_list(self, node, env):
+        """
+        Evaluates a list literal, creating a persistent vector of its elements.
+
+        Parameters:
+            node (ListLiteral): The list literal node to evaluate.
+            env (Environment): The environment in which to evaluate the elements.
+
+        Returns:
+            PersistentVector: The list of the values of the elements.
+        """
+        return PersistentVector.from_iterable(self.evaluate(element, env) for element in node.elements)
@@ -0,0 +1,164 @@
+import json
+
+from errors import InterpreterError, BudgetExceededError, innermost_error
+from parser import FunctionDef
+from pvector import PersistentVector
+from rope import Rope
+
+_encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+
+def to_json(value):
+    """
+    Converts a value of the language to JSON data: integers, booleans and None as themselves,
+    strings as JSON strings, lists as arrays, and anything else (functions, streams) as
+    its printed form.
+
+    Parameters:
+        value: The value.
+
+    Returns:
+        The JSON-serializable data.
+    """
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    if isinstance(value, Rope):
+        return str(value)
+    if isinstance(value, PersistentVector):
+        return [to_json(item) for item in value]
+    return str(value)
+
+
+def statement_record(index, node, result):
+    """
+    Builds the record of a top-level statement that was evaluated.
+
+    Parameters:
+        index (int): The number of the statement in the program, from 0.
+        node (ASTNode): The statement.
+        result: The result of the statement.
+
+    Returns:
+        dict: The statement's index and line, and either the name of the function it
+              defined ('defined') or its value ('value').
+    """
+    if isinstance(node, FunctionDef):
+        return {'index': index, 'line': node.line, 'defined': node.name}
+    return {'index': index, 'line': node.line, 'value': to_json(result)}
+
+
+def error_record(index, error):
+    """
+    Builds the record of the error that ended a program, describing the innermost
+    InterpreterError, where the error was raised.
+
+    Parameters:
+        index (int): The number of the statement that failed, from 0.
+        error (Exception): The error.
+
+    Returns:
+        dict: The statement's index and line, and the error's type, message, line and column.
+    """
+    if not isinstance(error, InterpreterError):
+        return {'index': index, 'line': None,
+                'error': {'type': type(error).__name__, 'message': str(error), 'line': None, 'column': None}}
+    error = innermost_error(error)
+    details = {'type': type(error).__name__, 'message': error.message, 'line': error.line, 'column': error.column}
+    if isinstance(error, BudgetExceededError):
+        details['budget'] = error.budget
+        details['limit'] = error.limit
+    return {'index': index, 'line': error.line, 'error': details}
+
+
+def write_records(statements, writer):
+    """
+    Writes the record of each statement of a run, and of the error that ended it, if any.
+
+    Parameters:
+        statements (iterable): Each statement of the run and its result, as yielded by
+                               main.run_statements.
+        writer (JsonlWriter): The writer of the records.
+
+    Returns:
+        bool: True if the run ended without an error.
+    """
+    index = 0
+    try:
+        for node, result in statements:
+            if type(result) is int and type(node.line) is int:
+                # The common case of an integer value, encoded without the json module
+                writer.write_line(f'{{"index":{index},"line":{node.line},"value":{result}}}\n')
+            else:
+                writer.write(statement_record(index, node, result))
+            index += 1
+    except Exception as e:
+        writer.write(error_record(index, e))
+        return False
+    return True
+
+
+class JsonlWriter:
+    """
+    Writes records as JSON Lines (one compact JSON document per line) through a large buffer.
+
+    Encoded records are collected in memory and written in one call once they reach
+    buffer_size characters, so that a program with many small statements costs a few large
+    writes rather than one write (and possibly one system call) per statement.
+
+    Attributes:
+        file (TextIO): The file the records are written to.
+        buffer_size (int): The number of characters collected before they are written.
+        records (int): The number of records written so far.
+    """
+
+    def __init__(self, file, buffer_size=1 << 20):
+        """
+        Initializes the JsonlWriter.
+
+        Parameters:
+            file (TextIO): The file to write to.
+            buffer_size (int, optional): The number of characters collected before they are written.
+        """
+        self.file = file
+        self.buffer_size = buffer_size
+        self.records = 0
+        self._chunks = []
+        self._size = 0
+
+    def write(self, record):
+        """
+        Writes a record.
+
+        Parameters:
+            record (dict): The record.
+        """
+        self.write_line(_encode(record) + '\n')
+
+    def write_line(self, line):
+        """
+        Writes a record that is already encoded.
+
+        Parameters:
+            line (str): The record as a line of JSON, ending with a newline.
+        """
+        self._chunks.append(line)
+        self._size += len(line)
+        self.records += 1
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the collected records to the file, and flushes it.
+        """
+        if self._chunks:
+            self.file.write(''.join(self._chunks))
+            self._chunks.clear()
+            self._size = 0
+        self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
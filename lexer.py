@@ -1,6 +1,101 @@
 import re
-from typing import List, Optional, NamedTuple
+from array import array
+from typing import Iterator, List, Optional, NamedTuple
 from errors import InterpreterError
+from source import SourceBuffer
+
+
+TOKEN_SPECIFICATION = [
+    ('DEFUN', r'\bDefun\b'),  # Function definition keyword
+    ('LAMBDA', r'\bLambda\b'),  # Lambda keyword
+    ('NUMBER', r'\d+'),  # Integer numbers
+    ('BOOL', r'\bTrue\b|\bFalse\b'),  # Boolean values
+    ('BOOL_OP', r'and|or|not'),  # Boolean operators
+    ('COMP_OP', r'==|!=|<=|>=|<|>'),  # Comparison operators
+    ('ID', r'[A-Za-z_]\w*'),  # Identifiers
+    ('OP', r'[+\-*/%]'),  # Arithmetic operators
+    ('LPAREN', r'\('),  # Left parenthesis
+    ('RPAREN', r'\)'),  # Right parenthesis
+    ('LCURLY', r'\{'),  # Left curly bracket
+    ('RCURLY', r'\}'),  # Right curly bracket
+    ('LBRACKET', r'\['),  # Left square bracket
+    ('RBRACKET', r'\]'),  # Right square bracket
+    ('COMMA', r','),  # Comma
+    ('COLON', r':'),  # Colon
+    ('STRING', r'\'[^\']*\'|\"[^\"]*\"'),  # String literals
+    ('NEWLINE', r'\n'),  # Line breaks
+    ('SKIP', r'[ \t\r]+'),  # Skip over spaces, tabs and carriage returns
+    ('MISMATCH', r'.'),  # Any other character
+]
+TOKEN_REGEX = re.compile('|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPECIFICATION))
+# Memory-mapped files are scanned as UTF-8 bytes, where \w and \b only know ASCII: keywords must not
+# touch a multi-byte character either, identifiers may continue with multi-byte characters (checked
+# against TOKEN_REGEX once decoded), and a mismatch is a whole character rather than one byte of it
+BYTES_KEYWORD = r'(?<![\w\x80-\xff])%s(?![\w\x80-\xff])'
+BYTES_PATTERNS = {
+    'DEFUN': BYTES_KEYWORD % 'Defun',
+    'LAMBDA': BYTES_KEYWORD % 'Lambda',
+    'BOOL': BYTES_KEYWORD % '(?:True|False)',
+    'ID': r'[A-Za-z_](?:\w|[\x80-\xff])*',
+    'MISMATCH': r'[\xc0-\xff][\x80-\xbf]*|.',
+}
+BYTES_TOKEN_REGEX = re.compile('|'.join('(?P<%s>%s)' % (name, BYTES_PATTERNS.get(name, pattern))
+                                        for name, pattern in TOKEN_SPECIFICATION).encode())
+# Indexed by type code, which is the regex group index - 1 (the patterns have no capturing groups of their own)
+TOKEN_TYPES = [name for name, _ in TOKEN_SPECIFICATION]
+
+
+def character_column(data, line_start, offset):
+    """
+    Returns the column of an offset within its line, counted in characters.
+
+    Parameters:
+        data (str | mmap.mmap): The source text, or the UTF-8 bytes of a memory-mapped file.
+        line_start (int): The offset at which the line starts.
+        offset (int): The offset of the position.
+
+    Returns:
+        int: The 0-based column of the position.
+    """
+    if isinstance(data, str):
+        return offset - line_start
+    prefix = data[line_start:offset]
+    return len(prefix) if prefix.isascii() else len(prefix.decode(errors='replace'))
+
+
+def identifier_length(value):
+    """
+    Returns how much of an identifier scanned from UTF-8 bytes is an identifier of the text
+    pattern, which only accepts word characters.
+
+    Parameters:
+        value (str): The decoded identifier.
+
+    Returns:
+        int: The number of leading characters of value that form an identifier.
+    """
+    return TOKEN_REGEX.match(value).end()
+
+
+def unexpected_character(source, start, end, line, first_line=1):
+    """
+    Builds the error reported for a character that starts no token.
+
+    Parameters:
+        source (SourceBuffer): The source being tokenized.
+        start (int): The offset of the character.
+        end (int): The offset just past the character.
+        line (int): The line number of the character.
+        first_line (int, optional): The line number of the first line of the source.
+
+    Returns:
+        InterpreterError: The error, with the line as context.
+    """
+    value = source.data[start:end]
+    value = value if isinstance(value, str) else value.decode(errors='replace')
+    column = character_column(source.data, source.line_starts[line - first_line], start)
+    return InterpreterError(f"Unexpected character: '{value}'", line, column + 1,
+                            source.line_text(line - first_line + 1))
 
 
 class Token(NamedTuple):
@@ -19,14 +114,92 @@ class Token(NamedTuple):
     column: int
 
 
+class TokenStream:
+    """
+    A compact, array-backed sequence of tokens.
+
+    Instead of one Token object per token, the stream keeps parallel arrays holding each token's
+    type code (an index into TOKEN_TYPES), start and end offsets in the source, and line number.
+    Token values are sliced out of the source only when a token is accessed, so a stream costs
+    13 bytes per token. Indexing returns an ordinary Token, so the parser can consume a stream
+    exactly like a list of tokens.
+
+    Attributes:
+        source (SourceBuffer): The source the tokens were read from.
+        types (array): The type code of each token.
+        starts (array): The offset at which each token starts.
+        ends (array): The offset at which each token ends.
+        lines (array): The line number of each token.
+        first_line (int): The line number of the first line of the source.
+    """
+
+    def __init__(self, source: SourceBuffer, first_line: int = 1):
+        """
+        Initializes an empty TokenStream over a source.
+
+        Parameters:
+            source (SourceBuffer): The source the tokens are read from.
+            first_line (int, optional): The line number of the first line of the source.
+        """
+        self.source = source
+        self.first_line = first_line
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self._cached_index = -1
+        self._cached_token = None
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        if index == self._cached_index:
+            return self._cached_token
+        kind = TOKEN_TYPES[self.types[index]]  # Raises IndexError past the end, like a list
+        start = self.starts[index]
+        line = self.lines[index]
+        column = character_column(self.source.data, self.source.line_starts[line - self.first_line], start)
+        token = Token(kind, self.value(index), line, column)
+        self._cached_index = index
+        self._cached_token = token
+        return token
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def value(self, index):
+        """
+        Returns the value of a token, sliced out of the source.
+
+        Parameters:
+            index (int): The index of the token.
+
+        Returns:
+            The token value: an int for NUMBER tokens, a bool for BOOL tokens and a str otherwise.
+        """
+        value = self.source.data[self.starts[index]:self.ends[index]]
+        if not isinstance(value, str):
+            value = value.decode()
+        kind = TOKEN_TYPES[self.types[index]]
+        if kind == 'NUMBER':
+            return int(value)
+        elif kind == 'BOOL':
+            return value == 'True'
+        return value
+
+
 class Lexer:
     """
     The Lexer class is responsible for tokenizing the input source code.
     It converts a string of source code into a list of tokens that can be parsed by the parser.
 
     Attributes:
-        input (str): The source code input string.
-        lines (list): A list of strings, where each string is a line of code.
+        input (str | mmap.mmap): The source code being tokenized.
+        source (SourceBuffer): The buffer wrapping the input, used for error context.
     """
 
     def __init__(self):
@@ -34,6 +207,7 @@ class Lexer:
         Initializes the Lexer with an empty input string.
         """
         self.input = ""
+        self.source = None
 
     def tokenize(self, input_string: Optional[str] = None) -> List[Token]:
         """
@@ -51,53 +225,146 @@ class Lexer:
         """
         if input_string is not None:
             self.input = input_string
-            self.lines = self.input.split('\n')
-
-        tokens = []
-        token_specification = [
-            ('DEFUN', r'\bDefun\b'),  # Function definition keyword
-            ('LAMBDA', r'\bLambda\b'),  # Lambda keyword
-            ('NUMBER', r'\d+'),  # Integer numbers
-            ('BOOL', r'\bTrue\b|\bFalse\b'),  # Boolean values
-            ('BOOL_OP', r'and|or|not'),  # Boolean operators
-            ('COMP_OP', r'==|!=|<=|>=|<|>'),  # Comparison operators
-            ('ID', r'[A-Za-z_]\w*'),  # Identifiers
-            ('OP', r'[+\-*/%]'),  # Arithmetic operators
-            ('LPAREN', r'\('),  # Left parenthesis
-            ('RPAREN', r'\)'),  # Right parenthesis
-            ('LCURLY', r'\{'),  # Left curly bracket
-            ('RCURLY', r'\}'),  # Right curly bracket
-            ('COMMA', r','),  # Comma
-            ('COLON', r':'),  # Colon
-            ('STRING', r'\'[^\']*\'|\"[^\"]*\"'),  # String literals
-            ('NEWLINE', r'\n'),  # Line breaks
-            ('SKIP', r'[ \t]+'),  # Skip over spaces and tabs
-            ('MISMATCH', r'.'),  # Any other character
-        ]
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in token_specification)
-        line_num = 1
+        if self.source is None or self.source.data is not self.input:
+            self.source = SourceBuffer(self.input)
+        return list(self.scan_source(self.source))
+
+    def scan_source(self, source: SourceBuffer, first_line: int = 1) -> Iterator[Token]:
+        """
+        Lazily tokenizes a source buffer, scanning its text (or memory map) in place.
+
+        Parameters:
+            source (SourceBuffer): The source to tokenize.
+            first_line (int, optional): The line number of the first line of the source, for
+                                        sources that are a fragment of a larger file.
+
+        Yields:
+            Token: The tokens of the source, in order.
+
+        Raises:
+            InterpreterError: If an unexpected character is encountered.
+        """
+        self.source = source
+        self.input = source.data
+        text = isinstance(source.data, str)
+        newline = '\n' if text else b'\n'
+        line_num = first_line
         line_start = 0
+        shift = 0  # For memory-mapped files, the bytes beyond one per character since line_start
 
-        for mo in re.finditer(tok_regex, self.input):
+        for mo in (TOKEN_REGEX if text else BYTES_TOKEN_REGEX).finditer(source.data):
             kind = mo.lastgroup
-            value = mo.group()
+            if kind == 'SKIP':
+                continue
+            elif kind == 'NEWLINE':
+                line_start = mo.end()
+                line_num += 1
+                shift = 0
+                continue
+            raw = mo.group()
+            value = raw
             column = mo.start() - line_start
+            if not text:
+                value = raw.decode(errors='replace')
+                column -= shift
+                if not raw.isascii():
+                    length = identifier_length(value) if kind == 'ID' else len(value)
+                    if length < len(value):
+                        # The identifier ends before a character that is not a word character
+                        kind, value, column = 'MISMATCH', value[length], column + length
+                    shift += len(raw) - len(value)
             if kind == 'NUMBER':
                 value = int(value)
             elif kind == 'BOOL':
                 value = True if value == 'True' else False
-            elif kind == 'NEWLINE':
-                line_start = mo.end()
-                line_num += 1
-                continue
-            elif kind == 'SKIP':
+            elif kind == 'STRING' and newline in raw:
+                # String literals may span lines; keep counting lines past them
+                yield Token(kind, value, line_num, column)
+                line_num += raw.count(newline)
+                line_start = mo.start() + raw.rfind(newline) + 1
+                if not text:
+                    tail = raw[raw.rfind(newline) + 1:]
+                    shift = len(tail) - len(tail.decode(errors='replace'))
                 continue
             elif kind == 'MISMATCH':
-                context = self.lines[line_num - 1]
+                context = source.line_text(line_num - first_line + 1)
                 raise InterpreterError(f"Unexpected character: '{value}'", line_num, column + 1, context)
-            tokens.append(Token(kind, value, line_num, column))
+            yield Token(kind, value, line_num, column)
 
-        return tokens
+    def tokenize_compact(self, input_string: Optional[str] = None) -> TokenStream:
+        """
+        Tokenizes the input string into a compact TokenStream.
+
+        Parameters:
+            input_string (str, optional): The source code to tokenize. If not provided,
+                                          the current value of self.input will be used.
+
+        Returns:
+            TokenStream: The tokens of the input.
+
+        Raises:
+            InterpreterError: If an unexpected character is encountered.
+        """
+        if input_string is not None:
+            self.input = input_string
+        if self.source is None or self.source.data is not self.input:
+            self.source = SourceBuffer(self.input)
+        return self.scan_source_compact(self.source)
+
+    def scan_source_compact(self, source: SourceBuffer, first_line: int = 1) -> TokenStream:
+        """
+        Tokenizes a source buffer into a compact TokenStream.
+
+        Parameters:
+            source (SourceBuffer): The source to tokenize.
+            first_line (int, optional): The line number of the first line of the source, for
+                                        sources that are a fragment of a larger file.
+
+        Returns:
+            TokenStream: The tokens of the source.
+
+        Raises:
+            InterpreterError: If an unexpected character is encountered.
+        """
+        self.source = source
+        self.input = source.data
+        stream = TokenStream(source, first_line)
+        add_type = stream.types.append
+        add_start = stream.starts.append
+        add_end = stream.ends.append
+        add_line = stream.lines.append
+        skip, newline, string, identifier, mismatch = (TOKEN_TYPES.index(kind) + 1
+                                                       for kind in ('SKIP', 'NEWLINE', 'STRING', 'ID', 'MISMATCH'))
+        text = isinstance(source.data, str)
+        regex = TOKEN_REGEX if text else BYTES_TOKEN_REGEX
+        line_break = '\n' if text else b'\n'
+        line_num = first_line
+
+        for mo in regex.finditer(source.data):
+            group = mo.lastindex
+            if group == skip:
+                continue
+            elif group == newline:
+                line_num += 1
+                continue
+            elif group == mismatch:
+                raise unexpected_character(source, mo.start(), mo.end(), line_num, first_line)
+            elif group == identifier and not text and not mo.group().isascii():
+                value = mo.group().decode(errors='replace')
+                length = identifier_length(value)
+                if length < len(value):
+                    # The identifier ends before a character that is not a word character
+                    start = mo.start() + len(value[:length].encode())
+                    raise unexpected_character(source, start, start + len(value[length].encode()), line_num,
+                                               first_line)
+            add_type(group - 1)
+            add_start(mo.start())
+            add_end(mo.end())
+            add_line(line_num)
+            if group == string:
+                line_num += mo.group().count(line_break)  # String literals may span lines
+
+        return stream
 
     def tokenize_file(self, filename: str) -> List[Token]:
         """
@@ -109,6 +376,24 @@ class Lexer:
         Returns:
             List[Token]: A list of Token objects representing the tokenized input.
         """
-        with open(filename, 'r') as file:
-            self.input = file.read()
-        return self.tokenize()
+        source = SourceBuffer.open(filename)
+        try:
+            return list(self.scan_source(source))
+        finally:
+            source.close()
+
+    def iter_tokens_file(self, filename: str) -> Iterator[Token]:
+        """
+        Lazily tokenizes the content of a file, scanning a memory map of it in place.
+
+        Parameters:
+            filename (str): The path to the file to be tokenized.
+
+        Yields:
+            Token: The tokens of the file, in order.
+        """
+        source = SourceBuffer.open(filename)
+        try:
+            yield from self.scan_source(source)
+        finally:
+            source.close()
@@ -1,12 +1,10 @@
-import unittest
+import os
+import sys
 from lexer import Lexer
 from parser import Parser
 from interpreter import Interpreter
 from errors import InterpreterError
-from testLexer import TestLexer
-from testParser import TestParser
-from testInterpreter import TestInterpreter
-from partB_tasks import run_fibonacci, run_concatenate_strings, run_cumulative_sum_of_squares, run_cumulative_operations, run_one_line_filter_map_reduce, run_count_palindromes, lazy_evaluation_example, run_filter_primes
+from source import SourceBuffer
 
 
 def repl():
@@ -14,7 +12,7 @@ def repl():
     parser = Parser([])
     interpreter = Interpreter()
 
-    print("Welcome to the REPL. Type 'exit' to quit.")
+    print("Welcome to the REPL. Type 'exit' to quit, or prefix a line with 'explain' to time it.")
     while True:
         try:
             text = input('> ')
@@ -22,6 +20,9 @@ def repl():
                 continue
             if text.strip() == "exit":
                 break
+            if text.strip().startswith("explain "):
+                explain_line(text.strip()[len("explain "):], parser, interpreter)
+                continue
             tokens = lexer.tokenize(text)
             parser.tokens = tokens
             ast = parser.parse()
@@ -35,12 +36,61 @@ def repl():
             print(f"An unexpected error occurred: {e}")
 
 
-def execute_file(filename):
+def explain_line(text, parser, interpreter):
+    """
+    Evaluates a line entered in the REPL, then prints where its time went.
+
+    Parameters:
+        text (str): The line, without the 'explain' prefix.
+        parser (Parser): The REPL's parser.
+        interpreter (Interpreter): The REPL's interpreter.
+    """
+    from explain import Explainer
+    explainer = Explainer()
+    explainer.install(interpreter)
+    try:
+        for node in explainer.parse(parser.parse_stream(explainer.lex(Lexer().scan_source(SourceBuffer(text))))):
+            result = explainer.evaluate(interpreter, node)
+            if result is not None:
+                print(result)
+    finally:
+        explainer.uninstall(interpreter)
+        print(explainer.format_table())
+
+
+def execute_file(filename, jobs=1, memo_file=None, cache_dir=None, use_cache=True, tracer=None, profiler=None,
+                 allocations=None, explainer=None, meter=None, writer=None):
     """
-    Executes the content of a .lambda file.
+    Executes the content of a .lambda file, printing the result of each statement.
+
+    If a result cache directory is given (or set in the LAMBDA_RESULT_CACHE environment
+    variable), the output of a program is recorded there and replayed without running the
+    program again as long as its tokens do not change.
+
+    If a JsonlWriter is given, a JSON record of each top-level statement is written to it
+    instead of the printed results, and the result cache is not used.
 
     Parameters:
         filename (str): The path to the file to be executed.
+        jobs (int, optional): The number of processes used to lex and parse the file.
+        memo_file (str, optional): The path of a MemoStore database through which function
+                                   results are memoized across runs.
+        cache_dir (str, optional): The directory of the ResultCache to use.
+        use_cache (bool, optional): Whether to use the result cache at all.
+        tracer (Tracer, optional): A tracer to report statements and function calls to.
+                                   Traced runs always evaluate the program.
+        profiler (Profiler, optional): A sampling profiler to run during evaluation.
+                                       Profiled runs always evaluate the program.
+        allocations (AllocationTracker, optional): A tracker of the run's allocations, whose
+                                                   report is printed after the output.
+        explainer (Explainer, optional): An explainer of where the run's time went, whose
+                                         table is printed after the output.
+        meter (Meter, optional): The budgets the run must stay within.
+        writer (JsonlWriter, optional): The writer of the statements' JSON records. Reports
+                                        are then printed to standard error.
+
+    Returns:
+        bool: True if the program ran without errors.
 
     Raises:
         ValueError: If the file does not have a .lambda extension.
@@ -48,34 +98,238 @@ def execute_file(filename):
     if not filename.endswith('.lambda'):
         raise ValueError("File must have a .lambda extension")
 
-    with open(filename, 'r') as file:
-        content = file.read()
+    if writer is not None:
+        from jsonl import write_records
+        try:
+            ok = write_records(run_statements(filename, jobs, memo_file, tracer, profiler, allocations,
+                                              explainer, meter), writer)
+        finally:
+            writer.flush()
+        if allocations is not None:
+            print(allocations.format_report(), file=sys.stderr)
+        if explainer is not None:
+            print(explainer.format_table(), file=sys.stderr)
+        return ok
 
-    lexer = Lexer()
-    parser = Parser([])
-    interpreter = Interpreter()
+    cache_dir = cache_dir or os.environ.get('LAMBDA_RESULT_CACHE')
+    instrumented = tracer is not None or profiler is not None or allocations is not None or explainer is not None
+    # A metered run is not replayed either: its output depends on the budgets as well as the source
+    if not use_cache or not cache_dir or instrumented or meter is not None:
+        output = run_file(filename, jobs, memo_file, tracer, profiler, allocations, explainer, meter)
+        ok = print_output(output)
+        if allocations is not None:
+            print(allocations.format_report())
+        if explainer is not None:
+            print(explainer.format_table())
+        return ok
 
+    from result_cache import ResultCache
+    source = SourceBuffer.open(filename)
     try:
-        tokens = lexer.tokenize(content)
-        parser.tokens = tokens
-        ast = parser.parse()
-        for node in ast:
-            result = interpreter.evaluate(node)
+        cache = ResultCache(cache_dir)
+        return print_output(cache.replay(source, lambda: run_file(filename, jobs, memo_file)))
+    finally:
+        source.close()
+
+
+def print_output(output):
+    """
+    Prints the output of a program.
+
+    Parameters:
+        output (iterable): Each line of output, and whether it is an error message.
+
+    Returns:
+        bool: True if none of the lines was an error message.
+    """
+    ok = True
+    for line, error in output:
+        print(line)
+        ok = ok and not error
+    return ok
+
+
+def run_file(filename, jobs=1, memo_file=None, tracer=None, profiler=None, allocations=None, explainer=None,
+             meter=None):
+    """
+    Runs the content of a .lambda file, yielding its output line by line.
+
+    The file is memory-mapped and lexed, parsed and evaluated as a stream: each top-level
+    statement is evaluated (and its result yielded) as soon as it has been parsed, so output
+    starts immediately and memory use stays flat regardless of the size of the file.
+    With more than one job, the file is instead lexed and parsed up front across that many
+    processes before evaluation starts.
+
+    Parameters:
+        filename (str): The path to the file to be executed.
+        jobs (int, optional): The number of processes used to lex and parse the file.
+        memo_file (str, optional): The path of a MemoStore database through which function
+                                   results are memoized across runs.
+        tracer (Tracer, optional): A tracer to report statements and function calls to.
+        profiler (Profiler, optional): A sampling profiler to run during evaluation.
+        allocations (AllocationTracker, optional): A tracker to count the run's allocations.
+        explainer (Explainer, optional): An explainer to time the run's phases and statements.
+        meter (Meter, optional): The budgets the run must stay within.
+
+    Yields:
+        tuple: Each line of output, and whether it is an error message.
+    """
+    try:
+        for _, result in run_statements(filename, jobs, memo_file, tracer, profiler, allocations, explainer, meter):
             if result is not None:
-                print(result)
+                yield str(result), False
     except InterpreterError as e:
-        print(e)
+        yield str(e), True
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        yield f"An unexpected error occurred: {e}", True
+
+
+def run_statements(filename, jobs=1, memo_file=None, tracer=None, profiler=None, allocations=None,
+                   explainer=None, meter=None):
+    """
+    Runs the content of a .lambda file, yielding each top-level statement with its result.
+
+    This is the evaluation loop behind run_file, which formats the results as text; the
+    first error ends the run and is raised to the caller.
+
+    Parameters:
+        filename (str): The path to the file to be executed.
+        jobs (int, optional): The number of processes used to lex and parse the file.
+        memo_file (str, optional): The path of a MemoStore database through which function
+                                   results are memoized across runs.
+        tracer (Tracer, optional): A tracer to report statements and function calls to.
+        profiler (Profiler, optional): A sampling profiler to run during evaluation.
+        allocations (AllocationTracker, optional): A tracker to count the run's allocations.
+        explainer (Explainer, optional): An explainer to time the run's phases and statements.
+        meter (Meter, optional): The budgets the run must stay within.
+
+    Yields:
+        tuple: Each statement (ASTNode) and its result.
+
+    Raises:
+        InterpreterError: If a statement cannot be lexed, parsed or evaluated.
+    """
+    lexer = Lexer()
+    parser = Parser([])
+    memo_store = None
+    if memo_file:
+        from memo import MemoStore
+        memo_store = MemoStore(memo_file)
+    interpreter = Interpreter(memo_store)
+    if tracer is not None:
+        import tracing
+        tracing.install(interpreter, tracer)
+    if profiler is not None:
+        profiler.start(interpreter)
+    if allocations is not None:
+        allocations.install(interpreter)
+    if explainer is not None:
+        explainer.install(interpreter)
+    if meter is not None:
+        meter.install(interpreter)
+
+    source = None
+    try:
+        source = SourceBuffer.open(filename)
+        parser.source = source
+        interpreter.set_source(source)
+        if jobs > 1:
+            from parallel_frontend import parse_source_parallel
+            statements = parse_source_parallel(source, jobs)
+        else:
+            tokens = lexer.scan_source(source)
+            if allocations is not None:
+                tokens = allocations.count_tokens(tokens)
+            if explainer is not None:
+                tokens = explainer.lex(tokens)
+            statements = parser.parse_stream(tokens)
+        if allocations is not None:
+            statements = allocations.count_nodes(statements)
+        if explainer is not None:
+            statements = explainer.parse(statements)
+        for node in statements:
+            if explainer is not None:
+                result = explainer.evaluate(interpreter, node)
+            elif tracer is None:
+                result = interpreter.evaluate(node)
+            else:
+                result = tracing.evaluate_statement(interpreter, tracer, node)
+            yield node, result
+    finally:
+        if meter is not None:
+            meter.uninstall(interpreter)
+        if explainer is not None:
+            explainer.uninstall(interpreter)
+        if allocations is not None:
+            allocations.uninstall()
+        if profiler is not None:
+            profiler.stop()
+        if memo_store is not None:
+            memo_store.close()
+        if source is not None:
+            source.close()
 
 
 def run_all_tests():
+    """
+    Runs the unit tests of every module, printing a summary.
+
+    Returns:
+        bool: True if all tests passed.
+    """
+    import unittest
+    from testLexer import TestLexer
+    from testParser import TestParser
+    from testInterpreter import TestInterpreter
+    from testSource import TestSource
+    from testParallelFrontend import TestParallelFrontend
+    from testVectorize import TestVectorize
+    from testBatch import TestBatch
+    from testMemo import TestMemo
+    from testResultCache import TestResultCache
+    from testTracing import TestTracing
+    from testProfiler import TestProfiler
+    from testAllocations import TestAllocations
+    from testExplain import TestExplain
+    from testMetering import TestMetering
+    from testSession import TestSession
+    from testPVector import TestPVector
+    from testRope import TestRope
+    from testStream import TestStream
+    from testNatives import TestNatives
+    from testCluster import TestCluster
+    from testJsonl import TestJsonl
+    from testWorkspace import TestWorkspace
+    from testIncremental import TestIncremental
+    from testTranspiler import TestTranspiler
+
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
 
     suite.addTests(loader.loadTestsFromTestCase(TestLexer))
     suite.addTests(loader.loadTestsFromTestCase(TestParser))
     suite.addTests(loader.loadTestsFromTestCase(TestInterpreter))
+    suite.addTests(loader.loadTestsFromTestCase(TestSource))
+    suite.addTests(loader.loadTestsFromTestCase(TestParallelFrontend))
+    suite.addTests(loader.loadTestsFromTestCase(TestVectorize))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestMemo))
+    suite.addTests(loader.loadTestsFromTestCase(TestResultCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestTracing))
+    suite.addTests(loader.loadTestsFromTestCase(TestProfiler))
+    suite.addTests(loader.loadTestsFromTestCase(TestAllocations))
+    suite.addTests(loader.loadTestsFromTestCase(TestExplain))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetering))
+    suite.addTests(loader.loadTestsFromTestCase(TestSession))
+    suite.addTests(loader.loadTestsFromTestCase(TestPVector))
+    suite.addTests(loader.loadTestsFromTestCase(TestRope))
+    suite.addTests(loader.loadTestsFromTestCase(TestStream))
+    suite.addTests(loader.loadTestsFromTestCase(TestNatives))
+    suite.addTests(loader.loadTestsFromTestCase(TestCluster))
+    suite.addTests(loader.loadTestsFromTestCase(TestJsonl))
+    suite.addTests(loader.loadTestsFromTestCase(TestWorkspace))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncremental))
+    suite.addTests(loader.loadTestsFromTestCase(TestTranspiler))
 
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
@@ -88,9 +342,12 @@ def run_all_tests():
         print("All tests passed successfully!")
     else:
         print("Some tests failed or had errors.")
+    return result.wasSuccessful()
 
 
 def main_menu():
+    from partB_tasks import run_fibonacci, run_concatenate_strings, run_cumulative_sum_of_squares, run_cumulative_operations, run_one_line_filter_map_reduce, run_count_palindromes, lazy_evaluation_example, run_filter_primes
+
     while True:
         print("\nMain Menu:")
         print("1. Run all tests")
@@ -146,6 +403,291 @@ def main_menu():
             print("Invalid choice. Please try again.")
 
 
+def evaluate_code(text):
+    """
+    Evaluates code given on the command line, printing the result of each statement.
+
+    Parameters:
+        text (str): The code to evaluate.
+
+    Returns:
+        bool: True if the code ran without errors.
+    """
+    lexer = Lexer()
+    interpreter = Interpreter()
+    interpreter.set_code(text)
+    try:
+        parser = Parser(lexer.tokenize(text))
+        parser.source = interpreter.source
+        for node in parser.parse():
+            result = interpreter.evaluate(node)
+            if result is not None:
+                print(result)
+    except InterpreterError as e:
+        print(e)
+        return False
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return False
+    return True
+
+
+def run_command(args):
+    """
+    Runs the files given to the 'run' command, each in a fresh interpreter.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        int: The exit status: 0 if every file ran without errors, 1 otherwise.
+    """
+    writer = output = None
+    if args.jsonl:
+        from jsonl import JsonlWriter
+        output = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w', encoding='utf-8')
+        writer = JsonlWriter(output)
+
+    ok = True
+    for filename in args.files:
+        tracer = profiler = allocations = explainer = meter = None
+        if args.trace:
+            from tracing import RecordingTracer
+            tracer = RecordingTracer(sample_rate=args.trace_sample, trace_nodes=args.trace_nodes)
+        if args.profile:
+            from profiler import Profiler
+            profiler = Profiler(args.profile_interval)
+        if args.allocations:
+            from allocations import AllocationTracker
+            allocations = AllocationTracker()
+        if args.explain or args.explain_json:
+            from explain import Explainer
+            explainer = Explainer()
+        if args.max_steps is not None or args.max_depth is not None or args.max_environments is not None:
+            from metering import Meter
+            meter = Meter(args.max_steps, args.max_depth, args.max_environments)
+
+        try:
+            ok = execute_file(filename, args.jobs, args.memo, args.cache_dir, not args.no_cache,
+                              tracer, profiler, allocations, explainer, meter, writer) and ok
+        except (ValueError, OSError) as e:
+            print(e, file=sys.stderr)
+            ok = False
+            continue
+
+        if tracer is not None:
+            with open(args.trace, 'w') as file:
+                tracer.write_chrome_trace(file)
+        if profiler is not None:
+            with open(args.profile, 'w') as file:
+                profiler.write_folded(file)
+        if args.explain_json:
+            with open(args.explain_json, 'w') as file:
+                file.write(explainer.to_json())
+    if output is not None and output is not sys.stdout:
+        output.close()
+    return 0 if ok else 1
+
+
+def compile_command(args):
+    """
+    Translates the file given to the 'compile' command into a Python module.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        int: The exit status: 0 if the file was translated, 1 otherwise.
+    """
+    from transpiler import transpile_file
+
+    try:
+        transpile_file(args.file, args.output)
+    except InterpreterError as e:
+        print(e)
+        return 1
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cluster_command(args):
+    """
+    Runs the files given to the 'cluster' command as tasks of a coordinator, on local worker
+    processes and on any remote workers that connect, and prints their output and metrics.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        int: The exit status: 0 if every file ran without errors, 1 otherwise.
+    """
+    from cluster import Coordinator, start_local_workers
+
+    prelude = ''
+    if args.prelude:
+        with open(args.prelude, 'r') as file:
+            prelude = file.read()
+    try:
+        coordinator = Coordinator(args.host, args.port, prelude, args.heartbeat_timeout)
+    except InterpreterError as e:
+        print(e)
+        return 1
+    for filename in args.files:
+        if not filename.endswith('.lambda'):
+            print("File must have a .lambda extension", file=sys.stderr)
+            return 1
+        with open(filename, 'r') as file:
+            coordinator.submit(filename, file.read())
+    coordinator.start()
+    print(f"Coordinator listening on {coordinator.address[0]}:{coordinator.address[1]}", file=sys.stderr)
+    workers = start_local_workers(coordinator.address, args.workers)
+    try:
+        while not coordinator.wait(0.5):
+            if workers and all(worker.poll() is not None for worker in workers) and not coordinator.live_workers():
+                coordinator.fail_remaining("no workers are left to run it")
+    finally:
+        coordinator.close()
+        for worker in workers:
+            worker.wait()
+
+    ok = True
+    for _, output in coordinator.outputs():
+        ok = print_output(output) and ok
+    print(coordinator.format_metrics())
+    if args.metrics_json:
+        import json
+        with open(args.metrics_json, 'w') as file:
+            json.dump(coordinator.metrics(), file)
+    return 0 if ok else 1
+
+
+def worker_command(args):
+    """
+    Runs a worker for the coordinator given to the 'worker' command.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        int: The exit status.
+    """
+    from cluster import run_worker
+
+    host, _, port = args.coordinator.rpartition(':')
+    try:
+        run_worker(host or '127.0.0.1', int(port))
+    except OSError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_argument_parser():
+    """
+    Builds the parser of the command line.
+
+    Returns:
+        argparse.ArgumentParser: The parser, with one subcommand per mode.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='main.py', description="Run programs in the functional language. "
+                                                                 "With no arguments, shows the interactive menu.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="execute .lambda files")
+    run.add_argument('files', nargs='+', metavar='FILE', help="the .lambda files to execute, in order")
+    run.add_argument('-j', '--jobs', type=int, default=1, help="processes used to lex and parse each file")
+    run.add_argument('--memo', metavar='DB', help="memoize function results across runs in this database")
+    run.add_argument('--cache-dir', metavar='DIR', help="replay the output of unchanged programs from this cache")
+    run.add_argument('--no-cache', action='store_true', help="bypass the result cache")
+    run.add_argument('--trace', metavar='JSON', help="write a Chrome trace of the run to this file")
+    run.add_argument('--trace-sample', type=float, default=1.0, metavar='RATE',
+                     help="fraction of top-level statements traced")
+    run.add_argument('--trace-nodes', action='store_true', help="trace the evaluation of every node")
+    run.add_argument('--profile', metavar='FOLDED', help="write sampled call stacks (folded) to this file")
+    run.add_argument('--profile-interval', type=float, default=0.005, metavar='SECONDS',
+                     help="time between profiler samples")
+    run.add_argument('--allocations', action='store_true', help="print an allocation report after each file")
+    run.add_argument('--explain', action='store_true', help="print per-phase and per-statement timings")
+    run.add_argument('--explain-json', metavar='JSON', help="write the timings as JSON to this file")
+    run.add_argument('--max-steps', type=int, help="stop a program after this many evaluation steps")
+    run.add_argument('--max-depth', type=int, help="stop a program beyond this call depth")
+    run.add_argument('--max-environments', type=int, help="stop a program after this many environments")
+    run.add_argument('--jsonl', nargs='?', const='-', metavar='FILE',
+                     help="write a JSON record per statement instead of the results, to this file or stdout")
+
+    evaluate = commands.add_parser('eval', help="evaluate code given on the command line")
+    evaluate.add_argument('code', help="the code to evaluate")
+
+    compile_parser = commands.add_parser('compile', help="translate a .lambda file into a Python module")
+    compile_parser.add_argument('file', metavar='FILE', help="the .lambda file to translate")
+    compile_parser.add_argument('-o', '--output', metavar='PY', help="the module to write (default: FILE with .py)")
+
+    cluster = commands.add_parser('cluster', help="execute .lambda files on a cluster of worker processes")
+    cluster.add_argument('files', nargs='+', metavar='FILE', help="the .lambda files to execute")
+    cluster.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                         help="local worker processes to start (remote workers may connect as well)")
+    cluster.add_argument('--host', default='127.0.0.1', help="the interface the coordinator listens on")
+    cluster.add_argument('--port', type=int, default=0, help="the port the coordinator listens on")
+    cluster.add_argument('--prelude', metavar='FILE', help="definitions shipped once to every worker")
+    cluster.add_argument('--heartbeat-timeout', type=float, default=5.0, metavar='SECONDS',
+                         help="drop a busy worker after this long without a heartbeat")
+    cluster.add_argument('--metrics-json', metavar='JSON', help="write the throughput and latency metrics here")
+
+    worker = commands.add_parser('worker', help="run tasks for a cluster coordinator")
+    worker.add_argument('coordinator', metavar='HOST:PORT', help="the address of the coordinator")
+
+    commands.add_parser('repl', help="start the interactive REPL")
+    commands.add_parser('test', help="run the unit tests")
+
+    bench = commands.add_parser('bench', help="run benchmarks")
+    bench.add_argument('names', nargs='*', metavar='NAME', help="the benchmarks to run (default: all)")
+    return parser
+
+
+def main(argv=None):
+    """
+    The command-line entry point.
+
+    Parameters:
+        argv (list, optional): The command-line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        main_menu()
+        return 0
+
+    args = build_argument_parser().parse_args(argv)
+    if args.command == 'run':
+        return run_command(args)
+    elif args.command == 'eval':
+        return 0 if evaluate_code(args.code) else 1
+    elif args.command == 'compile':
+        return compile_command(args)
+    elif args.command == 'cluster':
+        return cluster_command(args)
+    elif args.command == 'worker':
+        return worker_command(args)
+    elif args.command == 'repl':
+        repl()
+    elif args.command == 'test':
+        return 0 if run_all_tests() else 1
+    elif args.command == 'bench':
+        from benchmarks import run_benchmarks
+        try:
+            run_benchmarks(args.names)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+    return 0
+
+
 if __name__ == "__main__":
-    main_menu()
+    sys.exit(main())
 
@@ -0,0 +1,219 @@
+import hashlib
+import sqlite3
+
+from parser import structure
+
+
+class MemoStore:
+    """
+    A persistent store of function results that survives across runs of the interpreter.
+
+    Results are kept in a SQLite database file, keyed by a hash that combines the structure
+    of the called function's definition and of every function it (transitively) calls with
+    the name of the function and the arguments of the call. Changing any of those
+    definitions therefore changes the key, so stale results are never returned; they are
+    simply never hit again and eventually evicted. The store holds at most max_entries
+    results, evicting the least recently used.
+
+    Only calls whose arguments and result are integers or booleans are memoized, since these
+    are the only values that can be stored faithfully; other calls go straight through.
+
+    Attributes:
+        filename (str): The path of the database file (':memory:' for a store that does not persist).
+        max_entries (int): The maximum number of results kept.
+        hits (int): The number of calls answered from the store.
+        misses (int): The number of memoizable calls that had to be evaluated.
+        evictions (int): The number of results evicted to stay within max_entries.
+    """
+
+    def __init__(self, filename, max_entries=100000, commit_interval=1000):
+        """
+        Opens (or creates) a memo store.
+
+        Parameters:
+            filename (str): The path of the database file.
+            max_entries (int, optional): The maximum number of results kept.
+            commit_interval (int, optional): The number of writes between commits to the file.
+        """
+        self.filename = filename
+        self.max_entries = max_entries
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS memo (key BLOB PRIMARY KEY, value TEXT NOT NULL, used INTEGER NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS memo_used ON memo (used)")
+        self._count, clock = self._connection.execute("SELECT COUNT(*), MAX(used) FROM memo").fetchone()
+        self._clock = clock or 0
+        self._writes = 0
+
+    def close(self):
+        """
+        Commits any pending results and closes the database file.
+        """
+        if self._connection is not None:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def key(definition_hash, name, args):
+        """
+        Builds the key of a call.
+
+        The name of the called function is part of the key: mutually recursive functions
+        depend on the same definitions, and so have the same definition hash.
+
+        Parameters:
+            definition_hash (bytes): The hash of the called function's definitions (see definition_hash).
+            name (str): The name of the called function.
+            args (tuple): The arguments of the call.
+
+        Returns:
+            bytes: The key.
+        """
+        return hashlib.sha256(definition_hash + f"{name}\0{args!r}".encode()).digest()
+
+    def get(self, key):
+        """
+        Looks up a stored result, marking it as recently used.
+
+        Parameters:
+            key (bytes): The key of the call.
+
+        Returns:
+            tuple: (True, result) if the result is stored, (False, None) otherwise.
+        """
+        row = self._connection.execute("SELECT value FROM memo WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self._clock += 1
+        self._connection.execute("UPDATE memo SET used = ? WHERE key = ?", (self._clock, key))
+        self._written()
+        return True, decode(row[0])
+
+    def put(self, key, value):
+        """
+        Stores a result, evicting the least recently used results if the store is full.
+
+        Parameters:
+            key (bytes): The key of the call.
+            value (int | bool): The result of the call.
+        """
+        self._clock += 1
+        cursor = self._connection.execute("INSERT OR REPLACE INTO memo (key, value, used) VALUES (?, ?, ?)",
+                                          (key, repr(value), self._clock))
+        self._count += cursor.rowcount
+        if self._count > self.max_entries:
+            # Evict down to 90% of the limit so eviction does not run on every insertion
+            excess = self._count - self.max_entries * 9 // 10
+            self._connection.execute(
+                "DELETE FROM memo WHERE key IN (SELECT key FROM memo ORDER BY used LIMIT ?)", (excess,))
+            self._count -= excess
+            self.evictions += excess
+        self._written()
+
+    def _written(self):
+        self._writes += 1
+        if self._writes >= self.commit_interval:
+            self._connection.commit()
+            self._writes = 0
+
+    def clear(self):
+        """
+        Removes every stored result.
+        """
+        self._connection.execute("DELETE FROM memo")
+        self._connection.commit()
+        self._count = 0
+
+    def stats(self):
+        """
+        Returns statistics about the use of the store.
+
+        Returns:
+            dict: The number of hits, misses, evictions and stored entries, and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': self._count,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def wrap(self, interpreter, name, func):
+        """
+        Wraps a defined function so that its calls go through the store.
+
+        Parameters:
+            interpreter (Interpreter): The interpreter in which the function is defined.
+            name (str): The name of the function.
+            func (callable): The function.
+
+        Returns:
+            callable: The memoized function.
+        """
+
+        def memoized(*args):
+            for arg in args:
+                if type(arg) is not int and type(arg) is not bool:
+                    return func(*args)
+            key = self.key(interpreter.definition_hash(name), name, args)
+            found, value = self.get(key)
+            if found:
+                return value
+            value = func(*args)
+            if type(value) is int or type(value) is bool:
+                self.put(key, value)
+            return value
+
+        return memoized
+
+
+def definition_hash(definitions):
+    """
+    Hashes the structure of a set of function definitions, ignoring their source positions.
+
+    Parameters:
+        definitions (list): The FunctionDef nodes.
+
+    Returns:
+        bytes: The hash, the same for any order of the definitions.
+    """
+    digest = hashlib.sha256()
+    for node in sorted(definitions, key=lambda node: node.name):
+        digest.update(repr(structure(node)).encode())
+    return digest.digest()
+
+
+def decode(text):
+    """
+    Converts a stored result back into a value.
+
+    Parameters:
+        text (str): The stored representation of the result.
+
+    Returns:
+        int | bool: The result.
+    """
+    if text == 'True':
+        return True
+    if text == 'False':
+        return False
+    return int(text)
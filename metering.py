@@ -0,0 +1,125 @@
+from errors import BudgetExceededError
+
+
+class Meter:
+    """
+    Meters an interpreter against budgets of evaluation steps, call depth and environment
+    allocations, so that a runaway program is stopped with a BudgetExceededError instead of
+    running until it hits Python's recursion limit or is killed.
+
+    Installing the meter on an interpreter overrides, on that instance only, the methods
+    needed by the budgets that are set: evaluate (one step per node) for the steps budget,
+    eval_function_call for the depth and environments budgets, and the environment class for
+    the environments budget. Budgets that are not set add no work at all, but those that are
+    set add a Python-level call per node (steps) or per call (depth and environments). On a
+    tight recursive function (python main.py bench metering) a single budget costs under 10%,
+    as the override also saves the method binding of the normal lookup, but all three
+    together cost 60-75%.
+
+    Budgets apply to everything evaluated while the meter is installed, e.g. a whole file.
+
+    Attributes:
+        max_steps (int): The maximum number of nodes evaluated, or None for no limit.
+        max_depth (int): The maximum call depth, or None for no limit.
+        max_environments (int): The maximum number of environments created, or None for no limit.
+        depth (int): The current call depth (only tracked with a depth or environments budget).
+        environments (int): The number of environments created so far (only counted with an
+                            environments budget).
+    """
+
+    def __init__(self, max_steps=None, max_depth=None, max_environments=None):
+        """
+        Initializes the Meter.
+
+        Parameters:
+            max_steps (int, optional): The maximum number of nodes evaluated.
+            max_depth (int, optional): The maximum call depth.
+            max_environments (int, optional): The maximum number of environments created.
+        """
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.max_environments = max_environments
+        self._remaining_steps = max_steps
+        self.depth = 0
+        self.environments = 0
+
+    @property
+    def steps(self):
+        """
+        The number of nodes evaluated so far (only counted with a steps budget).
+        """
+        return self.max_steps - self._remaining_steps if self.max_steps is not None else 0
+
+    def install(self, interpreter):
+        """
+        Starts metering an interpreter.
+
+        Parameters:
+            interpreter (Interpreter): The interpreter to meter.
+        """
+        meter = self
+
+        if self.max_steps is not None:
+            evaluate = interpreter.evaluate
+
+            def metered_evaluate(node, env=None):
+                meter._remaining_steps -= 1
+                if meter._remaining_steps < 0:
+                    meter._remaining_steps = 0
+                    raise BudgetExceededError('steps', meter.max_steps, node.line, node.column,
+                                              interpreter.get_context(node))
+                return evaluate(node, env)
+
+            interpreter.evaluate = metered_evaluate
+
+        if self.max_environments is not None:
+            class MeteredEnvironment(interpreter.environment_class):
+                def __init__(self, parent=None):
+                    meter.environments += 1
+                    if meter.environments > meter.max_environments:
+                        meter.environments = meter.max_environments
+                        # The position is that of the call, filled in by metered_function_call
+                        raise BudgetExceededError('environments', meter.max_environments)
+                    super().__init__(parent)
+
+            interpreter.environment_class = MeteredEnvironment
+
+        if self.max_depth is not None or self.max_environments is not None:
+            # A single wrapper both counts the depth and locates the environments budget errors
+            eval_function_call = interpreter.eval_function_call
+            max_depth = self.max_depth if self.max_depth is not None else float('inf')
+
+            def metered_function_call(node, env):
+                meter.depth += 1
+                try:
+                    if meter.depth > max_depth:
+                        raise BudgetExceededError('depth', max_depth, node.line, node.column,
+                                                  interpreter.get_context(node))
+                    return eval_function_call(node, env)
+                except BudgetExceededError as e:
+                    if e.line is None:
+                        raise BudgetExceededError(e.budget, e.limit, node.line, node.column,
+                                                  interpreter.get_context(node)) from None
+                    raise
+                finally:
+                    meter.depth -= 1
+
+            interpreter.eval_function_call = metered_function_call
+
+    def uninstall(self, interpreter):
+        """
+        Stops metering an interpreter, restoring its methods.
+
+        Parameters:
+            interpreter (Interpreter): The metered interpreter.
+        """
+        for name in ('evaluate', 'eval_function_call', 'environment_class'):
+            interpreter.__dict__.pop(name, None)
+
+    def reset(self):
+        """
+        Restores the full budgets, e.g. before running another program.
+        """
+        self._remaining_steps = self.max_steps
+        self.depth = 0
+        self.environments = 0
@@ -0,0 +1,228 @@
+import math
+
+from pvector import PersistentVector, vector_get, vector_append, vector_update
+from rope import Rope
+from stream import stream_range, stream_map, stream_filter, stream_take, stream_reduce, stream_list
+
+
+class NativeFunction:
+    """
+    A function of the language implemented in Python.
+
+    Calls of native functions are recognized by Interpreter.eval_function_call, which checks
+    the number of arguments and calls the Python function directly: no environment is
+    created and no AST is evaluated.
+
+    Attributes:
+        name (str): The name of the function in the language.
+        func (callable): The Python function.
+        arity (tuple): The minimum and maximum numbers of arguments; the maximum is None
+                       for a function taking any number of arguments.
+        pure (bool): Whether the result depends only on the arguments, with no side
+                     effects, so that calls can be memoized.
+    """
+
+    __slots__ = ('name', 'func', 'arity', 'pure')
+
+    def __init__(self, name, func, arity, pure=True):
+        """
+        Initializes a NativeFunction.
+
+        Parameters:
+            name (str): The name of the function in the language.
+            func (callable): The Python function.
+            arity (int | tuple): The number of arguments, or the minimum and maximum numbers
+                                 of arguments (None for no maximum).
+            pure (bool, optional): Whether the result depends only on the arguments.
+        """
+        self.name = name
+        self.func = func
+        self.arity = (arity, arity) if isinstance(arity, int) else tuple(arity)
+        self.pure = pure
+
+    def check_arity(self, count):
+        """
+        Checks the number of arguments of a call.
+
+        Parameters:
+            count (int): The number of arguments.
+
+        Raises:
+            TypeError: If the function does not take that many arguments.
+        """
+        minimum, maximum = self.arity
+        if count < minimum or (maximum is not None and count > maximum):
+            if minimum == maximum:
+                expected = str(minimum)
+            elif maximum is None:
+                expected = f"at least {minimum}"
+            else:
+                expected = f"{minimum} to {maximum}"
+            plural = 's' if (maximum if maximum is not None else minimum) != 1 else ''
+            raise TypeError(f"{self.name} expects {expected} argument{plural}, got {count}")
+
+    def __call__(self, *args):
+        # Calls from Python, e.g. by map or reduce; calls in the language take the fast path
+        self.check_arity(len(args))
+        return self.func(*args)
+
+    def __repr__(self):
+        return f"<native function {self.name}>"
+
+
+# The native functions predefined in the global environment of every interpreter, by name
+REGISTRY = {}
+
+
+def register(name, arity, pure=True):
+    """
+    Returns a decorator registering a Python function as a native function of the language.
+
+    Parameters:
+        name (str): The name of the function in the language.
+        arity (int | tuple): The number of arguments, or the minimum and maximum numbers
+                             of arguments (None for no maximum).
+        pure (bool, optional): Whether the result depends only on the arguments.
+
+    Returns:
+        callable: The decorator, which returns the Python function unchanged.
+    """
+    def decorator(func):
+        REGISTRY[name] = NativeFunction(name, func, arity, pure)
+        return func
+    return decorator
+
+
+def install(env):
+    """
+    Defines the registered native functions in an environment.
+
+    Parameters:
+        env (Environment): The environment, usually an interpreter's global environment.
+    """
+    for name, native in REGISTRY.items():
+        env.define(name, native)
+
+
+def check_integers(name, *values):
+    # Raises a TypeError unless all values are integers (booleans count as 0 and 1, as in arithmetic)
+    for value in values:
+        if not isinstance(value, int):
+            raise TypeError(f"{name} expects integers, got {type(value).__name__}")
+
+
+# Sequences
+
+@register('len', 1)
+def sequence_len(sequence):
+    """
+    The number of elements of a list or characters of a string.
+    """
+    if not isinstance(sequence, (PersistentVector, Rope)):
+        raise TypeError(f"len expects a list or string, got {type(sequence).__name__}")
+    return len(sequence)
+
+
+@register('slice', 3)
+def sequence_slice(sequence, start, stop):
+    """
+    The part of a list or string from start up to (excluding) stop.
+    """
+    if not isinstance(sequence, (PersistentVector, Rope)):
+        raise TypeError(f"slice expects a list or string, got {type(sequence).__name__}")
+    return sequence.slice(start, stop)
+
+
+register('get', 2)(vector_get)
+register('append', 2)(vector_append)
+register('update', 3)(vector_update)
+
+# Streams
+register('range', (1, 2))(stream_range)
+register('map', 2)(stream_map)
+register('filter', 2)(stream_filter)
+register('take', 2)(stream_take)
+register('reduce', 3)(stream_reduce)
+register('list', 1)(stream_list)
+
+
+# Numbers
+
+@register('abs', 1)
+def native_abs(x):
+    """
+    The absolute value of x.
+    """
+    check_integers('abs', x)
+    return abs(x)
+
+
+@register('min', (1, None))
+def native_min(*values):
+    """
+    The smallest of the arguments.
+    """
+    check_integers('min', *values)
+    return min(values)
+
+
+@register('max', (1, None))
+def native_max(*values):
+    """
+    The largest of the arguments.
+    """
+    check_integers('max', *values)
+    return max(values)
+
+
+@register('pow', (2, 3))
+def native_pow(base, exponent, modulus=None):
+    """
+    base to the power of exponent, reduced modulo modulus if given.
+    """
+    check_integers('pow', base, exponent, *([] if modulus is None else [modulus]))
+    if exponent < 0:
+        raise ValueError("pow expects a non-negative exponent")
+    if modulus == 0:
+        raise ValueError("Modulo by zero")
+    return pow(base, exponent, modulus)
+
+
+@register('isqrt', 1)
+def native_isqrt(n):
+    """
+    The integer square root of n: the largest integer whose square is at most n.
+    """
+    check_integers('isqrt', n)
+    if n < 0:
+        raise ValueError("isqrt expects a non-negative number")
+    return math.isqrt(n)
+
+
+@register('gcd', 2)
+def native_gcd(a, b):
+    """
+    The greatest common divisor of a and b.
+    """
+    check_integers('gcd', a, b)
+    return math.gcd(a, b)
+
+
+@register('lcm', 2)
+def native_lcm(a, b):
+    """
+    The least common multiple of a and b.
+    """
+    check_integers('lcm', a, b)
+    return math.lcm(a, b)
+
+
+@register('factorial', 1)
+def native_factorial(n):
+    """
+    The product of the integers from 1 to n.
+    """
+    check_integers('factorial', n)
+    if n < 0:
+        raise ValueError("factorial expects a non-negative number")
+    return math.factorial(n)
@@ -0,0 +1,180 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import Lexer
+from parser import Parser
+from source import SourceBuffer
+
+
+# String literals are matched as a whole so that a line break inside one is never taken for a boundary.
+# A boundary is the start of a line whose first token cannot continue the expression of the line
+# before: an identifier or keyword (other than the infix 'and', 'or' and 'not'), a number, a string
+# literal or a list literal.
+SPLIT_PATTERN = r"""'[^']*'|"[^"]*"|^(?!and|or|not)[\w\[]"""
+SPLIT_REGEX = re.compile(SPLIT_PATTERN, re.MULTILINE)
+BYTES_SPLIT_REGEX = re.compile(SPLIT_PATTERN.encode(), re.MULTILINE)  # For memory-mapped files
+
+
+def split_statements(source, chunks):
+    """
+    Splits source code into roughly equal chunks at likely top-level statement boundaries.
+
+    A boundary is the start of a line, outside of any string literal, whose first token
+    cannot continue an expression (see SPLIT_PATTERN), so a statement complete at the end of
+    one chunk is also where a sequential parse ends it. A line that is not really the start
+    of a statement (e.g. one inside a bracket, after a dangling operator, or the body of a
+    Defun on the line after its header) leaves the chunk before it incomplete, which fails
+    to parse, and parse_parallel then falls back to a sequential parse of the whole source.
+
+    Parameters:
+        source (SourceBuffer): The source code to split.
+        chunks (int): The desired number of chunks.
+
+    Returns:
+        list: A list of (start offset, end offset, first line number) tuples covering the source.
+    """
+    data = source.data
+    size = len(data) // max(1, chunks)
+    newline = '\n' if isinstance(data, str) else b'\n'
+    bounds = [0]
+    target = size
+    for mo in (SPLIT_REGEX if isinstance(data, str) else BYTES_SPLIT_REGEX).finditer(data):
+        if len(bounds) >= chunks:
+            break
+        start = mo.start()
+        if start >= target and data[start - 1:start] == newline:
+            bounds.append(start)
+            target = start + size
+    bounds.append(len(data))
+    return [(start, end, source.position(start)[0]) for start, end in zip(bounds, bounds[1:])]
+
+
+def parse_chunk(chunk, first_line):
+    """
+    Lexes and parses one chunk of a larger source, numbering lines from first_line.
+
+    Parameters:
+        chunk (str | bytes): The source code of the chunk, as text or as UTF-8 bytes.
+        first_line (int): The line number of the chunk's first line in the whole source.
+
+    Returns:
+        list: The AST nodes of the chunk's top-level statements.
+    """
+    tokens = Lexer().scan_source_compact(SourceBuffer(chunk), first_line)
+    return Parser(tokens).parse()
+
+
+def parse_file_chunk(filename, start, end, first_line):
+    """
+    Lexes and parses one chunk of a file, read from a memory map of the file.
+
+    Parameters:
+        filename (str): The path to the file.
+        start (int): The offset at which the chunk starts.
+        end (int): The offset at which the chunk ends.
+        first_line (int): The line number of the chunk's first line in the file.
+
+    Returns:
+        list: The AST nodes of the chunk's top-level statements.
+    """
+    source = SourceBuffer.open(filename)
+    try:
+        return parse_chunk(source.data[start:end], first_line)
+    finally:
+        source.close()
+
+
+def parse_parallel(text, workers=None, min_chunk_size=1 << 20):
+    """
+    Lexes and parses source code across a pool of processes.
+
+    Parameters:
+        text (str): The source code to parse.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        min_chunk_size (int, optional): The smallest chunk, in characters, worth a process of its own.
+
+    Returns:
+        list: The AST nodes of all top-level statements, as Parser.parse would return them.
+
+    Raises:
+        InterpreterError: If there is a syntax error, reported exactly as a sequential parse would.
+    """
+    return parse_source_parallel(SourceBuffer(text), workers, min_chunk_size)
+
+
+def parse_source_parallel(source, workers=None, min_chunk_size=1 << 20):
+    """
+    Lexes and parses a source buffer across a pool of processes.
+
+    The source is split at statement boundaries into one chunk per worker, each chunk is
+    lexed and parsed in its own process with absolute line numbers, and the resulting
+    statements are concatenated in order. Workers map a file-backed source themselves and
+    only receive the offsets of their chunk, so the file is never read into memory as a
+    whole. Sources too small to be worth splitting are parsed in the current process.
+
+    Parameters:
+        source (SourceBuffer): The source code to parse.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        min_chunk_size (int, optional): The smallest chunk, in bytes or characters, worth a
+                                        process of its own.
+
+    Returns:
+        list: The AST nodes of all top-level statements, as Parser.parse would return them.
+
+    Raises:
+        InterpreterError: If there is a syntax error, reported exactly as a sequential parse would.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_statements(source, min(workers, len(source.data) // min_chunk_size))
+    if len(chunks) <= 1:
+        return parse_sequential(source)
+
+    try:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            if source.filename is not None and not isinstance(source.data, str):
+                results = executor.map(parse_file_chunk, [source.filename] * len(chunks),
+                                       *zip(*chunks))
+            else:
+                results = executor.map(parse_chunk, [source.data[start:end] for start, end, _ in chunks],
+                                       [line for _, _, line in chunks])
+            return [node for statements in results for node in statements]
+    except Exception:
+        # A chunk that fails to parse may be a symptom of an error elsewhere in the file
+        return parse_sequential(source)
+
+
+def parse_sequential(text):
+    """
+    Lexes and parses source code in the current process.
+
+    Parameters:
+        text (str | SourceBuffer): The source code to parse.
+
+    Returns:
+        list: The AST nodes of all top-level statements.
+    """
+    lexer = Lexer()
+    source = text if isinstance(text, SourceBuffer) else SourceBuffer(text)
+    parser = Parser(lexer.scan_source_compact(source))
+    parser.source = source
+    return parser.parse()
+
+
+def parse_file_parallel(filename, workers=None, min_chunk_size=1 << 20):
+    """
+    Lexes and parses a file across a pool of processes, reading it through a memory map.
+
+    Parameters:
+        filename (str): The path to the file.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        min_chunk_size (int, optional): The smallest chunk, in bytes, worth a process of its own.
+
+    Returns:
+        list: The AST nodes of all top-level statements.
+    """
+    source = SourceBuffer.open(filename)
+    try:
+        return parse_source_parallel(source, workers, min_chunk_size)
+    finally:
+        source.close()
@@ -55,6 +55,24 @@ class Bool(ASTNode):
         self.value = value
 
 
+class String(ASTNode):
+    """
+    AST node for string literals.
+    """
+
+    def __init__(self, value, line, column):
+        """
+        Initializes a String node.
+
+        Parameters:
+            value (str): The text of the string, without quotes.
+            line (int): The line number where the node is found.
+            column (int): The column number where the node starts.
+        """
+        super().__init__(line, column)
+        self.value = value
+
+
 class BinaryOp(ASTNode):
     """
     AST node for binary operations.
@@ -177,6 +195,94 @@ class Identifier(ASTNode):
         self.name = name
 
 
+class ListLiteral(ASTNode):
+    """
+    AST node for list literals.
+    """
+
+    def __init__(self, elements, line, column):
+        """
+        Initializes a ListLiteral node.
+
+        Parameters:
+            elements (list): The expressions of the elements of the list.
+            line (int): The line number where the node is found.
+            column (int): The column number where the node starts.
+        """
+        super().__init__(line, column)
+        self.elements = elements
+
+
+def iter_child_nodes(node):
+    """
+    Yields the direct children of an AST node.
+
+    Parameters:
+        node (ASTNode): The node whose children to yield.
+
+    Yields:
+        ASTNode: Each child node, in attribute order.
+    """
+    for value in vars(node).values():
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item
+
+
+def walk(node):
+    """
+    Yields an AST node and all of its descendants.
+
+    Parameters:
+        node (ASTNode): The root of the tree to walk.
+
+    Yields:
+        ASTNode: Every node of the tree, parents before children.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(iter_child_nodes(node))))
+
+
+def structure(node):
+    """
+    Returns a canonical representation of an AST that ignores source positions, so that two
+    trees that differ only in layout have equal structures.
+
+    Parameters:
+        node: The AST node (or list of nodes, or literal value) to represent.
+
+    Returns:
+        tuple: Nested tuples of node type names and attribute values.
+    """
+    if isinstance(node, ASTNode):
+        return (type(node).__name__,) + tuple((name, structure(value)) for name, value in vars(node).items()
+                                              if name not in ('line', 'column'))
+    if isinstance(node, list):
+        return tuple(structure(item) for item in node)
+    return node
+
+
+# Binding powers of the infix operators; operator values are unique across token types
+BOOLEAN_POWER = 1
+COMPARISON_POWER = 2
+ADDITIVE_POWER = 3
+MULTIPLICATIVE_POWER = 4
+INFIX_BINDING_POWERS = {
+    'and': BOOLEAN_POWER, 'or': BOOLEAN_POWER, 'not': BOOLEAN_POWER,
+    '==': COMPARISON_POWER, '!=': COMPARISON_POWER, '<': COMPARISON_POWER,
+    '<=': COMPARISON_POWER, '>': COMPARISON_POWER, '>=': COMPARISON_POWER,
+    '+': ADDITIVE_POWER, '-': ADDITIVE_POWER,
+    '*': MULTIPLICATIVE_POWER, '/': MULTIPLICATIVE_POWER, '%': MULTIPLICATIVE_POWER,
+}
+PREFIX_OPERATORS = {'not', '+', '-'}
+
+
 class Parser:
     """
     The Parser class is responsible for parsing a list of tokens and creating an Abstract Syntax Tree (AST).
@@ -184,6 +290,8 @@ class Parser:
     Attributes:
         tokens (list): The list of tokens to parse.
         pos (int): The current position in the token list.
+        stream (iterator): When parsing a stream, the iterator that supplies further tokens on demand.
+        source (SourceBuffer): The source the tokens were read from, if known; used for error context.
     """
 
     def __init__(self, tokens):
@@ -195,6 +303,51 @@ class Parser:
         """
         self.tokens = tokens
         self.pos = 0
+        self.stream = None
+        self.source = None
+        self.prefix_parsers = {
+            'NUMBER': self.parse_number,
+            'BOOL': self.parse_bool,
+            'STRING': self.parse_string,
+            'LPAREN': self.parse_group,
+            'LBRACKET': self.parse_list,
+            'ID': self.parse_identifier,
+            'LAMBDA': self.parse_lambda_factor,
+            'BOOL_OP': self.parse_prefix_op,
+            'OP': self.parse_prefix_op,
+        }
+
+    def has_token(self):
+        """
+        Checks whether a token is available at the current position, pulling one more token
+        from the stream source if the buffered tokens are exhausted.
+
+        Returns:
+            bool: True if there is a token at the current position.
+        """
+        if self.pos < len(self.tokens):
+            return True
+        if self.stream is not None:
+            token = next(self.stream, None)
+            if token is None:
+                self.stream = None
+                return False
+            self.tokens.append(token)
+            return self.pos < len(self.tokens)
+        return False
+
+    def peek(self):
+        """
+        Returns the token at the current position without consuming it.
+
+        Returns:
+            Token: The current token.
+
+        Raises:
+            IndexError: If there are no more tokens.
+        """
+        self.has_token()
+        return self.tokens[self.pos]
 
     def parse(self):
         """
@@ -207,11 +360,38 @@ class Parser:
             InterpreterError: If there is a syntax error in the input tokens.
         """
         self.pos = 0  # Reset position
+        self.stream = None
         result = []
-        while self.pos < len(self.tokens):
+        while self.has_token():
             result.append(self.parse_statement())
         return result
 
+    def parse_stream(self, tokens):
+        """
+        Parses a stream of tokens lazily, yielding one top-level statement at a time.
+
+        Tokens are pulled from the iterator only as far as the parser needs to look ahead
+        (one token past the current statement), and the tokens of each statement are discarded
+        once it has been parsed, so memory use does not grow with the length of the stream.
+
+        Parameters:
+            tokens (iterable): An iterable of tokens, e.g. the generator returned by Lexer.iter_tokens_file.
+
+        Yields:
+            ASTNode: The AST node of each top-level statement, in order.
+
+        Raises:
+            InterpreterError: If there is a syntax error in the input tokens.
+        """
+        self.tokens = []
+        self.pos = 0
+        self.stream = iter(tokens)
+        while self.has_token():
+            node = self.parse_statement()
+            del self.tokens[:self.pos]
+            self.pos = 0
+            yield node
+
     def parse_statement(self):
         """
         Parses a single statement from the list of tokens.
@@ -252,52 +432,52 @@ class Parser:
         """
         start_token = self.tokens[self.pos]
         self.pos += 1  # skip 'Defun'
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'LCURLY':
+        if not self.has_token() or self.tokens[self.pos].type != 'LCURLY':
             context = self.get_context(start_token)
             raise InterpreterError("Expected '{' after 'Defun'", start_token.line, start_token.column, context)
         self.pos += 1  # skip '{'
 
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'STRING':
+        if not self.has_token() or self.tokens[self.pos].type != 'STRING':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected string for function name", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip 'name' key
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'COLON':
+        if not self.has_token() or self.tokens[self.pos].type != 'COLON':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected ':' after 'name'", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip ':'
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'STRING':
+        if not self.has_token() or self.tokens[self.pos].type != 'STRING':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected string for function name", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         function_name = self.tokens[self.pos].value.strip("'")
         self.pos += 1  # skip function name
 
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'COMMA':
+        if not self.has_token() or self.tokens[self.pos].type != 'COMMA':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected ',' after function name", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip ','
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'STRING' or self.tokens[
+        if not self.has_token() or self.tokens[self.pos].type != 'STRING' or self.tokens[
             self.pos].value != "'arguments'":
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected 'arguments' key", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip 'arguments' key
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'COLON':
+        if not self.has_token() or self.tokens[self.pos].type != 'COLON':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected ':' after 'arguments'", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip ':'
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'LPAREN':
+        if not self.has_token() or self.tokens[self.pos].type != 'LPAREN':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected '(' for argument list", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip '('
 
         params = []
-        while self.pos < len(self.tokens) and self.tokens[self.pos].type != 'RPAREN':
+        while self.has_token() and self.tokens[self.pos].type != 'RPAREN':
             param_token = self.tokens[self.pos]
             if param_token.type != 'ID':
                 context = self.get_context(param_token)
@@ -305,15 +485,15 @@ class Parser:
                                        param_token.line, param_token.column, context)
             params.append(param_token.value)
             self.pos += 1
-            if self.pos < len(self.tokens) and self.tokens[self.pos].type == 'COMMA':
+            if self.has_token() and self.tokens[self.pos].type == 'COMMA':
                 self.pos += 1  # skip ','
 
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'RPAREN':
+        if not self.has_token() or self.tokens[self.pos].type != 'RPAREN':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected ')' to close argument list", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
         self.pos += 1  # skip ')'
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'RCURLY':
+        if not self.has_token() or self.tokens[self.pos].type != 'RCURLY':
             context = self.get_context(self.tokens[self.pos - 1])
             raise InterpreterError("Expected '}' to close function definition", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column, context)
@@ -334,7 +514,7 @@ class Parser:
         """
         start_token = self.tokens[self.pos]
         self.pos += 1  # skip 'Lambda'
-        if self.tokens[self.pos].type != 'LPAREN':
+        if self.peek().type != 'LPAREN':
             raise InterpreterError("Expected '(' after 'Lambda'", self.tokens[self.pos].line,
                                    self.tokens[self.pos].column)
         params = self.parse_params()
@@ -342,7 +522,7 @@ class Parser:
         lambda_node = Lambda(params, body, start_token.line, start_token.column)
 
         # Check if the lambda is immediately called
-        if self.pos < len(self.tokens) and self.tokens[self.pos].type == 'LPAREN':
+        if self.has_token() and self.tokens[self.pos].type == 'LPAREN':
             return self.parse_function_call(lambda_node)
         return lambda_node
 
@@ -357,11 +537,11 @@ class Parser:
             InterpreterError: If there is a syntax error in the parameter list.
         """
         params = []
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'LPAREN':
+        if not self.has_token() or self.tokens[self.pos].type != 'LPAREN':
             raise InterpreterError("Expected '(' at the start of parameters", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column)
         self.pos += 1  # skip '('
-        while self.pos < len(self.tokens) and self.tokens[self.pos].type != 'RPAREN':
+        while self.has_token() and self.tokens[self.pos].type != 'RPAREN':
             if self.tokens[self.pos].type == 'ID':
                 param = self.tokens[self.pos]
                 params.append(param.value)
@@ -369,9 +549,9 @@ class Parser:
             else:
                 raise InterpreterError("Expected identifier in parameter list", self.tokens[self.pos].line,
                                        self.tokens[self.pos].column)
-            if self.tokens[self.pos].type == 'COMMA':
+            if self.peek().type == 'COMMA':
                 self.pos += 1  # skip ','
-        if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'RPAREN':
+        if not self.has_token() or self.tokens[self.pos].type != 'RPAREN':
             raise InterpreterError("Expected ')' at the end of parameters", self.tokens[self.pos - 1].line,
                                    self.tokens[self.pos - 1].column)
         self.pos += 1  # skip ')'
@@ -399,18 +579,63 @@ class Parser:
             name = func
 
         args = []
-        if self.pos < len(self.tokens) and self.tokens[self.pos].type == 'LPAREN':
+        if self.has_token() and self.tokens[self.pos].type == 'LPAREN':
             self.pos += 1  # skip '('
-            while self.pos < len(self.tokens) and self.tokens[self.pos].type != 'RPAREN':
+            while self.has_token() and self.tokens[self.pos].type != 'RPAREN':
                 args.append(self.parse_expression())
-                if self.tokens[self.pos].type == 'COMMA':
+                if self.peek().type == 'COMMA':
                     self.pos += 1  # skip ','
-            if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'RPAREN':
+            if not self.has_token() or self.tokens[self.pos].type != 'RPAREN':
                 raise InterpreterError("Expected ')' after arguments in function call", self.tokens[self.pos - 1].line,
                                        self.tokens[self.pos - 1].column)
             self.pos += 1  # skip ')'
         return FunctionCall(name, args, start_token.line, start_token.column)
 
+    def parse_expression(self, min_power=0, expr=None):
+        """
+        Parses an expression by precedence climbing (Pratt parsing).
+
+        The expression starts with a prefix construct (see parse_factor), after which infix
+        operators are consumed for as long as they bind more tightly than min_power. The
+        binding powers in INFIX_BINDING_POWERS reproduce the language's precedence levels,
+        from loosest to tightest: boolean operators, comparisons, additive and multiplicative
+        operators, all left-associative. The parser only recurses for a right operand that is
+        followed by a tighter-binding operator, so a flat expression like '1 + 2 + 3' is parsed
+        in a single loop.
+
+        Parameters:
+            min_power (int, optional): Only operators binding more tightly than this are consumed.
+            expr (ASTNode, optional): An already parsed left operand to continue from.
+
+        Returns:
+            ASTNode: The corresponding AST node for the expression.
+
+        Raises:
+            InterpreterError: If there is a syntax error in the expression.
+        """
+        tokens = self.tokens
+        powers = INFIX_BINDING_POWERS
+        if expr is None:
+            expr = self.parse_factor()
+
+        while self.pos < len(tokens) or self.has_token():
+            op_token = tokens[self.pos]
+            power = powers.get(op_token.value)
+            if power is None or power <= min_power:
+                break
+            self.pos += 1
+            right = self.parse_factor()
+            if self.pos < len(tokens) or self.has_token():
+                next_power = powers.get(tokens[self.pos].value)
+                if next_power is not None and next_power > power:
+                    right = self.parse_expression(power, right)
+            if op_token.value == 'not':
+                # 'not' in infix position negates its right operand and drops the left one
+                expr = UnaryOp('not', right, op_token.line, op_token.column)
+            else:
+                expr = BinaryOp(expr, op_token.value, right, op_token.line, op_token.column)
+        return expr
+
     def parse_boolean_expression(self):
         """
         Parses a boolean expression.
@@ -421,18 +646,7 @@ class Parser:
         Raises:
             InterpreterError: If there is a syntax error in the boolean expression.
         """
-        expr = self.parse_comparison()
-        while self.pos < len(self.tokens) and self.tokens[self.pos].type == 'BOOL_OP':
-            op = self.tokens[self.pos].value
-            op_token = self.tokens[self.pos]
-            self.pos += 1
-            if op == 'not':
-                right = self.parse_comparison()
-                expr = UnaryOp(op, right, op_token.line, op_token.column)
-            else:
-                right = self.parse_comparison()
-                expr = BinaryOp(expr, op, right, op_token.line, op_token.column)
-        return expr
+        return self.parse_expression(0)
 
     def parse_comparison(self):
         """
@@ -444,14 +658,7 @@ class Parser:
         Raises:
             InterpreterError: If there is a syntax error in the comparison expression.
         """
-        expr = self.parse_arithmetic()
-        while self.pos < len(self.tokens) and self.tokens[self.pos].type == 'COMP_OP':
-            op = self.tokens[self.pos].value
-            op_token = self.tokens[self.pos]
-            self.pos += 1
-            right = self.parse_arithmetic()
-            expr = BinaryOp(expr, op, right, op_token.line, op_token.column)
-        return expr
+        return self.parse_expression(BOOLEAN_POWER)
 
     def parse_arithmetic(self):
         """
@@ -463,15 +670,7 @@ class Parser:
         Raises:
             InterpreterError: If there is a syntax error in the arithmetic expression.
         """
-        expr = self.parse_term()
-        while self.pos < len(self.tokens) and self.tokens[self.pos].type == 'OP' and self.tokens[self.pos].value in [
-            '+', '-']:
-            op = self.tokens[self.pos].value
-            op_token = self.tokens[self.pos]
-            self.pos += 1
-            right = self.parse_term()
-            expr = BinaryOp(expr, op, right, op_token.line, op_token.column)
-        return expr
+        return self.parse_expression(COMPARISON_POWER)
 
     def parse_term(self):
         """
@@ -483,19 +682,12 @@ class Parser:
         Raises:
             InterpreterError: If there is a syntax error in the term.
         """
-        expr = self.parse_factor()
-        while self.pos < len(self.tokens) and self.tokens[self.pos].type == 'OP' and self.tokens[self.pos].value in [
-            '*', '/', '%']:
-            op = self.tokens[self.pos].value
-            op_token = self.tokens[self.pos]
-            self.pos += 1
-            right = self.parse_factor()
-            expr = BinaryOp(expr, op, right, op_token.line, op_token.column)
-        return expr
+        return self.parse_expression(ADDITIVE_POWER)
 
     def parse_factor(self):
         """
-        Parses a factor in an arithmetic expression.
+        Parses a factor: a literal (number, boolean or string), identifier, function call,
+        parenthesized expression, list, lambda or prefix operation, dispatching on the type of the current token.
 
         Returns:
             ASTNode: The corresponding AST node for the factor.
@@ -503,58 +695,151 @@ class Parser:
         Raises:
             InterpreterError: If there is a syntax error in the factor.
         """
-        if self.pos >= len(self.tokens):
+        if self.pos >= len(self.tokens) and not self.has_token():
             raise InterpreterError("Unexpected end of input", self.tokens[-1].line, self.tokens[-1].column)
 
         token = self.tokens[self.pos]
-        if token.type == 'NUMBER':
-            self.pos += 1
-            return Number(token.value, token.line, token.column)
-        elif token.type == 'BOOL':
-            self.pos += 1
-            return Bool(token.value, token.line, token.column)
-        elif token.type == 'LPAREN':
-            self.pos += 1  # skip '('
-            expr = self.parse_expression()
-            if self.pos >= len(self.tokens) or self.tokens[self.pos].type != 'RPAREN':
-                raise InterpreterError("Expected ')' to close expression", self.tokens[self.pos - 1].line,
-                                       self.tokens[self.pos - 1].column)
-            self.pos += 1  # skip ')'
-            # Check if this is a function call
-            if self.pos < len(self.tokens) and self.tokens[self.pos].type == 'LPAREN':
-                return self.parse_function_call(expr)
-            return expr
-        elif token.type == 'ID':
-            self.pos += 1
-            if self.pos < len(self.tokens) and self.tokens[self.pos].type == 'LPAREN':
-                self.pos -= 1  # go back to parse function call
-                return self.parse_function_call()
-            return Identifier(token.value, token.line, token.column)
-        elif token.type == 'LAMBDA':
-            return self.parse_lambda()  # Add this line to handle lambda expressions
-        elif token.type == 'BOOL_OP' and token.value == 'not':
-            self.pos += 1
-            operand = self.parse_factor()
-            return UnaryOp('not', operand, token.line, token.column)
-        elif token.type == 'OP' and token.value in ['+', '-']:
-            op = token.value
-            self.pos += 1
-            expr = self.parse_factor()
-            return UnaryOp(op, expr, token.line, token.column)
+        handler = self.prefix_parsers.get(token.type)
+        if handler is None:
+            raise InterpreterError(f"Unexpected token: {token.value}", token.line, token.column)
+        return handler(token)
+
+    def parse_number(self, token):
+        """
+        Parses a numeric literal.
+
+        Parameters:
+            token (Token): The current NUMBER token.
 
-        raise InterpreterError(f"Unexpected token: {token.value}", token.line, token.column)
+        Returns:
+            Number: An AST node representing the number.
+        """
+        self.pos += 1
+        return Number(token.value, token.line, token.column)
 
-    def parse_expression(self):
+    def parse_bool(self, token):
         """
-        Parses an expression, starting with a boolean expression.
+        Parses a boolean literal.
+
+        Parameters:
+            token (Token): The current BOOL token.
 
         Returns:
-            ASTNode: The corresponding AST node for the expression.
+            Bool: An AST node representing the boolean.
+        """
+        self.pos += 1
+        return Bool(token.value, token.line, token.column)
+
+    def parse_string(self, token):
+        """
+        Parses a string literal.
+
+        Parameters:
+            token (Token): The current STRING token.
+
+        Returns:
+            String: An AST node representing the string.
+        """
+        self.pos += 1
+        return String(token.value[1:-1], token.line, token.column)
+
+    def parse_group(self, token):
+        """
+        Parses a parenthesized expression, which may be immediately called.
+
+        Parameters:
+            token (Token): The current LPAREN token.
+
+        Returns:
+            ASTNode: The AST node of the enclosed expression, or of the call applying it.
 
         Raises:
-            InterpreterError: If there is a syntax error in the expression.
+            InterpreterError: If the closing parenthesis is missing.
+        """
+        self.pos += 1  # skip '('
+        expr = self.parse_expression()
+        if not self.has_token() or self.tokens[self.pos].type != 'RPAREN':
+            raise InterpreterError("Expected ')' to close expression", self.tokens[self.pos - 1].line,
+                                   self.tokens[self.pos - 1].column)
+        self.pos += 1  # skip ')'
+        # Check if this is a function call
+        if self.has_token() and self.tokens[self.pos].type == 'LPAREN':
+            return self.parse_function_call(expr)
+        return expr
+
+    def parse_list(self, token):
+        """
+        Parses a list literal: comma-separated expressions in square brackets.
+
+        Parameters:
+            token (Token): The current LBRACKET token.
+
+        Returns:
+            ListLiteral: An AST node representing the list.
+
+        Raises:
+            InterpreterError: If the closing bracket is missing.
+        """
+        self.pos += 1  # skip '['
+        elements = []
+        while self.has_token() and self.tokens[self.pos].type != 'RBRACKET':
+            elements.append(self.parse_expression())
+            if self.has_token() and self.tokens[self.pos].type == 'COMMA':
+                self.pos += 1  # skip ','
+            elif not self.has_token() or self.tokens[self.pos].type != 'RBRACKET':
+                break
+        if not self.has_token() or self.tokens[self.pos].type != 'RBRACKET':
+            raise InterpreterError("Expected ']' to close list", self.tokens[self.pos - 1].line,
+                                   self.tokens[self.pos - 1].column)
+        self.pos += 1  # skip ']'
+        return ListLiteral(elements, token.line, token.column)
+
+    def parse_identifier(self, token):
+        """
+        Parses an identifier, or a call of the function it names.
+
+        Parameters:
+            token (Token): The current ID token.
+
+        Returns:
+            ASTNode: An Identifier node, or a FunctionCall node if the identifier is followed by '('.
+        """
+        self.pos += 1
+        if (self.pos < len(self.tokens) or self.has_token()) and self.tokens[self.pos].type == 'LPAREN':
+            self.pos -= 1  # go back to parse function call
+            return self.parse_function_call()
+        return Identifier(token.value, token.line, token.column)
+
+    def parse_lambda_factor(self, token):
+        """
+        Parses a lambda expression appearing as a factor.
+
+        Parameters:
+            token (Token): The current LAMBDA token.
+
+        Returns:
+            ASTNode: The Lambda node, or the FunctionCall node applying it.
+        """
+        return self.parse_lambda()
+
+    def parse_prefix_op(self, token):
+        """
+        Parses a prefix operation: 'not', unary '+' or unary '-' applied to a factor.
+
+        Parameters:
+            token (Token): The current BOOL_OP or OP token.
+
+        Returns:
+            UnaryOp: An AST node representing the prefix operation.
+
+        Raises:
+            InterpreterError: If the operator cannot be used in prefix position.
         """
-        return self.parse_boolean_expression()
+        if token.value not in PREFIX_OPERATORS:
+            raise InterpreterError(f"Unexpected token: {token.value}", token.line, token.column)
+        self.pos += 1
+        operand = self.parse_factor()
+        return UnaryOp(token.value, operand, token.line, token.column)
 
     def get_context(self, token):
         """
@@ -566,6 +851,8 @@ class Parser:
         Returns:
             str: A string representing the line of code where the token is found.
         """
+        if self.source is not None:
+            return self.source.line_text(token.line)
         line = self.tokens[0].line
         context = ""
         for t in self.tokens:
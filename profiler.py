@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import Counter
+
+
+class Profiler:
+    """
+    A sampling profiler of language-level call stacks.
+
+    While running, the interpreter keeps a shadow stack of the FunctionCall nodes currently
+    being evaluated: pushing and popping a node is the only work added to each call. A
+    background thread copies the stack at a fixed interval and counts how often each stack
+    was seen, so the cost of building reports is paid by the sampler rather than by the
+    program being profiled. Since the sampler needs the GIL to run, intervals below the
+    interpreter's switch interval (sys.getswitchinterval(), 5 ms by default) are not honored.
+
+    Attributes:
+        interval (float): The time between samples, in seconds.
+        samples (Counter): The number of times each stack (a tuple of FunctionCall nodes,
+                           outermost first) was sampled.
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        Initializes the Profiler.
+
+        Parameters:
+            interval (float, optional): The time between samples, in seconds.
+        """
+        self.interval = interval
+        self.samples = Counter()
+        self._stack = []
+        self._interpreter = None
+        self._thread = None
+        self._running = threading.Event()
+
+    def start(self, interpreter):
+        """
+        Starts profiling an interpreter, by overriding its eval_function_call method on the
+        instance to maintain the shadow stack, and starting the sampler thread.
+
+        Parameters:
+            interpreter (Interpreter): The interpreter to profile.
+        """
+        eval_function_call = interpreter.eval_function_call
+        stack = self._stack
+        push = stack.append
+        pop = stack.pop
+
+        def profiled_function_call(node, env):
+            push(node)
+            try:
+                return eval_function_call(node, env)
+            finally:
+                pop()
+
+        interpreter.eval_function_call = profiled_function_call
+        self._interpreter = interpreter
+        self._running.set()
+        self._thread = threading.Thread(target=self._sample, name='lambda-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the sampler thread and restores the interpreter's eval_function_call method.
+        """
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._interpreter is not None:
+            self._interpreter.__dict__.pop('eval_function_call', None)
+            self._interpreter = None
+
+    def _sample(self):
+        stack = self._stack
+        samples = self.samples
+        while self._running.is_set():
+            time.sleep(self.interval)
+            frames = tuple(stack)
+            if frames:
+                samples[frames] += 1
+
+    @staticmethod
+    def frame_name(node):
+        """
+        Returns the name of a stack frame, as it appears in reports.
+
+        Parameters:
+            node (FunctionCall): The call.
+
+        Returns:
+            str: The name of the called function and the line of the call, e.g. 'gcd:3'.
+        """
+        name = node.name if isinstance(node.name, str) else 'lambda'
+        return f"{name}:{node.line}"
+
+    def folded(self):
+        """
+        Returns the samples as folded stacks, the input format of flamegraph tools
+        (e.g. flamegraph.pl or speedscope).
+
+        Returns:
+            list: One 'outer;...;inner count' line per distinct stack, most sampled first.
+        """
+        counts = Counter()
+        for frames, count in self.samples.items():
+            counts[';'.join(map(self.frame_name, frames))] += count
+        return [f"{stack} {count}" for stack, count in counts.most_common()]
+
+    def write_folded(self, file):
+        """
+        Writes the samples as folded stacks.
+
+        Parameters:
+            file (TextIO): The file to write to.
+        """
+        for line in self.folded():
+            file.write(line + '\n')
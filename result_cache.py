@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from errors import InterpreterError
+from lexer import Lexer
+
+
+# Bumped whenever the format of the entries changes. Changes to the language itself need no bump,
+# since programs are also keyed on the interpreter's sources (see interpreter_hash).
+CACHE_VERSION = 2
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'lambda-results')
+
+
+_interpreter_hash = None
+
+
+def interpreter_hash():
+    """
+    Hashes the sources of the interpreter: every module next to this one except the tests.
+    Any change to the language can change the output of an existing program, so no output
+    is replayed by a different version of the interpreter than the one that recorded it.
+
+    Returns:
+        bytes: The hash, computed once per process.
+    """
+    global _interpreter_hash
+    if _interpreter_hash is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py') and not name.startswith('test'):
+                with open(os.path.join(directory, name), 'rb') as file:
+                    digest.update(f"{name}\0".encode() + file.read() + b"\0")
+        _interpreter_hash = digest.digest()
+    return _interpreter_hash
+
+
+class ResultCache:
+    """
+    A cache of the output of whole .lambda programs, stored as one JSON file per program.
+
+    The language is pure, so the output of a program depends only on its source and on the
+    interpreter. Programs are keyed by a hash of the interpreter's sources and of their token
+    sequence rather than of their raw text, so edits that only change layout (spacing,
+    indentation, line breaks) still hit the cache, while any change to the interpreter
+    invalidates every entry. Error messages quote the offending line and column, so the
+    output of a program that failed is only replayed if its raw text is also unchanged.
+
+    Entries are evicted least recently used first, by file modification time, once there
+    are more than max_entries of them.
+
+    Attributes:
+        directory (str): The directory in which entries are stored.
+        max_entries (int): The maximum number of programs kept.
+        hits (int): The number of programs whose output was replayed.
+        misses (int): The number of programs that had to be run.
+    """
+
+    def __init__(self, directory=None, max_entries=256):
+        """
+        Initializes the ResultCache, creating its directory if needed.
+
+        Parameters:
+            directory (str, optional): The directory in which entries are stored.
+                                       Defaults to ~/.cache/lambda-results.
+            max_entries (int, optional): The maximum number of programs kept.
+        """
+        self.directory = directory or DEFAULT_DIRECTORY
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._keys = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def keys(self, source):
+        """
+        Hashes a program's tokens and its raw text. The hashes of the last source are kept,
+        so looking up and then storing a program only tokenizes it once.
+
+        Parameters:
+            source (SourceBuffer): The source of the program.
+
+        Returns:
+            tuple: The hex digest of the token sequence and that of the raw text.
+
+        Raises:
+            InterpreterError: If the source cannot be tokenized.
+        """
+        if self._keys is not None and self._keys[0] is source:
+            return self._keys[1]
+        digest = hashlib.sha256(f"{CACHE_VERSION}\0".encode() + interpreter_hash())
+        for token in Lexer().scan_source(source):
+            digest.update(f"{token.type}\0{token.value}\0".encode())
+        data = source.data.encode() if isinstance(source.data, str) else source.data
+        keys = digest.hexdigest(), hashlib.sha256(data).hexdigest()
+        self._keys = source, keys
+        return keys
+
+    def path(self, key):
+        """
+        Returns the path of the file holding an entry.
+
+        Parameters:
+            key (str): The hash of the program's tokens.
+
+        Returns:
+            str: The path of the entry.
+        """
+        return os.path.join(self.directory, key + '.json')
+
+    def lookup(self, source):
+        """
+        Looks up the recorded output of a program, marking it as recently used.
+
+        Parameters:
+            source (SourceBuffer): The source of the program.
+
+        Returns:
+            list: The recorded (line, is error) pairs, or None if the program has to be run.
+        """
+        key, raw = self.keys(source)
+        path = self.path(key)
+        try:
+            with open(path, 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry['errors'] and entry['source'] != raw:
+            return None
+        os.utime(path)
+        return entry['output']
+
+    def store(self, source, output, errors):
+        """
+        Records the output of a program, evicting the least recently used programs if the
+        cache is full.
+
+        Parameters:
+            source (SourceBuffer): The source of the program.
+            output (list): The (line, is error) pairs of the output.
+            errors (bool): Whether the output includes an error message.
+        """
+        key, raw = self.keys(source)
+        entry = {'source': raw, 'errors': errors, 'output': output}
+        # Write to a temporary file first so a concurrent reader never sees a partial entry
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(entry, file)
+        os.replace(temporary, self.path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries beyond max_entries.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # Removed by another process
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def replay(self, source, run):
+        """
+        Yields the output of a program, replaying it from the cache if possible.
+
+        On a miss the program is run and its output is yielded as it is produced; it is only
+        recorded once the run has completed.
+
+        Parameters:
+            source (SourceBuffer): The source of the program.
+            run (callable): Runs the program, returning an iterator of (line, is error) pairs.
+
+        Yields:
+            tuple: Each line of output, and whether it is an error message.
+        """
+        try:
+            output = self.lookup(source)
+        except InterpreterError:
+            output = None  # Not even tokenizable: run it to report the error
+        if output is not None:
+            self.hits += 1
+            for line, error in output:
+                yield line, error
+            return
+
+        self.misses += 1
+        output = []
+        errors = False
+        for line, error in run():
+            output.append((line, error))
+            errors = errors or error
+            yield line, error
+        try:
+            self.store(source, output, errors)
+        except (InterpreterError, OSError):
+            pass  # Source that cannot be tokenized, or a cache directory that is not writable
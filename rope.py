@@ -0,0 +1,163 @@
+LEAF_SIZE = 512  # Concatenations of leaves up to this length are copied into a single leaf
+
+
+class Rope:
+    """
+    An immutable string represented as a balanced binary tree of string pieces, the
+    representation of the language's strings.
+
+    Leaves hold the text and inner nodes the concatenation of their two children, so
+    concatenating two ropes creates O(log n) nodes instead of copying both strings.
+    Inner nodes are kept height-balanced as in an AVL tree (the depths of the children of
+    a node differ by at most one), which bounds the depth, and so the cost of
+    concatenation and slicing, by O(log n). Small pieces appended to a rope are merged
+    into its last leaf, so that building a string piece by piece does not create a node
+    per character.
+
+    Attributes:
+        text (str): The text of a leaf, or None for an inner node.
+        left (Rope): The first part of an inner node, or None for a leaf.
+        right (Rope): The second part of an inner node, or None for a leaf.
+        length (int): The number of characters.
+        depth (int): The height of the tree, 0 for a leaf.
+    """
+
+    __slots__ = ('text', 'left', 'right', 'length', 'depth')
+
+    def __init__(self, text='', left=None, right=None):
+        """
+        Initializes a leaf holding text, or an inner node concatenating left and right.
+
+        Parameters:
+            text (str, optional): The text of a leaf.
+            left (Rope, optional): The first part of an inner node.
+            right (Rope, optional): The second part of an inner node.
+        """
+        self.left = left
+        self.right = right
+        if left is None:
+            self.text = text
+            self.length = len(text)
+            self.depth = 0
+        else:
+            self.text = None
+            self.length = left.length + right.length
+            self.depth = max(left.depth, right.depth) + 1
+
+    def concat(self, other):
+        """
+        Returns the concatenation of this rope and another, sharing both.
+
+        Parameters:
+            other (Rope): The rope to append.
+
+        Returns:
+            Rope: The concatenation.
+        """
+        if not other.length:
+            return self
+        if not self.length:
+            return other
+        return _join(self, other)
+
+    def __add__(self, other):
+        if not isinstance(other, Rope):
+            return NotImplemented
+        return self.concat(other)
+
+    def slice(self, start, stop):
+        """
+        Returns the rope of the characters from start up to (excluding) stop, sharing the
+        nodes that lie entirely inside the range. As with Python slices, the bounds are
+        clamped to the rope.
+
+        Parameters:
+            start (int): The index of the first character.
+            stop (int): The index after the last character.
+
+        Returns:
+            Rope: The slice.
+        """
+        start = max(0, min(start, self.length))
+        stop = max(start, min(stop, self.length))
+        if start == 0 and stop == self.length:
+            return self
+        if start == stop:
+            return EMPTY
+        if self.text is not None:
+            return Rope(self.text[start:stop])
+        split = self.left.length
+        if stop <= split:
+            return self.left.slice(start, stop)
+        if start >= split:
+            return self.right.slice(start - split, stop - split)
+        return self.left.slice(start, split).concat(self.right.slice(0, stop - split))
+
+    def leaves(self):
+        """
+        Yields the text of the leaves, in order.
+
+        Yields:
+            str: The text of each leaf.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.text is not None:
+                yield node.text
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return ''.join(self.leaves())
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __eq__(self, other):
+        if not isinstance(other, Rope):
+            return NotImplemented
+        return self is other or (self.length == other.length and str(self) == str(other))
+
+    def __hash__(self):
+        return hash(str(self))
+
+
+def _join(left, right):
+    # Concatenates two balanced ropes into a balanced rope, descending the spine of the
+    # deeper one to a subtree of about the depth of the other and rotating on the way back.
+    # A small leaf meeting the leaf at the end of the other rope is merged into it.
+    if right.text is not None and right.length <= LEAF_SIZE:
+        if left.text is not None and left.length + right.length <= LEAF_SIZE:
+            return Rope(left.text + right.text)
+        last = left.right
+        if last is not None and last.text is not None and last.length + right.length <= LEAF_SIZE:
+            return Rope(left=left.left, right=Rope(last.text + right.text))
+    elif left.text is not None and left.length <= LEAF_SIZE:
+        first = right.left
+        if first is not None and first.text is not None and left.length + first.length <= LEAF_SIZE:
+            return Rope(left=Rope(left.text + first.text), right=right.right)
+    if left.depth > right.depth + 1:
+        joined = _join(left.right, right)
+        if joined.depth <= left.left.depth + 1:
+            return Rope(left=left.left, right=joined)
+        if joined.left.depth > joined.right.depth:
+            inner = joined.left
+            return Rope(left=Rope(left=left.left, right=inner.left), right=Rope(left=inner.right, right=joined.right))
+        return Rope(left=Rope(left=left.left, right=joined.left), right=joined.right)
+    if right.depth > left.depth + 1:
+        joined = _join(left, right.left)
+        if joined.depth <= right.right.depth + 1:
+            return Rope(left=joined, right=right.right)
+        if joined.right.depth > joined.left.depth:
+            inner = joined.right
+            return Rope(left=Rope(left=joined.left, right=inner.left), right=Rope(left=inner.right, right=right.right))
+        return Rope(left=joined.left, right=Rope(left=joined.right, right=right.right))
+    return Rope(left=left, right=right)
+
+
+EMPTY = Rope()
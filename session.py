@@ -0,0 +1,137 @@
+from types import MappingProxyType
+
+from interpreter import Environment, Interpreter
+from lexer import Lexer
+from parser import Parser
+from source import SourceBuffer
+
+
+class FrozenEnvironment(Environment):
+    """
+    A read-only environment, safe to share between threads without locking.
+
+    Attributes:
+        parent (Environment): The parent environment, if any.
+        variables (mappingproxy): A read-only view of the names and values of the environment.
+    """
+
+    def __init__(self, variables, parent=None):
+        """
+        Initializes the FrozenEnvironment with a copy of the given variables.
+
+        Parameters:
+            variables (dict): The names and values of the environment.
+            parent (Environment, optional): The parent environment. Defaults to None.
+        """
+        super().__init__(parent)
+        self.variables = MappingProxyType(dict(variables))
+
+    def define(self, name, value):
+        """
+        Refuses to define a name, since the environment is read-only.
+
+        Raises:
+            TypeError: Always.
+        """
+        raise TypeError(f"Cannot define '{name}' in a read-only environment")
+
+
+class Prelude:
+    """
+    A set of definitions evaluated once and shared, read-only, by any number of sessions.
+
+    The definitions are evaluated in an interpreter of their own, whose global environment is
+    then frozen. Functions of the prelude keep running in that interpreter and only look up
+    names in the prelude, so a session that redefines a name does not change the behavior of
+    the prelude functions that use it.
+
+    Attributes:
+        environment (FrozenEnvironment): The names defined by the prelude.
+        definitions (mappingproxy): The FunctionDef node of each function of the prelude, by name.
+    """
+
+    def __init__(self, code=''):
+        """
+        Evaluates the code of the prelude and freezes its definitions.
+
+        Parameters:
+            code (str, optional): The code of the prelude.
+
+        Raises:
+            InterpreterError: If the code fails to evaluate.
+        """
+        interpreter = Interpreter()
+        interpreter.set_code(code)
+        for node in Parser(Lexer().tokenize(code)).parse():
+            interpreter.evaluate(node)
+        self.environment = FrozenEnvironment(interpreter.global_env.variables)
+        # The prelude's functions look names up in the environment they were defined in
+        interpreter.global_env.parent = self.environment
+        interpreter.global_env.variables = {}
+        self.definitions = MappingProxyType(dict(interpreter.definitions))
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Loads a prelude from a .lambda file.
+
+        Parameters:
+            filename (str): The path to the file.
+
+        Returns:
+            Prelude: The prelude.
+        """
+        with open(filename, 'r') as file:
+            return cls(file.read())
+
+    def session(self):
+        """
+        Starts a new session on top of the prelude.
+
+        Returns:
+            Session: The session.
+        """
+        return Session(self)
+
+
+class Session:
+    """
+    An evaluation session layered over a shared Prelude.
+
+    Starting a session only creates an interpreter with an empty global environment whose
+    parent is the prelude's: names the session defines shadow the prelude's in that session
+    alone. Sessions share nothing mutable, so each can be used from its own thread without
+    any lock; a single session must not be used by two threads at once.
+
+    Attributes:
+        interpreter (Interpreter): The session's interpreter.
+    """
+
+    def __init__(self, prelude=None):
+        """
+        Initializes the Session.
+
+        Parameters:
+            prelude (Prelude, optional): The shared definitions. Defaults to an empty prelude.
+        """
+        self.interpreter = Interpreter(prelude=prelude or Prelude())
+        self._lexer = Lexer()
+
+    def run(self, code):
+        """
+        Evaluates code in the session.
+
+        Parameters:
+            code (str): The code to evaluate.
+
+        Returns:
+            list: The result of each top-level statement.
+
+        Raises:
+            InterpreterError: If evaluation fails.
+        """
+        source = SourceBuffer(code)
+        self.interpreter.set_source(source)
+        parser = Parser(self._lexer.tokenize(code))
+        parser.source = source
+        return [self.interpreter.evaluate(node) for node in parser.parse()]
@@ -0,0 +1,136 @@
+import mmap
+from array import array
+from bisect import bisect_right
+
+
+class SourceBuffer:
+    """
+    A read-only view of source code shared by the lexer, parser and interpreter.
+
+    The text is held either as a string or as a read-only memory map of a file, so loading a
+    file never makes an in-memory copy of it. Line lookups for error reporting go through a
+    compact table of line-start offsets that is built in a single pass the first time it is
+    needed, instead of splitting the source into a list of lines up front.
+
+    Attributes:
+        data (str | mmap.mmap | bytes): The source text. Files are mapped as bytes.
+        filename (str, optional): The path of the file the source was loaded from, if any.
+    """
+
+    def __init__(self, data, filename=None):
+        """
+        Initializes the SourceBuffer over existing source text.
+
+        Parameters:
+            data (str | mmap.mmap | bytes): The source text.
+            filename (str, optional): The path of the file the source was loaded from.
+        """
+        self.data = data
+        self.filename = filename
+        self._newline = '\n' if isinstance(data, str) else b'\n'
+        self._line_starts = None
+
+    @classmethod
+    def open(cls, filename):
+        """
+        Memory-maps a source file for reading.
+
+        Parameters:
+            filename (str): The path to the file.
+
+        Returns:
+            SourceBuffer: A buffer backed by a read-only memory map of the file.
+        """
+        with open(filename, 'rb') as file:
+            try:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                data = b''  # Empty files cannot be memory-mapped
+        return cls(data, filename)
+
+    def close(self):
+        """
+        Releases the memory map backing the buffer, if any.
+        """
+        if isinstance(self.data, mmap.mmap):
+            try:
+                self.data.close()
+            except BufferError:
+                pass  # Still referenced by an unfinished scan; released when that scan is collected
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def line_starts(self):
+        """
+        The offset at which each line starts, indexed by line number - 1.
+
+        Returns:
+            array: An array of unsigned offsets, built on first access.
+        """
+        if self._line_starts is None:
+            data = self.data
+            newline = self._newline
+            starts = array('Q', [0])
+            pos = data.find(newline)
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = data.find(newline, pos + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_count(self):
+        """
+        Returns the number of lines in the source.
+
+        Returns:
+            int: The number of lines.
+        """
+        return len(self.line_starts)
+
+    def line_text(self, line):
+        """
+        Returns the text of a line, without its line break.
+
+        Parameters:
+            line (int): The 1-based line number.
+
+        Returns:
+            str: The text of the line, or None if the line does not exist.
+        """
+        starts = self.line_starts
+        if not 1 <= line <= len(starts):
+            return None
+        start = starts[line - 1]
+        end = starts[line] - 1 if line < len(starts) else len(self.data)
+        text = self.data[start:end]
+        if not isinstance(text, str):
+            text = text.decode('utf-8', errors='replace')
+        return text.rstrip('\r')
+
+    def offset(self, line, column):
+        """
+        Converts a line and column into an absolute offset in the source.
+
+        Parameters:
+            line (int): The 1-based line number.
+            column (int): The 0-based column within the line.
+
+        Returns:
+            int: The offset of the position.
+        """
+        return self.line_starts[line - 1] + column
+
+    def position(self, offset):
+        """
+        Converts an absolute offset in the source into a line and column.
+
+        Parameters:
+            offset (int): The offset of the position.
+
+        Returns:
+            tuple: The 1-based line number and the 0-based column.
+        """
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1]
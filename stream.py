@@ -0,0 +1,183 @@
+import itertools
+
+from pvector import PersistentVector
+
+# The kinds of stages of a stream
+MAP = 0
+FILTER = 1
+TAKE = 2
+
+
+class Stream:
+    """
+    A lazy, possibly infinite sequence of values, the representation of the language's streams.
+
+    A stream is an immutable description of a pipeline: a source of values and the stages
+    (map, filter and take) applied to them. Applying map, filter or take to a stream does
+    not evaluate anything; it returns a new stream with one more stage, so a chain of
+    stages is fused into a single pass when the stream is finally consumed (by reduce or
+    list): each value is pulled from the source and carried through all stages before the
+    next one is pulled, without building any intermediate sequence. Consuming a stream
+    therefore takes memory independent of its length, and an infinite stream can be
+    consumed as long as a take stage ends it.
+
+    Since values are pure, a stream can be consumed any number of times, each time
+    re-running its pipeline from the source.
+
+    Attributes:
+        source (callable): A function returning a new iterator over the source values.
+        stages (tuple): The (kind, argument) pairs of the stages, in order of application;
+                        the argument is the function of a MAP or FILTER stage and the count
+                        of a TAKE stage.
+    """
+
+    __slots__ = ('source', 'stages')
+
+    def __init__(self, source, stages=()):
+        """
+        Initializes a Stream.
+
+        Parameters:
+            source (callable): A function returning a new iterator over the source values.
+            stages (tuple, optional): The (kind, argument) pairs of the stages.
+        """
+        self.source = source
+        self.stages = stages
+
+    def map(self, func):
+        """
+        Returns the stream of the results of a function applied to each value.
+        """
+        return Stream(self.source, self.stages + ((MAP, func),))
+
+    def filter(self, func):
+        """
+        Returns the stream of the values for which a function returns a true value.
+        """
+        return Stream(self.source, self.stages + ((FILTER, func),))
+
+    def take(self, count):
+        """
+        Returns the stream of the first count values.
+        """
+        return Stream(self.source, self.stages + ((TAKE, count),))
+
+    def __iter__(self):
+        stages = self.stages
+        if not stages:
+            return self.source()
+        if all(kind == MAP for kind, _ in stages):
+            return self._mapped()
+        return self._fused()
+
+    def _mapped(self):
+        # The common case of only map stages, without the bookkeeping of _fused
+        funcs = [func for _, func in self.stages]
+        for value in self.source():
+            for func in funcs:
+                value = func(value)
+            yield value
+
+    def _fused(self):
+        stages = self.stages
+        remaining = {index: count for index, (kind, count) in enumerate(stages) if kind == TAKE}
+        if any(count <= 0 for count in remaining.values()):
+            return
+        for value in self.source():
+            exhausted = False
+            for index, (kind, argument) in enumerate(stages):
+                if kind == MAP:
+                    value = argument(value)
+                elif kind == FILTER:
+                    if not argument(value):
+                        break
+                else:
+                    remaining[index] -= 1
+                    # This value is the last to pass the stage, so none can follow it
+                    exhausted = exhausted or remaining[index] == 0
+            else:
+                yield value
+            if exhausted:
+                return
+
+    def __repr__(self):
+        return '<stream>'
+
+
+def as_stream(value, name):
+    """
+    Returns a list or stream as a stream.
+
+    Parameters:
+        value: The list or stream.
+        name (str): The name of the builtin the value was passed to, for error messages.
+
+    Returns:
+        Stream: The stream of the values.
+
+    Raises:
+        TypeError: If the value is neither a list nor a stream.
+    """
+    if isinstance(value, Stream):
+        return value
+    if isinstance(value, PersistentVector):
+        return Stream(value.__iter__)
+    raise TypeError(f"{name} expects a list or stream, got {type(value).__name__}")
+
+
+def check_function(func, name):
+    # Raises a TypeError unless func can be called
+    if not callable(func):
+        raise TypeError(f"{name} expects a function, got {type(func).__name__}")
+
+
+def stream_range(start, stop=None):
+    """
+    The 'range' builtin: the stream of the integers from start up to (excluding) stop, or
+    of all integers from start if stop is not given.
+    """
+    if stop is None:
+        return Stream(lambda: itertools.count(start))
+    return Stream(lambda: iter(range(start, stop)))
+
+
+def stream_map(func, sequence):
+    """
+    The 'map' builtin: the stream of the results of func applied to each value of a list or stream.
+    """
+    check_function(func, 'map')
+    return as_stream(sequence, 'map').map(func)
+
+
+def stream_filter(func, sequence):
+    """
+    The 'filter' builtin: the stream of the values of a list or stream for which func returns a true value.
+    """
+    check_function(func, 'filter')
+    return as_stream(sequence, 'filter').filter(func)
+
+
+def stream_take(sequence, count):
+    """
+    The 'take' builtin: the stream of the first count values of a list or stream.
+    """
+    return as_stream(sequence, 'take').take(count)
+
+
+def stream_reduce(func, sequence, initial):
+    """
+    The 'reduce' builtin: combines the values of a list or stream from the left, starting
+    from initial, with func taking the result so far and the next value.
+    """
+    check_function(func, 'reduce')
+    result = initial
+    for value in as_stream(sequence, 'reduce'):
+        result = func(result, value)
+    return result
+
+
+def stream_list(sequence):
+    """
+    The 'list' builtin: the values of a (finite) stream, as a list.
+    """
+    return PersistentVector.from_iterable(as_stream(sequence, 'list'))
@@ -0,0 +1,99 @@
+import unittest
+
+from allocations import AllocationTracker
+from errors import BudgetExceededError
+from interpreter import Interpreter
+from lexer import Lexer
+from metering import Meter
+from parser import Parser
+
+
+class TestAllocations(unittest.TestCase):
+    """
+    Unit tests for allocation accounting.
+    """
+    def run_code(self, code, tracker):
+        """
+        Lex, parse and evaluate code with the tracker installed, returning the last result.
+        """
+        interpreter = Interpreter()
+        tracker.install(interpreter)
+        try:
+            tokens = tracker.count_tokens(Lexer().tokenize(code))
+            result = None
+            for node in tracker.count_nodes(Parser(list(tokens)).parse()):
+                result = interpreter.evaluate(node)
+            return result
+        finally:
+            tracker.uninstall()
+
+    def test_counts(self):
+        """
+        Test if tokens, nodes, environments and closures are counted and attributed to functions.
+        """
+        tracker = AllocationTracker()
+        code = """
+        Defun {'name': 'apply', 'arguments': (f, x)} f(x)
+        Defun {'name': 'count', 'arguments': (n)} (n == 0) or (apply((Lambda (y) y - 1), n) >= 0 and count(n - 1))
+        count(10)
+        """
+        self.assertTrue(self.run_code(code, tracker))
+        self.assertEqual(tracker.tokens, len(Lexer().tokenize(code)))
+        self.assertEqual(tracker.nodes, 23)
+        self.assertEqual(tracker.functions['count'].calls, 11)
+        self.assertEqual(tracker.functions['count'].environments, 11)
+        self.assertEqual(tracker.functions['apply'].environments, 10)
+        self.assertEqual(tracker.functions['lambda:3'].environments, 10)
+        self.assertEqual(tracker.functions['count'].closures, 10)  # One lambda per call
+        self.assertEqual(tracker.functions['<toplevel>'].closures, 2)  # The Defuns
+        self.assertEqual(tracker.environments, 31)
+        self.assertEqual(tracker.closures, 12)
+
+    def test_peaks(self):
+        """
+        Test if the peak number of live environments follows the recursion depth, and if
+        finished calls free their environments.
+        """
+        tracker = AllocationTracker()
+        code = """
+        Defun {'name': 'depth', 'arguments': (n)} (n == 0) or depth(n - 1)
+        depth(25)
+        """
+        self.run_code(code, tracker)
+        self.assertEqual(tracker.peak_environments, 26)
+        self.assertEqual(tracker.live_environments, 0)
+        self.assertGreater(tracker.peak_bytes, 0)
+        self.assertIn('depth', tracker.format_report())
+        self.assertEqual(tracker.report()['functions']['depth']['calls'], 26)
+
+    def test_keeps_installed_environment_class(self):
+        """
+        Test if environments are counted on top of the environment class of hooks installed before.
+        """
+        tracker = AllocationTracker()
+        interpreter = Interpreter()
+        Meter(max_environments=5).install(interpreter)
+        tracker.install(interpreter)
+        try:
+            code = "Defun {'name': 'depth', 'arguments': (n)} (n == 0) or depth(n - 1)\ndepth(25)"
+            with self.assertRaises(BudgetExceededError):
+                for node in Parser(Lexer().tokenize(code)).parse():
+                    interpreter.evaluate(node)
+        finally:
+            tracker.uninstall()
+        self.assertEqual(tracker.environments, 5)
+        self.assertEqual(tracker.live_environments, 0)
+
+    def test_uninstall_restores(self):
+        """
+        Test if uninstalling leaves the interpreter as it was.
+        """
+        tracker = AllocationTracker()
+        interpreter = Interpreter()
+        tracker.install(interpreter)
+        tracker.uninstall()
+        self.assertEqual(vars(interpreter).keys(), vars(Interpreter()).keys())
+
+
+if __name__ == '__main__':
+    unittest.main()
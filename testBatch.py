@@ -0,0 +1,91 @@
+import unittest
+
+from batch import BatchResult, ERROR, definition_order
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Unit tests for batch calls in a process pool.
+    """
+    def setUp(self):
+        """
+        Define find_gcd (from test.lambda) and a function that can fail.
+        """
+        self.interpreter = Interpreter()
+        code = """
+        Defun {'name': 'gcd', 'arguments': (a, b)}
+            (b == 0) or ((a > b) and gcd(b, a % b)) or (gcd(b, a))
+        Defun {'name': 'find_gcd', 'arguments': (x, y)} (x == y) or (gcd(x, y))
+        Defun {'name': 'div', 'arguments': (x, y)} x / y
+        """
+        for node in Parser(Lexer().tokenize(code)).parse():
+            self.interpreter.evaluate(node)
+
+    def test_function_dependencies(self):
+        """
+        Test if the definitions a function transitively refers to are collected.
+        """
+        names = [node.name for node in self.interpreter.function_dependencies('find_gcd')]
+        self.assertEqual(names, ['find_gcd', 'gcd'])
+
+    def test_map_call_passes_functions_by_name(self):
+        """
+        Test if workers can define a function that names another Defun as a value.
+        """
+        code = """
+        Defun {'name': 'inc', 'arguments': (x)} x + 1
+        Defun {'name': 'apply', 'arguments': (f, x)} f(x)
+        Defun {'name': 'go', 'arguments': (x)} apply(inc, x) * 2
+        """
+        for node in Parser(Lexer().tokenize(code)).parse():
+            self.interpreter.evaluate(node)
+        names = [node.name for node in definition_order(self.interpreter.function_dependencies('go'))]
+        self.assertLess(names.index('inc'), names.index('go'))
+        chunks = list(self.interpreter.map_call('go', [(x,) for x in range(5)], workers=2, chunk_size=2))
+        self.assertEqual([value for chunk in chunks for value in chunk], [2, 4, 6, 8, 10])
+
+    def test_map_call_in_order(self):
+        """
+        Test if results come back in input order, chunk by chunk.
+        """
+        arguments = [(x, 12) for x in range(1, 30)]
+        chunks = list(self.interpreter.map_call('find_gcd', arguments, workers=2, chunk_size=4))
+        results = [value for chunk in chunks for value in chunk]
+        scalar = self.interpreter.global_env.lookup('find_gcd')
+        self.assertEqual(results, [scalar(*args) for args in arguments])
+        self.assertEqual([chunk.start for chunk in chunks], list(range(0, 29, 4)))
+
+    def test_map_call_reports_errors_per_item(self):
+        """
+        Test if a failing call is reported without aborting the rest of the batch.
+        """
+        arguments = [(10, 2), (1, 0), (9, 3), (2 ** 70, 1)]
+        chunks = list(self.interpreter.map_call('div', arguments, workers=2, chunk_size=3, ordered=False))
+        chunks.sort(key=lambda chunk: chunk.start)
+        results = [value for chunk in chunks for value in chunk]
+        self.assertEqual(results[0], 5)
+        self.assertIsInstance(results[1], InterpreterError)
+        self.assertEqual(results[2:], [3, 2 ** 70])
+        self.assertEqual([index for chunk in chunks for index, _ in chunk.errors()], [1])
+
+    def test_batch_result_arrays(self):
+        """
+        Test if results are packed by kind into compact arrays.
+        """
+        result = BatchResult(0)
+        result.add(7)
+        result.add(True)
+        result.add_error(InterpreterError("boom"))
+        self.assertEqual(list(result.kinds)[2], ERROR)
+        self.assertEqual(result.values.typecode, 'q')
+        self.assertEqual(result[0], 7)
+        self.assertIs(result[1], True)
+        self.assertEqual(result[-1].message, "boom")
+
+
+if __name__ == '__main__':
+    unittest.main()
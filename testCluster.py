@@ -0,0 +1,217 @@
+import contextlib
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from cluster import Coordinator, run_worker, start_local_workers, send_message, receive_message
+from errors import InterpreterError
+from main import main
+
+
+PRELUDE = "Defun {'name': 'square', 'arguments': (x)} x * x\n"
+
+
+class FakeWorker:
+    """
+    A worker speaking the protocol by hand, to take tasks and then misbehave.
+    """
+    def __init__(self, address):
+        self.connection = socket.create_connection(address)
+        self.reader = self.connection.makefile('rb')
+        send_message(self.connection, {'type': 'hello', 'name': 'fake'})
+        self.welcome = receive_message(self.reader)
+
+    def take_task(self):
+        send_message(self.connection, {'type': 'request'})
+        return receive_message(self.reader)
+
+    def close(self):
+        self.reader.close()
+        self.connection.close()
+
+
+class TestCluster(unittest.TestCase):
+    """
+    Unit tests for the cluster coordinator and workers, on loopback.
+    """
+    def setUp(self):
+        """
+        Start a coordinator on a free loopback port.
+        """
+        self.coordinator = Coordinator(prelude=PRELUDE, heartbeat_timeout=0.5)
+        self.threads = []
+
+    def tearDown(self):
+        """
+        Stop the coordinator and wait for the worker threads.
+        """
+        self.coordinator.close()
+        for thread in self.threads:
+            thread.join(10)
+
+    def submit_programs(self, count):
+        """
+        Submit count programs calling the prelude, returning their expected output.
+        """
+        expected = []
+        for i in range(count):
+            self.coordinator.submit(f"task{i}", f"square({i})\n{i} + 1")
+            expected.append((f"task{i}", [[str(i * i), False], [str(i + 1), False]]))
+        return expected
+
+    def start_worker_threads(self, count):
+        """
+        Run count workers in threads of this process.
+        """
+        for _ in range(count):
+            thread = threading.Thread(target=run_worker, args=self.coordinator.address, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def test_tasks_run_on_workers(self):
+        """
+        Test if every task runs once, over the prelude, and the metrics account for all of them.
+        """
+        expected = self.submit_programs(20)
+        self.coordinator.submit('error', "1 / 0")
+        self.coordinator.start()
+        self.start_worker_threads(3)
+        self.assertTrue(self.coordinator.wait(30))
+        outputs = self.coordinator.outputs()
+        self.assertEqual(outputs[:20], expected)
+        self.assertTrue(outputs[20][1][0][1])
+        self.assertIn("Division by zero", outputs[20][1][0][0])
+        metrics = self.coordinator.metrics()
+        self.assertEqual((metrics['tasks'], metrics['completed'], metrics['requeued']), (21, 21, 0))
+        self.assertGreater(metrics['throughput'], 0)
+        self.assertGreaterEqual(metrics['latency']['max'], metrics['latency']['p50'])
+
+    def test_local_worker_processes(self):
+        """
+        Test if worker processes started on this machine run the tasks and exit when done.
+        """
+        expected = self.submit_programs(6)
+        self.coordinator.start()
+        workers = start_local_workers(self.coordinator.address, 2)
+        try:
+            self.assertTrue(self.coordinator.wait(60))
+        finally:
+            self.coordinator.close()
+            for worker in workers:
+                worker.wait(30)
+        self.assertEqual(self.coordinator.outputs(), expected)
+        self.assertEqual([worker.returncode for worker in workers], [0, 0])
+
+    def test_disconnected_worker_requeued(self):
+        """
+        Test if the task of a worker that disconnects is run by another worker.
+        """
+        expected = self.submit_programs(3)
+        self.coordinator.start()
+        fake = FakeWorker(self.coordinator.address)
+        task = fake.take_task()
+        self.assertEqual(task['type'], 'task')
+        fake.close()
+        self.start_worker_threads(1)
+        self.assertTrue(self.coordinator.wait(30))
+        self.assertEqual(self.coordinator.outputs(), expected)
+        self.assertEqual(self.coordinator.requeued, 1)
+
+    def test_silent_worker_requeued(self):
+        """
+        Test if the task of a connected worker that stops sending heartbeats is run by another worker.
+        """
+        expected = self.submit_programs(1)
+        self.coordinator.start()
+        fake = FakeWorker(self.coordinator.address)
+        self.assertEqual(fake.take_task()['task'], 0)
+        self.start_worker_threads(1)
+        try:
+            self.assertTrue(self.coordinator.wait(30))
+        finally:
+            fake.close()
+        self.assertEqual(self.coordinator.outputs(), expected)
+        self.assertEqual(self.coordinator.requeued, 1)
+
+    def test_idle_worker_kept(self):
+        """
+        Test if a worker that waited for a task longer than the heartbeat timeout keeps the task it gets.
+        """
+        self.coordinator.start()
+        fake = FakeWorker(self.coordinator.address)
+        try:
+            send_message(fake.connection, {'type': 'request'})
+            time.sleep(1)
+            expected = self.submit_programs(1)
+            self.assertEqual(receive_message(fake.reader)['task'], 0)
+            time.sleep(0.3)
+            self.assertEqual(self.coordinator.requeued, 0)
+            send_message(fake.connection, {'type': 'result', 'task': 0, 'output': expected[0][1]})
+            self.assertTrue(self.coordinator.wait(30))
+        finally:
+            fake.close()
+        self.assertEqual(self.coordinator.outputs(), expected)
+
+    def test_work_stealing(self):
+        """
+        Test if a worker with an empty queue steals from the back of another worker's queue.
+        """
+        self.submit_programs(6)
+        self.coordinator.start()
+        first = FakeWorker(self.coordinator.address)
+        self.assertEqual(first.take_task()['task'], 0)  # Takes all six tasks into its queue
+        second = FakeWorker(self.coordinator.address)
+        self.assertEqual(second.take_task()['task'], 5)
+        self.assertEqual(self.coordinator.stolen, 1)
+        first.close()
+        second.close()
+
+    def test_failing_prelude(self):
+        """
+        Test if a prelude that fails is rejected by the coordinator, and fails the tasks of
+        workers that receive it anyway instead of crashing them.
+        """
+        with self.assertRaises(InterpreterError):
+            Coordinator(prelude="square(")
+        self.coordinator.prelude = "square(2)"  # Only defined by the prelude the coordinator checked
+        self.submit_programs(3)
+        self.coordinator.start()
+        self.start_worker_threads(1)
+        self.assertTrue(self.coordinator.wait(30))
+        for _, output in self.coordinator.outputs():
+            self.assertTrue(output[0][1])
+            self.assertIn("square", output[0][0])
+
+        directory = tempfile.mkdtemp()
+        for name, code in (('bad.lambda', "square("), ('x.lambda', "1")):
+            with open(os.path.join(directory, name), 'w') as file:
+                file.write(code)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            status = main(['cluster', '-w', '1', '--prelude', os.path.join(directory, 'bad.lambda'),
+                           os.path.join(directory, 'x.lambda')])
+        self.assertEqual(status, 1)
+        self.assertIn("Expected ')'", output.getvalue())
+
+    def test_fail_remaining(self):
+        """
+        Test if the tasks left when no worker can run them are failed, and later output ignored.
+        """
+        self.submit_programs(2)
+        self.coordinator.start()
+        fake = FakeWorker(self.coordinator.address)
+        task = fake.take_task()
+        self.coordinator.fail_remaining("no workers are left to run it")
+        self.assertTrue(self.coordinator.wait(0))
+        send_message(fake.connection, {'type': 'result', 'task': task['task'], 'output': [], 'elapsed': 0.0})
+        fake.close()
+        self.assertEqual([output for _, output in self.coordinator.outputs()],
+                         [[["Task failed: no workers are left to run it", True]]] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
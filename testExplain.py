@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from explain import Explainer
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from source import SourceBuffer
+
+
+class TestExplain(unittest.TestCase):
+    """
+    Unit tests for the explain report.
+    """
+    def explain(self, code):
+        """
+        Stream code through the lexer, parser and interpreter under an explainer.
+        """
+        explainer = Explainer()
+        interpreter = Interpreter()
+        explainer.install(interpreter)
+        try:
+            tokens = explainer.lex(Lexer().scan_source(SourceBuffer(code)))
+            for node in explainer.parse(Parser([]).parse_stream(tokens)):
+                explainer.evaluate(interpreter, node)
+        finally:
+            explainer.uninstall(interpreter)
+        return explainer
+
+    def test_counts_and_depths(self):
+        """
+        Test if tokens, nodes, call depth and environment chains are reported per statement.
+        """
+        code = """
+        Defun {'name': 'down', 'arguments': (n)} (n == 0) or down(n - 1)
+        down(7)
+        (Lambda (x) (Lambda (y) (Lambda (z) x + y + z)(3))(2))(1)
+        """
+        explainer = self.explain(code)
+        self.assertEqual(explainer.tokens, len(Lexer().tokenize(code)))
+        self.assertEqual(explainer.nodes, 25)
+        self.assertEqual([statement['line'] for statement in explainer.statements], [2, 3, 4])
+        self.assertEqual([statement['max_depth'] for statement in explainer.statements], [0, 8, 3])
+        self.assertEqual([statement['max_env_chain'] for statement in explainer.statements], [1, 2, 4])
+        self.assertEqual(explainer.max_depth, 8)
+        self.assertEqual(explainer.max_env_chain, 4)
+
+    def test_phases(self):
+        """
+        Test if every phase is timed, and the report is available as a table and as JSON.
+        """
+        explainer = self.explain("1 + 2\n" * 200)
+        for name in ('lex', 'parse', 'evaluate'):
+            wall, cpu = explainer.phases[name]
+            self.assertGreater(wall, 0)
+            self.assertGreaterEqual(cpu, 0)
+        report = json.loads(explainer.to_json())
+        self.assertEqual(len(report['statements']), 200)
+        self.assertEqual(report['tokens'], 600)
+        table = explainer.format_table(limit=3)
+        self.assertIn('evaluate', table)
+        self.assertEqual(len(table.splitlines()), 4 + 2 + 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import random
+import unittest
+
+import incremental
+from errors import InterpreterError
+from incremental import BLOCK_SIZE, Document
+from lexer import Lexer
+from parser import Parser, walk, structure
+
+
+PROGRAM = """Defun {'name': 'square', 'arguments': (x)} x * x
+Defun {'name': 'cube', 'arguments': (x)}
+    x * square(x)
+square(3)
+cube(2) + 1
+f
+'text'
+"""
+
+
+def parse_whole(text):
+    """
+    Parse text from scratch, as the reference for incremental parses.
+    """
+    lexer = Lexer()
+    parser = Parser(lexer.tokenize(text))
+    parser.source = lexer.source
+    return parser.parse()
+
+
+def snapshot(statements):
+    """
+    The structure and positions of every node of the statements, for comparison.
+    """
+    return [(structure(node), [(child.line, child.column) for child in walk(node)]) for node in statements]
+
+
+class TestIncremental(unittest.TestCase):
+    """
+    Unit tests for incremental reparsing of edited sources.
+    """
+    def setUp(self):
+        """
+        Use small blocks, so that edits cross block boundaries.
+        """
+        self.block_size = incremental.BLOCK_SIZE
+        incremental.BLOCK_SIZE = 2
+
+    def tearDown(self):
+        incremental.BLOCK_SIZE = self.block_size
+
+    def edit(self, document, old, new, occurrence=0):
+        """
+        Replace an occurrence of old by new in the document, checking the result against a full parse.
+        """
+        offset = -1
+        for _ in range(occurrence + 1):
+            offset = document.text.index(old, offset + 1)
+        change = document.edit(offset, len(old), new)
+        self.assertEqual(snapshot(document.statements), snapshot(parse_whole(document.text)))
+        return change
+
+    def test_edit_reuses_other_statements(self):
+        """
+        Test if an edit inside a statement reparses only around it and keeps the other nodes.
+        """
+        document = Document(PROGRAM)
+        before = document.statements
+        change = self.edit(document, "(2)", "(5)")
+        after = document.statements
+        self.assertEqual(change.index, 2)
+        self.assertEqual(change.removed, before[2:4])
+        self.assertEqual(change.added, after[2:4])
+        self.assertEqual(after[3].left.args[0].value, 5)
+        for i in (0, 1, 4, 5):
+            self.assertIs(after[i], before[i])
+        self.assertLess(change.relexed, len(PROGRAM) / 2)
+
+    def test_line_shift(self):
+        """
+        Test if adding and removing lines shifts the line numbers of the reused statements.
+        """
+        document = Document(PROGRAM)
+        later = document.statements[4]
+        self.edit(document, "square(3)", "square(3)\n\n4")
+        self.assertIs(document.statements[5], later)
+        self.assertEqual(later.line, 8)
+        self.assertEqual(document.lines, [1, 2, 4, 6, 7, 8, 9])
+        self.edit(document, "x * x\n", "x * x ")
+        self.assertEqual(later.line, 7)
+
+    def test_lookahead_and_merged_tokens(self):
+        """
+        Test if edits that change how the statement before them ends are reparsed correctly.
+        """
+        document = Document(PROGRAM)
+        self.edit(document, "'text'", "(1)")  # 'f' followed by '(' becomes a call
+        self.assertEqual(document.statements[4].name, 'f')
+        self.assertEqual(len(document.statements), 5)
+        self.edit(document, "(1)", "\n2")
+        self.assertEqual(len(document.statements), 6)
+        document = Document("1 Def")
+        self.edit(document, "Def", "Defun {'name': 'g', 'arguments': ()} 7")
+        self.assertEqual(document.statements[1].name, 'g')
+
+    def test_relexing_after_word_characters(self):
+        """
+        Test if statements that start right after a word character are lexed with it, as in "5True".
+        """
+        document = Document("1 + 5True and False\n2\n3")
+        self.edit(document, "3", "4")
+        self.assertEqual(document.statements[1].left.name, 'True')
+        # A run of such statements crossing blocks
+        document = Document("0\n" * 10 + "1" + " + 5True" * (2 * BLOCK_SIZE) + "\n2\n3")
+        self.edit(document, "3", "4")
+        self.edit(document, "\n2", "\n 2")
+
+    def test_errors_leave_the_document_unchanged(self):
+        """
+        Test if an edit that breaks the syntax raises the error of a full parse and changes nothing.
+        """
+        document = Document(PROGRAM)
+        statements = document.statements
+        for old, new in (("square(3)", "square(3) @"), ("Defun {'name': 'cube'", "Defun {'name' 'cube'")):
+            with self.assertRaises(InterpreterError) as context:
+                document.edit(PROGRAM.index(old), len(old), new)
+            with self.assertRaises(InterpreterError) as expected:
+                parse_whole(PROGRAM.replace(old, new))
+            self.assertEqual(str(context.exception), str(expected.exception))
+        self.assertEqual(document.text, PROGRAM)
+        self.assertEqual(document.statements, statements)
+        with self.assertRaises(ValueError):
+            document.edit(len(PROGRAM), 1, "")
+
+    def test_random_edits(self):
+        """
+        Test random edits of a larger program against full parses.
+        """
+        rng = random.Random(1)
+        pieces = ["1", " + ", "\n", "square(2)", "(", ")", "'", "x", " and ", "Def", "un", "[1]", " "]
+        text = "".join(f"Defun {{'name': 'f{i}', 'arguments': (a)}} a * {i}\nf{i}({i}) + 1\n" for i in range(20))
+        document = Document(text)
+        for _ in range(300):
+            offset = rng.randint(0, len(document.text))
+            deleted = rng.randint(0, min(5, len(document.text) - offset))
+            inserted = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+            new_text = document.text[:offset] + inserted + document.text[offset + deleted:]
+            try:
+                expected = parse_whole(new_text)
+            except Exception:
+                with self.assertRaises(Exception):
+                    document.edit(offset, deleted, inserted)
+                continue
+            document.edit(offset, deleted, inserted)
+            self.assertEqual(document.text, new_text)
+            self.assertEqual(snapshot(document.statements), snapshot(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from jsonl import JsonlWriter
+from main import execute_file, main
+from metering import Meter
+
+
+class CountingFile(io.StringIO):
+    """
+    A file counting the calls of write, to check how the writer buffers.
+    """
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestJsonl(unittest.TestCase):
+    """
+    Unit tests for the JSON Lines output mode.
+    """
+    def setUp(self):
+        """
+        Create a directory for the programs and their output.
+        """
+        self.directory = tempfile.mkdtemp()
+
+    def write_program(self, code):
+        """
+        Write code to a .lambda file, returning its path.
+        """
+        filename = os.path.join(self.directory, 'program.lambda')
+        with open(filename, 'w') as file:
+            file.write(code)
+        return filename
+
+    def run_records(self, code, meter=None):
+        """
+        Execute code in the JSONL mode, returning whether it succeeded and its records.
+        """
+        output = io.StringIO()
+        ok = execute_file(self.write_program(code), use_cache=False, meter=meter, writer=JsonlWriter(output))
+        return ok, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_statement_records(self):
+        """
+        Test if every top-level statement gets a record with its index, line and value.
+        """
+        ok, records = self.run_records("Defun {'name': 'twice', 'arguments': (x)} x * 2\n"
+                                       "twice(21)\n\n"
+                                       "5 > 3\n"
+                                       "'café'\n"
+                                       "[1, [True, 'a']]\n"
+                                       "(Lambda (y) y)")
+        self.assertTrue(ok)
+        self.assertEqual(records[:5], [
+            {'index': 0, 'line': 1, 'defined': 'twice'},
+            {'index': 1, 'line': 2, 'value': 42},
+            {'index': 2, 'line': 4, 'value': True},
+            {'index': 3, 'line': 5, 'value': 'café'},
+            {'index': 4, 'line': 6, 'value': [1, [True, 'a']]},
+        ])
+        self.assertEqual((records[5]['index'], records[5]['line']), (5, 7))
+        self.assertIsInstance(records[5]['value'], str)
+
+    def test_error_record(self):
+        """
+        Test if the error ending a program is recorded where it was raised, not where it was caught.
+        """
+        ok, records = self.run_records("1 + 1\nDefun {'name': 'f', 'arguments': (x)}\n    x / 0\nf(1)\n2")
+        self.assertFalse(ok)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2]['index'], 2)
+        error = records[2]['error']
+        self.assertEqual(error['type'], 'InterpreterError')
+        self.assertEqual(error['message'], "Division by zero")
+        self.assertEqual((records[2]['line'], error['line']), (3, 3))
+        self.assertIsInstance(error['column'], int)
+
+        ok, records = self.run_records("1\n2 +")
+        self.assertFalse(ok)
+        self.assertEqual(records[1]['index'], 1)
+        self.assertEqual(records[1]['error']['line'], 2)
+
+    def test_budget_error_record(self):
+        """
+        Test if an exhausted budget is recorded with the budget and its limit.
+        """
+        ok, records = self.run_records("Defun {'name': 'forever', 'arguments': (n)} forever(n + 1)\nforever(1)",
+                                       Meter(max_depth=20))
+        self.assertFalse(ok)
+        self.assertEqual(records[1]['error']['type'], 'BudgetExceededError')
+        self.assertEqual((records[1]['error']['budget'], records[1]['error']['limit']), ('depth', 20))
+
+    def test_writer_buffers(self):
+        """
+        Test if the writer collects records and writes them in chunks of its buffer size.
+        """
+        file = CountingFile()
+        writer = JsonlWriter(file, buffer_size=100)
+        for i in range(50):
+            writer.write({'index': i, 'value': i})
+        self.assertLess(file.writes, 15)
+        writer.flush()
+        self.assertEqual([json.loads(line)['index'] for line in file.getvalue().splitlines()], list(range(50)))
+        self.assertEqual(writer.records, 50)
+
+    def test_command_line(self):
+        """
+        Test if the run command writes the records of every file to the given file.
+        """
+        filename = self.write_program("1 + 2\n'x'")
+        output = os.path.join(self.directory, 'out.jsonl')
+        self.assertEqual(main(['run', '--no-cache', '--jsonl', output, filename, filename]), 0)
+        with open(output, 'r', encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual([record['value'] for record in records], [3, 'x', 3, 'x'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 from errors import InterpreterError
@@ -80,6 +82,49 @@ class TestLexer(unittest.TestCase):
                           'LPAREN', 'ID', 'COMMA', 'ID', 'RPAREN', 'RCURLY', 'ID', 'OP', 'ID']
         self.assertEqual([token.type for token in tokens], expected_types)
 
+    def write_file(self, code):
+        """
+        Write code to a temporary .lambda file, returning its path.
+        """
+        file = tempfile.NamedTemporaryFile('w', suffix='.lambda', delete=False)
+        with file:
+            file.write(code)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_iter_tokens_file_matches_tokenize(self):
+        """
+        Test if streaming tokenization of a file yields the same tokens as tokenize,
+        including multi-line strings.
+        """
+        code = "Defun {'name': 'add', 'arguments': (x, y)}\n    x + y <= 10 and 'multi\nline'\nadd(2, 3)"
+        expected = self.lexer.tokenize(code)
+        self.assertEqual(list(self.lexer.iter_tokens_file(self.write_file(code))), expected)
+
+    def test_iter_tokens_file_unexpected_character(self):
+        """
+        Test if streaming tokenization of a file reports unexpected characters with their full line as context.
+        """
+        with self.assertRaises(InterpreterError) as context:
+            list(self.lexer.iter_tokens_file(self.write_file("1 + 2\nx @ y\n3")))
+
+        self.assertEqual(context.exception.line, 2)
+        self.assertEqual(context.exception.context, "x @ y")
+
+    def test_tokenize_compact_matches_tokenize(self):
+        """
+        Test if the compact token stream materializes the same tokens as tokenize.
+        """
+        code = "Defun {'name': 'add', 'arguments': (x, y)}\n    x + y <= 10 and True\nadd(2, 3)"
+        expected = self.lexer.tokenize(code)
+        tokens = self.lexer.tokenize_compact(code)
+        self.assertEqual(len(tokens), len(expected))
+        self.assertEqual(list(tokens), expected)
+        self.assertEqual(tokens[-1], expected[-1])
+        self.assertEqual(tokens.value(len(tokens) - 2), 3)
+        with self.assertRaises(IndexError):
+            tokens[len(expected)]
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+from interpreter import Interpreter
+from lexer import Lexer
+from memo import MemoStore
+from parser import Parser
+
+
+class TestMemo(unittest.TestCase):
+    """
+    Unit tests for the persistent memo store.
+    """
+    def setUp(self):
+        """
+        Create a fresh database file for each test.
+        """
+        directory = tempfile.mkdtemp()
+        self.filename = os.path.join(directory, 'memo.db')
+
+    def run_code(self, code, store):
+        """
+        Evaluate code in a new interpreter using the store, returning the last result.
+        """
+        interpreter = Interpreter(store)
+        result = None
+        for node in Parser(Lexer().tokenize(code)).parse():
+            result = interpreter.evaluate(node)
+        return result
+
+    def test_results_persist_across_runs(self):
+        """
+        Test if a second run with the same definitions is answered from the store.
+        """
+        code = """
+        Defun {'name': 'fib', 'arguments': (n)} (n < 3 and 1) or (fib(n - 1) + fib(n - 2))
+        fib(20)
+        """
+        with MemoStore(self.filename) as store:
+            self.assertEqual(self.run_code(code, store), 6765)
+            self.assertEqual(store.misses, 20)  # Each fib(n - 2) was already computed by fib(n - 1)
+        with MemoStore(self.filename) as store:
+            self.assertEqual(self.run_code(code, store), 6765)
+            self.assertEqual(store.stats()['hits'], 1)
+            self.assertEqual(store.stats()['misses'], 0)
+
+    def test_changed_callee_invalidates(self):
+        """
+        Test if changing a function a memoized function calls gives fresh results.
+        """
+        caller = "Defun {'name': 'f', 'arguments': (x)} g(x) + 1\nf(5)\n"
+        with MemoStore(self.filename) as store:
+            self.assertEqual(self.run_code("Defun {'name': 'g', 'arguments': (x)} x * 2\n" + caller, store), 11)
+            self.assertEqual(self.run_code("Defun {'name': 'g', 'arguments': (x)} x * 3\n" + caller, store), 16)
+            # Layout does not matter, only structure
+            self.assertEqual(self.run_code("Defun {'name': 'g', 'arguments': (x)}\n  x*3\n" + caller, store), 16)
+            self.assertEqual(store.hits, 1)
+
+    def test_mutually_recursive_functions(self):
+        """
+        Test if functions sharing the same definitions do not answer each other's calls.
+        """
+        code = """
+        Defun {'name': 'is_even', 'arguments': (n)} (n == 0) or is_odd(n - 1)
+        Defun {'name': 'is_odd', 'arguments': (n)} (n != 0) and is_even(n - 1)
+        """
+        with MemoStore(self.filename) as store:
+            self.assertEqual(self.run_code(code + "is_odd(4)", store), False)
+            self.assertEqual(self.run_code(code + "is_even(4)", store), True)
+            self.assertEqual(self.run_code(code + "is_odd(3)", store), True)
+            self.assertEqual(self.run_code(code + "is_even(3)", store), False)
+
+    def test_eviction(self):
+        """
+        Test if the store stays within its size bound, evicting the least recently used results.
+        """
+        with MemoStore(self.filename, max_entries=10) as store:
+            self.run_code("Defun {'name': 'sq', 'arguments': (x)} x * x\nsq(0)\n", store)
+            interpreter = Interpreter(store)
+            interpreter.evaluate(Parser(Lexer().tokenize("Defun {'name': 'sq', 'arguments': (x)} x * x")).parse()[0])
+            sq = interpreter.global_env.lookup('sq')
+            for x in range(1, 30):
+                sq(0)  # Keep sq(0) recently used
+                self.assertEqual(sq(x), x * x)
+            self.assertLessEqual(len(store), 10)
+            self.assertGreater(store.evictions, 0)
+            hits = store.hits
+            sq(0)
+            self.assertEqual(store.hits, hits + 1)
+
+    def test_only_integers_and_booleans(self):
+        """
+        Test if calls with function arguments bypass the store.
+        """
+        code = """
+        Defun {'name': 'apply', 'arguments': (f, x)} f(x)
+        apply((Lambda (y) y + 1), 2)
+        """
+        with MemoStore(self.filename) as store:
+            self.assertEqual(self.run_code(code, store), 3)
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from errors import InterpreterError, BudgetExceededError
+from interpreter import Interpreter
+from lexer import Lexer
+from main import main
+from metering import Meter
+from parser import Parser
+
+
+class TestMetering(unittest.TestCase):
+    """
+    Unit tests for fuel metering.
+    """
+    def setUp(self):
+        """
+        Define a function that never terminates and one that does.
+        """
+        self.interpreter = Interpreter()
+        self.run_code("""
+        Defun {'name': 'forever', 'arguments': (n)} forever(n + 1)
+        Defun {'name': 'sum', 'arguments': (n)} (n == 1 and 1) or (n + sum(n - 1))
+        """)
+
+    def run_code(self, code, meter=None):
+        """
+        Evaluate code under the meter, if given, returning the last result.
+        """
+        if meter is not None:
+            meter.install(self.interpreter)
+        try:
+            result = None
+            for node in Parser(Lexer().tokenize(code)).parse():
+                result = self.interpreter.evaluate(node)
+            return result
+        finally:
+            if meter is not None:
+                meter.uninstall(self.interpreter)
+
+    def test_depth_budget(self):
+        """
+        Test if runaway recursion stops with a catchable error pointing at the call.
+        """
+        with self.assertRaises(BudgetExceededError) as cm:
+            self.run_code("\nforever(1)", Meter(max_depth=50))
+        self.assertIsInstance(cm.exception, InterpreterError)
+        self.assertEqual(cm.exception.budget, 'depth')
+        self.assertEqual(cm.exception.line, 2)  # The recursive call in the body
+        self.assertIn("call depth above 50", str(cm.exception))
+        self.assertEqual(self.run_code("sum(50)", Meter(max_depth=50)), 1275)
+
+    def test_steps_budget(self):
+        """
+        Test if the steps budget counts evaluated nodes and is not wrapped by enclosing nodes.
+        """
+        meter = Meter(max_steps=1000)
+        self.assertEqual(self.run_code("sum(10)", meter), 55)
+        used = meter.steps
+        self.assertGreater(used, 10)
+        with self.assertRaises(BudgetExceededError) as cm:
+            self.run_code("sum(10)", Meter(max_steps=used - 1))
+        self.assertEqual(cm.exception.budget, 'steps')
+        self.assertEqual(cm.exception.message, f"Evaluation budget exceeded: more than {used - 1} evaluation steps")
+
+    def test_environments_budget(self):
+        """
+        Test if the environments budget stops a run at the call that allocates too many.
+        """
+        meter = Meter(max_environments=20)
+        self.assertEqual(self.run_code("sum(20)", meter), 210)
+        self.assertEqual(meter.environments, 20)
+        meter.reset()
+        with self.assertRaises(BudgetExceededError) as cm:
+            self.run_code("sum(21)", meter)
+        self.assertEqual(cm.exception.budget, 'environments')
+        self.assertIsNotNone(cm.exception.line)
+
+    def test_unmetered_interpreter_unchanged(self):
+        """
+        Test if a meter leaves no overrides behind, and budgets that are not set add none.
+        """
+        meter = Meter(max_depth=10)
+        meter.install(self.interpreter)
+        self.assertNotIn('evaluate', vars(self.interpreter))
+        meter.uninstall(self.interpreter)
+        self.assertNotIn('eval_function_call', vars(self.interpreter))
+
+    def test_zero_budgets_on_command_line(self):
+        """
+        Test if a budget of 0 given on the command line is enforced rather than ignored.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'program.lambda')
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write("1 + 2\n")
+            self.assertEqual(main(['run', '--no-cache', filename]), 0)
+            self.assertNotEqual(main(['run', '--no-cache', '--max-steps', '0', filename]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
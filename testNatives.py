@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from errors import InterpreterError
+from interpreter import Interpreter, Environment
+from lexer import Lexer
+from memo import MemoStore
+from natives import NativeFunction, REGISTRY
+from parser import Parser
+
+
+class TestNatives(unittest.TestCase):
+    """
+    Unit tests for the native function registry and the numeric library.
+    """
+    def setUp(self):
+        """
+        Set up the lexer, parser, and interpreter before each test.
+        """
+        self.lexer = Lexer()
+        self.parser = Parser([])
+        self.interpreter = Interpreter()
+
+    def interpret(self, code):
+        """
+        Helper method to interpret a string of code.
+        """
+        tokens = self.lexer.tokenize(code)
+        self.parser.tokens = tokens
+        ast = self.parser.parse()
+        self.interpreter.set_code(code)  # Set the code before evaluation
+        return [self.interpreter.evaluate(node) for node in ast]
+
+    def test_registry_installed(self):
+        """
+        Test if every registered native, including the sequence builtins, is predefined.
+        """
+        for name in ('abs', 'min', 'max', 'pow', 'isqrt', 'gcd', 'lcm', 'factorial', 'len', 'get', 'map', 'reduce'):
+            self.assertIn(name, REGISTRY)
+            self.assertIsInstance(self.interpreter.global_env.lookup(name), NativeFunction)
+
+    def test_numeric_library(self):
+        """
+        Test the numeric natives.
+        """
+        self.assertEqual(self.interpret("abs(0 - 7)\nmin(4, 2, 9)\nmax(4, 2, 9)\npow(3, 4)\npow(3, 4, 5)\n"
+                                        "isqrt(99)\ngcd(12, 18)\nlcm(4, 6)\nfactorial(5)"),
+                         [7, 2, 9, 81, 1, 9, 6, 12, 120])
+
+    def test_fast_path_creates_no_environment(self):
+        """
+        Test if calling a native creates no environment, unlike calling a defined function.
+        """
+        created = []
+
+        class CountingEnvironment(Environment):
+            def __init__(self, parent=None):
+                super().__init__(parent)
+                created.append(self)
+
+        self.interpreter.environment_class = CountingEnvironment
+        self.interpret("Defun {'name': 'twice', 'arguments': (x)} x * 2")
+        self.interpret("gcd(pow(2, 10), max(6, 8))")
+        self.assertEqual(created, [])
+        self.interpret("twice(3)")
+        self.assertEqual(len(created), 1)
+
+    def test_arity_and_type_errors(self):
+        """
+        Test if calls with the wrong number or type of arguments raise interpreter errors.
+        """
+        with self.assertRaises(InterpreterError) as context:
+            self.interpret("gcd(1)")
+        self.assertIn("gcd expects 2 arguments, got 1", str(context.exception))
+        with self.assertRaises(InterpreterError) as context:
+            self.interpret("min()")
+        self.assertIn("min expects at least 1 argument, got 0", str(context.exception))
+        for code in ("abs(True and [1])", "pow(2, 0 - 1)", "isqrt(0 - 4)"):
+            with self.assertRaises(InterpreterError):
+                self.interpret(code)
+
+    def test_natives_as_values(self):
+        """
+        Test if natives can be passed to higher-order builtins and shadowed by definitions.
+        """
+        self.assertEqual(str(self.interpret("list(map(abs, [0 - 1, 2]))")[0]), '[1, 2]')
+        self.interpret("Defun {'name': 'abs', 'arguments': (x)} x + 100")
+        self.assertEqual(self.interpret("abs(1)"), [101])
+
+    def test_impure_natives_are_not_memoized(self):
+        """
+        Test if functions that call an impure native are not memoized.
+        """
+        counter = iter(range(100))
+        filename = os.path.join(tempfile.mkdtemp(), 'memo.db')
+        with MemoStore(filename) as store:
+            interpreter = Interpreter(store)
+            interpreter.global_env.define('tick', NativeFunction('tick', lambda: next(counter), 0, pure=False))
+            for node in Parser(Lexer().tokenize("Defun {'name': 'f', 'arguments': (x)} x + tick()\n"
+                                                "Defun {'name': 'g', 'arguments': (x)} x * 2\n"
+                                                "f(1)\nf(1)\ng(1)\ng(1)")).parse():
+                interpreter.evaluate(node)
+            self.assertFalse(interpreter.is_pure('f'))
+            self.assertTrue(interpreter.is_pure('g'))
+            self.assertEqual(store.hits, 1)
+            self.assertEqual(next(counter), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
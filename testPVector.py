@@ -0,0 +1,124 @@
+import random
+import unittest
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser, ListLiteral, Number
+from pvector import PersistentVector
+
+
+class TestPVector(unittest.TestCase):
+    """
+    Unit tests for persistent vectors and the list syntax and builtins.
+    """
+    def setUp(self):
+        """
+        Set up the lexer, parser, and interpreter before each test.
+        """
+        self.lexer = Lexer()
+        self.parser = Parser([])
+        self.interpreter = Interpreter()
+
+    def interpret(self, code):
+        """
+        Helper method to interpret a string of code.
+        """
+        tokens = self.lexer.tokenize(code)
+        self.parser.tokens = tokens
+        ast = self.parser.parse()
+        self.interpreter.set_code(code)  # Set the code before evaluation
+        return [self.interpreter.evaluate(node) for node in ast]
+
+    def test_append_and_get(self):
+        """
+        Test if appending across several trie levels keeps every element at its index.
+        """
+        vector = PersistentVector()
+        for i in range(33000):
+            vector = vector.append(i)
+        self.assertEqual(len(vector), 33000)
+        self.assertEqual(list(vector), list(range(33000)))
+        self.assertEqual([vector.get(i) for i in (0, 31, 32, 1023, 1024, 1056, 32767, 32999)],
+                         [0, 31, 32, 1023, 1024, 1056, 32767, 32999])
+        with self.assertRaises(IndexError):
+            vector.get(33000)
+
+    def test_structural_sharing(self):
+        """
+        Test if updates and appends leave the original vector unchanged and share its nodes.
+        """
+        original = PersistentVector.from_iterable(range(5000))
+        expected = list(range(5000))
+        vector = original
+        rng = random.Random(42)
+        for _ in range(500):
+            index = rng.randrange(5000)
+            vector = vector.update(index, -index)
+            expected[index] = -index
+        vector = vector.append('end')
+        self.assertEqual(list(vector), expected + ['end'])
+        self.assertEqual(list(original), list(range(5000)))
+        updated = original.update(0, None)
+        self.assertIs(updated.root[1], original.root[1])
+        self.assertIs(updated.tail, original.tail)
+
+    def test_from_iterable_and_slice(self):
+        """
+        Test if vectors built at once behave like those built by appends, and slices are clamped.
+        """
+        for n in (0, 1, 32, 33, 1056, 1057, 40000):
+            vector = PersistentVector.from_iterable(range(n))
+            appended = PersistentVector()
+            for i in range(n):
+                appended = appended.append(i)
+            self.assertEqual((vector.shift, vector.root, vector.tail),
+                             (appended.shift, appended.root, appended.tail))
+            self.assertEqual(list(vector.append(n)), list(range(n + 1)))
+            self.assertEqual(list(vector.slice(3, n - 2)), list(range(n))[3:max(3, n - 2)])
+        vector = PersistentVector.from_iterable(range(10))
+        self.assertIs(vector.slice(0, 100), vector)
+        self.assertEqual(list(vector.slice(8, 3)), [])
+
+    def test_list_literal(self):
+        """
+        Test if list literals are parsed, including nested and empty lists.
+        """
+        node = Parser(Lexer().tokenize("[1, [2], []]")).parse()[0]
+        self.assertIsInstance(node, ListLiteral)
+        self.assertEqual(len(node.elements), 3)
+        self.assertIsInstance(node.elements[0], Number)
+        self.assertEqual(self.interpret("[1 + 1, [True], []]"),
+                         [PersistentVector.from_iterable([2, PersistentVector.from_iterable([True]),
+                                                          PersistentVector()])])
+        with self.assertRaises(InterpreterError):
+            Parser(Lexer().tokenize("[1, 2")).parse()
+
+    def test_builtins(self):
+        """
+        Test the list builtins, from the language.
+        """
+        results = self.interpret(
+            "Defun {'name': 'fill', 'arguments': (v, n)} (n == 0 and v) or fill(append(v, n), n - 1)\n"
+            "len(fill([], 100))\n"
+            "get(fill([], 100), 99)\n"
+            "slice(update([1, 2, 3, 4], 1, 20), 1, 3)\n"
+            "update([1, 2], 0, 5) == [5, 2]\n"
+        )
+        self.assertEqual(results[1:4], [100, 1, PersistentVector.from_iterable([20, 3])])
+        self.assertIs(results[4], True)
+        self.assertEqual(str(results[3]), '[20, 3]')
+
+    def test_builtin_errors(self):
+        """
+        Test if misusing the builtins raises interpreter errors.
+        """
+        with self.assertRaises(InterpreterError) as context:
+            self.interpret("get([1, 2], 2)")
+        self.assertIn("out of range", str(context.exception))
+        with self.assertRaises(InterpreterError):
+            self.interpret("len(5)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from parallel_frontend import split_statements, parse_parallel, parse_sequential, parse_file_parallel
+from parser import ASTNode
+from errors import InterpreterError
+from source import SourceBuffer
+
+
+def dump(node):
+    """
+    Returns a comparable representation of an AST, including line and column numbers.
+    """
+    if isinstance(node, ASTNode):
+        return (type(node).__name__,) + tuple(sorted((k, dump(v)) for k, v in vars(node).items()))
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    return node
+
+
+class TestParallelFrontend(unittest.TestCase):
+    """
+    Unit tests for the parallel lexing and parsing front-end.
+    """
+    code = (
+        "Defun {'name': 'fact', 'arguments': (n)}\n"
+        "    (n == 0) or (n * fact(n - 1))\n"
+        "fact(5)\n"
+        "Defun {'name': 'multi\nDefun line', 'arguments': (x)}\n"
+        "    x + 1\n"
+        "Defun {'name': 'id', 'arguments': (x)} x\n"
+        "id(1) + 2\n"
+    ) * 3
+
+    def test_split_respects_strings(self):
+        """
+        Test if chunks only start at statement lines outside of string literals.
+        """
+        chunks = split_statements(SourceBuffer(self.code), 20)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(self.code))
+        for start, end, line in chunks[1:]:
+            self.assertTrue(self.code.startswith(("Defun {", "fact(5)", "id(1)"), start))
+            self.assertEqual(line, self.code.count('\n', 0, start) + 1)
+
+    def test_parallel_matches_sequential(self):
+        """
+        Test if the parallel parse produces the same AST, with the same absolute positions, as a sequential parse.
+        """
+        expected = parse_sequential(self.code)
+        statements = parse_parallel(self.code, workers=4, min_chunk_size=1)
+        self.assertEqual(dump(statements), dump(expected))
+        self.assertEqual(statements[-1].line, self.code.count('\n'))
+
+    def test_parallel_reports_errors_like_sequential(self):
+        """
+        Test if a syntax error is reported as the sequential parse reports it.
+        """
+        code = self.code + "1 +\nDefun {'name': 'g', 'arguments': (x)} x\n"
+        with self.assertRaises(InterpreterError) as expected:
+            parse_sequential(code)
+        with self.assertRaises(InterpreterError) as context:
+            parse_parallel(code, workers=4, min_chunk_size=1)
+        self.assertEqual(str(context.exception), str(expected.exception))
+
+    def test_file_without_definitions(self):
+        """
+        Test if a memory-mapped file of expressions alone is split and parsed like a sequential parse,
+        including expressions that continue on the next line.
+        """
+        code = "".join(f"{i} + 1\nlen('é{i}') * 2 +\n    {i}\n[{i},\n 2]\n" for i in range(200))
+        with tempfile.NamedTemporaryFile('wb', suffix='.lambda', delete=False) as file:
+            file.write(code.encode())
+        self.addCleanup(os.remove, file.name)
+        source = SourceBuffer.open(file.name)
+        self.addCleanup(source.close)
+        self.assertEqual(len(split_statements(source, 4)), 4)
+        statements = parse_file_parallel(file.name, workers=4, min_chunk_size=1)
+        self.assertEqual(dump(statements), dump(parse_sequential(code)))
+        self.assertEqual(len(statements), 600)
+
+        # A line that looks like the start of a statement but continues the one before
+        code = "1 +\n2\n" * 200
+        self.assertEqual(dump(parse_parallel(code, workers=4, min_chunk_size=1)), dump(parse_sequential(code)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -159,6 +159,66 @@ class TestParser(unittest.TestCase):
         self.assertEqual(ast.params, ['x'])
         self.assertIsInstance(ast.body, BinaryOp)
 
+    def test_parse_stream_is_lazy(self):
+        """
+        Test if the parser yields each statement before pulling the tokens of the next one.
+        """
+        tokens = [
+            Token('NUMBER', 1, 1, 0),
+            Token('OP', '+', 1, 2),
+            Token('NUMBER', 2, 1, 4),
+            Token('ID', 'x', 2, 0),
+            Token('NUMBER', 3, 3, 0),
+        ]
+        pulled = []
+
+        def source():
+            for token in tokens:
+                pulled.append(token)
+                yield token
+
+        statements = self.parser.parse_stream(source())
+        first = next(statements)
+        self.assertIsInstance(first, BinaryOp)
+        self.assertEqual(len(pulled), 4)  # the statement plus one token of lookahead
+        second = next(statements)
+        self.assertIsInstance(second, Identifier)
+        self.assertIsInstance(next(statements), Number)
+        self.assertEqual(list(statements), [])
+
+    def test_parse_compact_token_stream(self):
+        """
+        Test if the parser consumes a compact token stream directly.
+        """
+        tokens = Lexer().tokenize_compact("Defun {'name': 'add', 'arguments': (x, y)} x + y\nadd(2, 3)")
+        self.parser.tokens = tokens
+        function_def, call = self.parser.parse()
+        self.assertIsInstance(function_def, FunctionDef)
+        self.assertEqual(function_def.params, ['x', 'y'])
+        self.assertIsInstance(call, FunctionCall)
+        self.assertEqual((call.line, call.column), (2, 0))
+
+    def test_operator_precedence(self):
+        """
+        Test if operators group by precedence and associate to the left.
+        """
+        ast = self.parse(Lexer().tokenize("1 - 2 - 3 * 4 < 5 or x"))
+        self.assertEqual(ast.op, 'or')
+        comparison = ast.left
+        self.assertEqual(comparison.op, '<')
+        difference = comparison.left
+        self.assertEqual(difference.op, '-')
+        self.assertEqual(difference.left.op, '-')
+        self.assertEqual(difference.right.op, '*')
+
+    def test_parse_deeply_nested_parentheses(self):
+        """
+        Test if deeply parenthesized expressions parse without exhausting the recursion limit.
+        """
+        ast = self.parse(Lexer().tokenize("(" * 250 + "1 + 2" + ")" * 250))
+        self.assertIsInstance(ast, BinaryOp)
+        self.assertEqual(ast.op, '+')
+
 
 if __name__ == '__main__':
     unittest.main()
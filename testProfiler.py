@@ -0,0 +1,66 @@
+import io
+import unittest
+
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """
+    Unit tests for the sampling profiler.
+    """
+    def setUp(self):
+        """
+        Define a slow recursive function called through a helper.
+        """
+        self.interpreter = Interpreter()
+        code = """
+        Defun {'name': 'count', 'arguments': (n)} (n == 0) or count(n - 1)
+        Defun {'name': 'loop', 'arguments': (n)} (n == 0) or (count(30) and loop(n - 1))
+        """
+        for node in Parser(Lexer().tokenize(code)).parse():
+            self.interpreter.evaluate(node)
+
+    def run_code(self, code):
+        """
+        Evaluate code, returning the result of its last statement.
+        """
+        result = None
+        for node in Parser(Lexer().tokenize(code)).parse():
+            result = self.interpreter.evaluate(node)
+        return result
+
+    def test_shadow_stack_sampling(self):
+        """
+        Test if samples are taken of language-level stacks, outermost call first.
+        """
+        profiler = Profiler(interval=0.001)
+        profiler.start(self.interpreter)
+        try:
+            self.assertTrue(self.run_code("loop(40)\n" * 20))
+        finally:
+            profiler.stop()
+        self.assertGreater(sum(profiler.samples.values()), 0)
+        for frames in profiler.samples:
+            self.assertTrue(profiler.frame_name(frames[0]).startswith('loop:'))
+            self.assertLessEqual(len(frames), 40 + 31)
+        self.assertEqual(profiler._stack, [])
+        self.assertNotIn('eval_function_call', vars(self.interpreter))
+
+    def test_folded_output(self):
+        """
+        Test if stacks are folded into 'frame;frame count' lines.
+        """
+        profiler = Profiler()
+        node = Parser(Lexer().tokenize("\ncount(1)")).parse()[0]
+        profiler.samples[(node, node)] = 3
+        profiler.samples[(node,)] = 5
+        file = io.StringIO()
+        profiler.write_folded(file)
+        self.assertEqual(file.getvalue(), "count:2 5\ncount:2;count:2 3\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
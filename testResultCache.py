@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+import result_cache
+from result_cache import ResultCache
+from source import SourceBuffer
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Unit tests for the whole-program result cache.
+    """
+    def setUp(self):
+        """
+        Create a cache in a fresh directory, and count the runs of each program.
+        """
+        self.cache = ResultCache(tempfile.mkdtemp(), max_entries=3)
+        self.runs = 0
+
+    def replay(self, code):
+        """
+        Run code through the cache, returning its output lines.
+        """
+        source = SourceBuffer(code)
+
+        def run():
+            self.runs += 1
+            interpreter = Interpreter()
+            interpreter.set_source(source)
+            try:
+                for node in Parser(Lexer().tokenize(code)).parse():
+                    result = interpreter.evaluate(node)
+                    if result is not None:
+                        yield str(result), False
+            except InterpreterError as e:
+                yield str(e), True
+
+        return [line for line, _ in self.cache.replay(source, run)]
+
+    def test_replay(self):
+        """
+        Test if an unchanged program, or one whose layout changed, is replayed without running.
+        """
+        output = self.replay("Defun {'name': 'f', 'arguments': (x)} x * 2\nf(21)\n")
+        self.assertEqual(output, ["Function 'f' defined", "42"])
+        self.assertEqual(self.replay("Defun {'name': 'f', 'arguments': (x)} x * 2\nf(21)\n"), output)
+        self.assertEqual(self.replay("Defun {'name': 'f',\n 'arguments': (x)}\n    x*2\nf( 21 )"), output)
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(self.replay("Defun {'name': 'f', 'arguments': (x)} x * 3\nf(21)\n")[1], "63")
+        self.assertEqual(self.runs, 2)
+
+    def test_errors_need_identical_source(self):
+        """
+        Test if the output of a failing program is only replayed for the exact same text,
+        since error messages quote the source.
+        """
+        output = self.replay("1\n10 / 0\n")
+        self.assertIn("Division by zero", output[1])
+        self.assertEqual(self.replay("1\n10 / 0\n"), output)
+        self.assertEqual(self.runs, 1)
+        moved = self.replay("1\n\n10 / 0\n")
+        self.assertIn("Line 3", moved[1])
+        self.assertEqual(self.runs, 2)
+
+    def test_interpreter_change_invalidates(self):
+        """
+        Test if output recorded by a different version of the interpreter is not replayed.
+        """
+        self.replay("len([1, 2])\n")
+        self.replay("len([1, 2])\n")
+        self.assertEqual(self.runs, 1)
+        self.addCleanup(setattr, result_cache, '_interpreter_hash', result_cache.interpreter_hash())
+        result_cache._interpreter_hash = b'another version'
+        self.cache = ResultCache(self.cache.directory, max_entries=3)
+        self.assertEqual(self.replay("len([1, 2])\n"), ["2"])
+        self.assertEqual(self.runs, 2)
+
+    def test_eviction(self):
+        """
+        Test if the least recently used programs are evicted beyond max_entries.
+        """
+        for i in range(5):
+            self.replay(f"{i}\n")
+            key, _ = self.cache.keys(SourceBuffer(f"{i}\n"))
+            os.utime(self.cache.path(key), (i, i))
+        self.assertEqual(len(os.listdir(self.cache.directory)), 3)
+        self.replay("4\n")
+        self.replay("0\n")
+        self.assertEqual(self.runs, 6)
+        self.assertEqual(self.cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
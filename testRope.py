@@ -0,0 +1,123 @@
+import random
+import unittest
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser, String
+from rope import Rope, LEAF_SIZE
+
+
+def check_balanced(rope):
+    """
+    Assert that the depths of the children of every node of a rope differ by at most one.
+    """
+    if rope.text is not None:
+        return 0
+    left, right = check_balanced(rope.left), check_balanced(rope.right)
+    assert abs(left - right) <= 1 and rope.depth == max(left, right) + 1
+    return rope.depth
+
+
+class TestRope(unittest.TestCase):
+    """
+    Unit tests for ropes and the string syntax and builtins.
+    """
+    def setUp(self):
+        """
+        Set up the lexer, parser, and interpreter before each test.
+        """
+        self.lexer = Lexer()
+        self.parser = Parser([])
+        self.interpreter = Interpreter()
+
+    def interpret(self, code):
+        """
+        Helper method to interpret a string of code.
+        """
+        tokens = self.lexer.tokenize(code)
+        self.parser.tokens = tokens
+        ast = self.parser.parse()
+        self.interpreter.set_code(code)  # Set the code before evaluation
+        return [self.interpreter.evaluate(node) for node in ast]
+
+    def test_concatenation_stays_balanced(self):
+        """
+        Test if appending and prepending many pieces keeps the rope shallow and its text intact.
+        """
+        rope = Rope()
+        expected = []
+        for i in range(20000):
+            piece = f"<{i}>"
+            if i % 3:
+                rope = rope + Rope(piece)
+                expected.append(piece)
+            else:
+                rope = Rope(piece) + rope
+                expected.insert(0, piece)
+        self.assertEqual(str(rope), ''.join(expected))
+        self.assertEqual(len(rope), len(''.join(expected)))
+        self.assertLessEqual(check_balanced(rope), 20)
+        self.assertTrue(all(len(leaf) <= LEAF_SIZE for leaf in rope.leaves()))
+
+    def test_slice(self):
+        """
+        Test if slices of ropes match slices of their text and share untouched nodes.
+        """
+        rng = random.Random(7)
+        rope = Rope()
+        for i in range(2000):
+            rope = rope + Rope('x' * rng.randrange(1, 700) + str(i))
+        text = str(rope)
+        for _ in range(200):
+            start, stop = rng.randrange(-5, len(text) + 5), rng.randrange(-5, len(text) + 5)
+            part = rope.slice(start, stop)
+            self.assertEqual(str(part), text[max(0, start):max(max(0, start), stop)])
+            check_balanced(part)
+        self.assertIs(rope.slice(0, len(rope)), rope)
+        self.assertIs(rope.slice(0, rope.left.length), rope.left)
+
+    def test_equality(self):
+        """
+        Test if ropes are equal when their text is, whatever their shape.
+        """
+        built = Rope('ab') + Rope('c' * 600) + Rope('d')
+        self.assertEqual(built, Rope('ab' + 'c' * 600 + 'd'))
+        self.assertNotEqual(built, Rope('ab'))
+        self.assertEqual(hash(built), hash(Rope(str(built))))
+
+    def test_string_literal(self):
+        """
+        Test if string literals are parsed and evaluated, with either quote.
+        """
+        node = Parser(Lexer().tokenize("'hello'")).parse()[0]
+        self.assertIsInstance(node, String)
+        self.assertEqual(node.value, 'hello')
+        self.assertEqual(self.interpret("'a' + \"b c\""), [Rope('ab c')])
+
+    def test_builtins(self):
+        """
+        Test length, slicing and equality of strings built recursively in the language.
+        """
+        results = self.interpret(
+            "Defun {'name': 'repeat', 'arguments': (s, n)} (n == 1 and s) or (s + repeat(s, n - 1))\n"
+            "len(repeat('abc', 100))\n"
+            "slice(repeat('abc', 100), 2, 6)\n"
+            "repeat('ab', 3) == 'ababab'\n"
+            "repeat('ab', 3) != 'abab'\n"
+        )
+        self.assertEqual(results[1:], [300, Rope('cabc'), True, True])
+        self.assertEqual(str(results[2]), 'cabc')
+
+    def test_type_errors(self):
+        """
+        Test if mixing strings and numbers raises interpreter errors.
+        """
+        with self.assertRaises(InterpreterError):
+            self.interpret("'a' + 1")
+        with self.assertRaises(InterpreterError):
+            self.interpret("len(1)")
+
+
+if __name__ == '__main__':
+    unittest.main()
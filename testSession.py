@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from errors import InterpreterError
+from session import Prelude, Session
+
+
+PRELUDE = """
+Defun {'name': 'square', 'arguments': (x)} x * x
+Defun {'name': 'sum_squares', 'arguments': (a, b)} square(a) + square(b)
+Defun {'name': 'count', 'arguments': (n)} (n == 0) or count(n - 1)
+"""
+
+
+class TestSession(unittest.TestCase):
+    """
+    Unit tests for sessions over a shared prelude.
+    """
+    def setUp(self):
+        """
+        Load the shared prelude.
+        """
+        self.prelude = Prelude(PRELUDE)
+
+    def test_prelude_functions(self):
+        """
+        Test if a session can call and build on the prelude's functions.
+        """
+        session = self.prelude.session()
+        self.assertEqual(session.run("sum_squares(3, 4)"), [25])
+        session.run("Defun {'name': 'cube', 'arguments': (x)} x * square(x)")
+        self.assertEqual(session.run("cube(3)"), [27])
+        names = [node.name for node in session.interpreter.function_dependencies('cube')]
+        self.assertEqual(names, ['cube', 'square'])
+
+    def test_sessions_are_isolated(self):
+        """
+        Test if definitions made in one session are invisible to the prelude and other sessions.
+        """
+        first = self.prelude.session()
+        second = self.prelude.session()
+        first.run("Defun {'name': 'square', 'arguments': (x)} x + x")
+        self.assertEqual(first.run("square(5)"), [10])
+        self.assertEqual(first.run("sum_squares(3, 4)"), [25])  # The prelude keeps its own square
+        self.assertEqual(second.run("square(5)"), [25])
+        first.run("Defun {'name': 'only_first', 'arguments': (x)} x")
+        with self.assertRaises(InterpreterError):
+            second.run("only_first(1)")
+        self.assertNotIn('only_first', self.prelude.environment.variables)
+
+    def test_prelude_is_read_only(self):
+        """
+        Test if the shared environment cannot be modified.
+        """
+        with self.assertRaises(TypeError):
+            self.prelude.environment.define('square', None)
+        with self.assertRaises(TypeError):
+            self.prelude.environment.variables['square'] = None
+
+    def test_concurrent_sessions(self):
+        """
+        Test if sessions running in parallel threads each get their own results.
+        """
+        results = {}
+
+        def work(index):
+            session = self.prelude.session()
+            session.run(f"Defun {{'name': 'offset', 'arguments': (x)}} x + {index}")
+            results[index] = [session.run(f"count(50) and offset(sum_squares({i}, 1))")[0] for i in range(50)]
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index in range(8):
+            self.assertEqual(results[index], [i * i + 1 + index for i in range(50)])
+
+    def test_empty_session(self):
+        """
+        Test if a session without a prelude works like a plain interpreter.
+        """
+        self.assertEqual(Session().run("Defun {'name': 'f', 'arguments': (x)} x\nf(2)"), ["Function 'f' defined", 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from errors import InterpreterError
+from lexer import Lexer
+from main import execute_file
+from source import SourceBuffer
+
+
+class TestSource(unittest.TestCase):
+    """
+    Unit tests for the SourceBuffer class.
+    """
+    def test_line_text(self):
+        """
+        Test if lines are looked up by number without their line breaks.
+        """
+        source = SourceBuffer("first\nsecond\n\nfourth")
+        self.assertEqual(source.line_count(), 4)
+        self.assertEqual(source.line_text(1), "first")
+        self.assertEqual(source.line_text(2), "second")
+        self.assertEqual(source.line_text(3), "")
+        self.assertEqual(source.line_text(4), "fourth")
+        self.assertIsNone(source.line_text(5))
+        self.assertIsNone(source.line_text(0))
+
+    def test_offsets_and_positions(self):
+        """
+        Test if line/column positions and absolute offsets convert into each other.
+        """
+        source = SourceBuffer("ab\ncde\nf")
+        self.assertEqual(source.offset(2, 1), 4)
+        self.assertEqual(source.position(4), (2, 1))
+        self.assertEqual(source.position(0), (1, 0))
+        self.assertEqual(source.position(7), (3, 0))
+
+    def test_memory_mapped_file(self):
+        """
+        Test if a memory-mapped file with CRLF line breaks is tokenized and reported like a string.
+        """
+        with tempfile.NamedTemporaryFile('wb', suffix='.lambda', delete=False) as file:
+            file.write(b"Defun {'name': 'inc', 'arguments': (x)}\r\n  x + 1\r\ninc(41)\r\n")
+        try:
+            source = SourceBuffer.open(file.name)
+            self.assertEqual(source.line_text(2), "  x + 1")
+            tokens = Lexer().tokenize_file(file.name)
+            self.assertEqual([token.value for token in tokens[-4:]], ['inc', '(', 41, ')'])
+            self.assertEqual(tokens[-4].line, 3)
+            source.close()
+        finally:
+            os.remove(file.name)
+
+    def test_non_ascii_file(self):
+        """
+        Test if a memory-mapped file with non-ASCII characters runs like the same text, with
+        identifiers and columns counted in characters.
+        """
+        code = "Defun {'name': 'dé', 'arguments': (x)} x + 1\n'é' + 'ü'\ndé(1) + 2 é\n"
+        with tempfile.NamedTemporaryFile('wb', suffix='.lambda', delete=False) as file:
+            file.write(code.encode())
+        try:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertFalse(execute_file(file.name, use_cache=False))
+            self.assertEqual(output.getvalue().splitlines()[:3],
+                             ["Function 'dé' defined", "éü", "Error at line 3, column 11: Unexpected character: 'é'"])
+            with self.assertRaises(InterpreterError) as context:
+                list(Lexer().iter_tokens_file(file.name))
+            self.assertEqual((context.exception.line, context.exception.column), (3, 11))
+        finally:
+            os.remove(file.name)
+
+    def test_keywords_before_non_ascii_letters(self):
+        """
+        Test if a keyword followed by a non-ASCII letter is lexed from a file as from a string.
+        """
+        for code in ("Trueé", "Lambdaü", "Defuné1", "x + Falseß(1)", "1 + 5True"):
+            with tempfile.NamedTemporaryFile('wb', suffix='.lambda', delete=False) as file:
+                file.write(code.encode())
+            try:
+                self.assertEqual(Lexer().tokenize_file(file.name), Lexer().tokenize(code), code)
+            finally:
+                os.remove(file.name)
+
+    def test_files_are_closed(self):
+        """
+        Test if the memory maps of files are released once they have been read or run.
+        """
+        with tempfile.NamedTemporaryFile('wb', suffix='.lambda', delete=False) as file:
+            file.write(b"1 + 2\n")
+        self.addCleanup(os.remove, file.name)
+        opened = []
+        original = SourceBuffer.open.__func__
+
+        def open_source(cls, filename):
+            opened.append(original(cls, filename))
+            return opened[-1]
+
+        with mock.patch.object(SourceBuffer, 'open', classmethod(open_source)), \
+                contextlib.redirect_stdout(io.StringIO()):
+            Lexer().tokenize_file(file.name)
+            list(Lexer().iter_tokens_file(file.name))
+            self.assertTrue(execute_file(file.name, use_cache=False))
+        self.assertEqual(len(opened), 3)
+        self.assertTrue(all(source.data.closed for source in opened))
+
+    def test_empty_file(self):
+        """
+        Test if an empty file can be opened even though it cannot be memory-mapped.
+        """
+        with tempfile.NamedTemporaryFile('wb', suffix='.lambda', delete=False) as file:
+            pass
+        try:
+            self.assertEqual(Lexer().tokenize_file(file.name), [])
+        finally:
+            os.remove(file.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
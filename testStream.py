@@ -0,0 +1,102 @@
+import tracemalloc
+import unittest
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from pvector import PersistentVector
+from stream import Stream, stream_range
+
+
+class TestStream(unittest.TestCase):
+    """
+    Unit tests for lazy streams and their builtins.
+    """
+    def setUp(self):
+        """
+        Set up the lexer, parser, and interpreter before each test.
+        """
+        self.lexer = Lexer()
+        self.parser = Parser([])
+        self.interpreter = Interpreter()
+
+    def interpret(self, code):
+        """
+        Helper method to interpret a string of code.
+        """
+        tokens = self.lexer.tokenize(code)
+        self.parser.tokens = tokens
+        ast = self.parser.parse()
+        self.interpreter.set_code(code)  # Set the code before evaluation
+        return [self.interpreter.evaluate(node) for node in ast]
+
+    def test_pipeline(self):
+        """
+        Test map, filter, take and reduce with language lambdas and named functions.
+        """
+        results = self.interpret(
+            "Defun {'name': 'square', 'arguments': (x)} x * x\n"
+            "list(take(filter(Lambda (x) x % 2 == 1, map(square, range(0))), 4))\n"
+            "reduce(Lambda (a, b) a + b, range(1, 101), 0)\n"
+            "list(map(Lambda (x) x + 1, [1, 2, 3]))\n"
+            "list(filter(Lambda (x) x > 5, take(range(0), 8)))\n"
+        )
+        self.assertEqual(results[1:], [PersistentVector.from_iterable([1, 9, 25, 49]), 5050,
+                                       PersistentVector.from_iterable([2, 3, 4]),
+                                       PersistentVector.from_iterable([6, 7])])
+
+    def test_laziness(self):
+        """
+        Test if stages run only when the stream is consumed, one value at a time, and stop after take.
+        """
+        calls = []
+
+        def record(name):
+            def func(value):
+                calls.append((name, value))
+                return value
+            return func
+
+        stream = stream_range(0).map(record('map')).filter(record('filter')).take(2)
+        self.assertEqual(calls, [])
+        self.assertEqual(list(stream), [1, 2])
+        self.assertEqual(calls, [('map', 0), ('filter', 0), ('map', 1), ('filter', 1), ('map', 2), ('filter', 2)])
+        self.assertEqual(list(stream), [1, 2])  # A stream can be consumed again
+
+    def test_fused_single_pass(self):
+        """
+        Test if chained stages are recorded on a single stream rather than nested.
+        """
+        stream = stream_range(0, 10).map(abs).filter(bool).map(abs).take(3)
+        self.assertEqual(len(stream.stages), 4)
+        self.assertIsInstance(stream, Stream)
+        self.assertEqual(list(stream_range(0, 10).take(3).filter(lambda x: x > 1)), [2])
+        self.assertEqual(list(stream_range(0).take(0)), [])
+
+    def test_constant_memory(self):
+        """
+        Test if consuming a long infinite stream does not hold on to its values.
+        """
+        code = "reduce(Lambda (a, b) a + b, take(map(Lambda (x) x * 2, range(0)), {}), 0)"
+        peaks = []
+        for count in (2000, 20000):
+            tracemalloc.start()
+            result = self.interpret(code.format(count))[0]
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self.assertEqual(result, count * (count - 1))
+        self.assertLess(peaks[1], peaks[0] * 2)
+
+    def test_type_errors(self):
+        """
+        Test if passing non-functions or non-sequences raises interpreter errors.
+        """
+        with self.assertRaises(InterpreterError):
+            self.interpret("map(1, range(0, 3))")
+        with self.assertRaises(InterpreterError):
+            self.interpret("take(5, 1)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import json
+import unittest
+
+import tracing
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+
+
+class TestTracing(unittest.TestCase):
+    """
+    Unit tests for the tracing hooks.
+    """
+    def setUp(self):
+        """
+        Create an interpreter with a recursive function defined.
+        """
+        self.interpreter = Interpreter()
+        self.run_code("Defun {'name': 'fact', 'arguments': (n)} (n == 0) or (n * fact(n - 1))")
+
+    def run_code(self, code, tracer=None):
+        """
+        Evaluate each statement of code, through the tracer if given.
+        """
+        results = []
+        for node in Parser(Lexer().tokenize(code)).parse():
+            if tracer is None:
+                results.append(self.interpreter.evaluate(node))
+            else:
+                results.append(tracing.evaluate_statement(self.interpreter, tracer, node))
+        return results
+
+    def test_no_overhead_without_tracer(self):
+        """
+        Test if installing and uninstalling a tracer leaves the class methods in place.
+        """
+        tracing.install(self.interpreter, tracing.RecordingTracer(trace_nodes=True))
+        self.assertIn('evaluate', vars(self.interpreter))
+        tracing.uninstall(self.interpreter)
+        self.assertNotIn('evaluate', vars(self.interpreter))
+        self.assertNotIn('eval_function_call', vars(self.interpreter))
+        self.assertNotIn('evaluate', vars(Interpreter()))
+
+    def test_function_spans(self):
+        """
+        Test if every call is recorded, nested inside its statement.
+        """
+        tracer = tracing.RecordingTracer()
+        tracing.install(self.interpreter, tracer)
+        self.assertEqual(self.run_code("fact(3)", tracer), [6])
+        events = list(tracer.events)
+        self.assertEqual([event[1] for event in events], ['fact'] * 4 + ['FunctionCall'])
+        statement = events[-1]
+        for category, _, start, duration, _ in events[:-1]:
+            self.assertEqual(category, 'function')
+            self.assertGreaterEqual(start, statement[2])
+            self.assertLessEqual(start + duration, statement[2] + statement[3])
+
+    def test_error_reported_once(self):
+        """
+        Test if an error is recorded once, where it was raised, and still propagates.
+        """
+        tracer = tracing.RecordingTracer()
+        tracing.install(self.interpreter, tracer)
+        self.run_code("Defun {'name': 'bad', 'arguments': (x)} fact(x) / 0")
+        with self.assertRaises(InterpreterError):
+            self.run_code("\nbad(2)", tracer)
+        errors = [event for event in tracer.events if event[0] == 'error']
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Division by zero", errors[0][4]['message'])
+        self.assertEqual(errors[0][4]['line'], 2)
+
+    def test_sampling_and_ring_buffer(self):
+        """
+        Test if unsampled statements record nothing and the ring buffer keeps the newest events.
+        """
+        tracer = tracing.RecordingTracer(capacity=8, sample_rate=0.0)
+        tracing.install(self.interpreter, tracer)
+        self.run_code("fact(5)\nfact(6)", tracer)
+        self.assertEqual(len(tracer.events), 0)
+        tracer.sample_rate = 1.0
+        self.run_code("fact(10)\n1", tracer)
+        self.assertEqual(len(tracer.events), 8)
+        self.assertEqual(tracer.events.dropped, 5)
+        self.assertEqual(list(tracer.events)[-1][1], 'Number')
+
+    def test_chrome_trace(self):
+        """
+        Test if the exported trace is valid Chrome trace-event JSON.
+        """
+        tracer = tracing.RecordingTracer(trace_nodes=True)
+        tracing.install(self.interpreter, tracer)
+        self.run_code("fact(2)", tracer)
+        file = io.StringIO()
+        tracer.write_chrome_trace(file)
+        trace = json.loads(file.getvalue())
+        self.assertEqual({event['ph'] for event in trace['traceEvents']}, {'X'})
+        self.assertIn('fact', {event['name'] for event in trace['traceEvents']})
+        self.assertIn('BinaryOp', {event['name'] for event in trace['traceEvents']})
+
+
+if __name__ == '__main__':
+    unittest.main()
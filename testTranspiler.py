@@ -0,0 +1,204 @@
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from errors import InterpreterError, innermost_error
+from interpreter import Interpreter
+from lexer import Lexer
+from main import main
+from parser import Parser
+from transpiler import transpile, transpile_file, source_error
+
+
+PROGRAM = """Defun {'name': 'factorial', 'arguments': (n)} (n == 0) or (n * factorial(n - 1))
+factorial(5)
+Defun {'name': 'gcd', 'arguments': (a, b)}
+    (b == 0 and a) or gcd(b, a % b)
+gcd(48, 18)
+Defun {'name': 'compose', 'arguments': (f, g)} Lambda (x) f(g(x))
+Defun {'name': 'apply', 'arguments': (f, v)} f(v)
+apply(compose(Lambda (x) x * 2, Lambda (x) x + 1), 5)
+0 or 3 and 'yes'
+(Lambda (x, y) x / y)(7, 2)
+reduce(Lambda (a, b) a + b, map(Lambda (x) x * x, range(0, 5)), 0)
+len('ab' + 'cd') + len([1, 2, [3]])
+Defun {'name': 'scale', 'arguments': (x)} x * 2
+scale(10)
+Defun {'name': 'scale', 'arguments': (x)} x * 3
+scale(10)
+"""
+
+
+def interpret(code):
+    """
+    Evaluate code statement by statement, as the reference for the translated module.
+    """
+    interpreter = Interpreter()
+    interpreter.set_code(code)
+    parser = Parser(Lexer().tokenize(code))
+    parser.source = interpreter.source
+    return [interpreter.evaluate(node) for node in parser.parse()]
+
+
+class TestTranspiler(unittest.TestCase):
+    """
+    Unit tests for the ahead-of-time translation of programs into Python modules.
+    """
+    def setUp(self):
+        """
+        Create a directory for the programs and their modules.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.modules = []
+
+    def tearDown(self):
+        for name in self.modules:
+            sys.modules.pop(name, None)
+
+    def load(self, code):
+        """
+        Translate code into a module in the directory and import it.
+        """
+        name = f"translated_{len(self.modules)}"
+        filename = os.path.join(self.directory, name + '.lambda')
+        with open(filename, 'w') as file:
+            file.write(code)
+        path = transpile_file(filename)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        self.modules.append(name)
+        spec.loader.exec_module(module)
+        return module
+
+    def outcome(self, call, module=None):
+        """
+        The result of a call, or the message and position of the error it raises.
+        """
+        try:
+            return call()
+        except Exception as e:
+            error = source_error(e, module) if module is not None else innermost_error(e)
+            return error.message, error.line, error.column
+
+    def test_results_match_interpreter(self):
+        """
+        Test if running the module yields the results of evaluating the program.
+        """
+        module = self.load(PROGRAM)
+        results = [str(result) for result in module.run()]
+        self.assertEqual(results, [str(result) for result in interpret(PROGRAM)])
+        self.assertEqual(results[-4:], ["Function 'scale' defined", '20', "Function 'scale' defined", '30'])
+
+    def test_functions_callable_from_python(self):
+        """
+        Test if every Defun is a Python function of the module, with names that clash with Python renamed.
+        """
+        module = self.load(PROGRAM + "Defun {'name': 'run', 'arguments': (lambda, None)} lambda - None\n"
+                                     "Defun {'name': 'twice', 'arguments': (f, x)} f(f(x))")
+        self.assertEqual(module.factorial(10), 3628800)
+        self.assertEqual(module.gcd(12, 18), 6)
+        self.assertEqual(module.scale(5), 15)  # The last definition
+        self.assertEqual(module.run_(5, 2), 3)
+        self.assertEqual(module.twice(lambda x: x * 10, 2), 200)
+        self.assertEqual(len(list(module.run())), len(interpret(PROGRAM)) + 2)
+        self.assertEqual(module.scale(5), 15)
+
+    def test_operators_match_interpreter(self):
+        """
+        Test random expressions for the interpreter's precedence, short-circuits and zero checks.
+        """
+        rng = random.Random(7)
+        operators = ['+', '-', '*', '/', '%', '==', '!=', '<', '<=', '>', '>=', 'and', 'or']
+
+        def expression(depth):
+            if depth == 0 or rng.random() < 0.2:
+                return rng.choice(['0', '1', '2', '3', 'True', 'False', 'x', 'y'])
+            if rng.random() < 0.1:
+                return f"not {expression(depth - 1)}"
+            text = f"{expression(depth - 1)} {rng.choice(operators)} {expression(depth - 1)}"
+            return f"({text})" if rng.random() < 0.4 else text
+
+        expressions = [expression(4) for _ in range(200)]
+        code = '\n'.join(f"Defun {{'name': 'e{i}', 'arguments': (x, y)}} {text}" for i, text in enumerate(expressions))
+        module = self.load(code)
+        interpreter = Interpreter()
+        interpreter.set_code(code)
+        definitions = Parser(Lexer().tokenize(code)).parse()
+        for node in definitions:
+            interpreter.evaluate(node)
+        for node in definitions:
+            for args in ((0, 1), (2, 0), (3, True)):
+                expected = self.outcome(lambda: interpreter.global_env.lookup(node.name)(*args))
+                actual = self.outcome(lambda: getattr(module, node.name)(*args), module)
+                self.assertEqual((node.name, actual, type(actual)), (node.name, expected, type(expected)))
+
+    def test_errors_report_source_positions(self):
+        """
+        Test if errors are reported at the position of the node that failed in the .lambda file.
+        """
+        code = ("Defun {'name': 'half', 'arguments': (x)}\n"
+                "    x + (x / (x - 4))\n"
+                "Defun {'name': 'gcd', 'arguments': (a, b)} a\n"
+                "half(3)\n"
+                "(Lambda (f) f(4))(Lambda (y) half(y))\n")
+        module = self.load(code)
+        run = module.run()
+        self.assertEqual([next(run) for _ in range(3)], ["Function 'half' defined", "Function 'gcd' defined", 0])
+        with self.assertRaises(InterpreterError) as context:
+            next(run)
+        self.assertEqual((context.exception.message, context.exception.line, context.exception.column),
+                         ("Division by zero", 2, 11))
+        self.assertIn("Line 2:     x + (x / (x - 4))", context.exception.context)
+        self.assertEqual(self.outcome(lambda: module.half(4), module), self.outcome(lambda: interpret(code)))
+        self.assertEqual(self.outcome(lambda: module.half(None), module)[1:], (2, 16))
+
+        # A failed run leaves the last definition of a function redefined along the way
+        module = self.load("Defun {'name': 'scale', 'arguments': (x)} x * 2\nscale(1)\n1 / 0\n"
+                           "Defun {'name': 'scale', 'arguments': (x)} x * 3")
+        self.assertEqual(self.outcome(lambda: list(module.run()), module), ("Division by zero", 3, 2))
+        self.assertEqual(module.scale(1), 3)
+
+        module = self.load("1 + q\nsum(1)\nmin()")
+        self.assertEqual(self.outcome(lambda: list(module.run()), module), ("Name 'q' is not defined", 1, 4))
+        self.assertEqual(self.outcome(module._statements().__next__, module), ("Name 'q' is not defined", 1, 4))
+        for line in (2, 3):
+            code = "1 + q\nsum(1)\nmin()".split('\n')[line - 1]
+            self.assertEqual(self.outcome(lambda: list(self.load(code).run())), self.outcome(lambda: interpret(code)))
+
+    def test_translation_errors(self):
+        """
+        Test if definitions the interpreter would reject are rejected when translating.
+        """
+        code = "Defun {'name': 'f', 'arguments': (x)} x + y"
+        with self.assertRaises(InterpreterError) as context:
+            transpile(code)
+        with self.assertRaises(InterpreterError) as expected:
+            interpret(code)
+        self.assertEqual(str(context.exception), str(innermost_error(expected.exception)))
+        with self.assertRaises(InterpreterError):
+            transpile("Defun {'name': 'f', 'arguments': (x, x)} x")
+        self.assertIn("def f(x):", transpile("Defun {'name': 'g', 'arguments': ()} 1\n"
+                                             "Defun {'name': 'f', 'arguments': (x)} x + g()"))
+
+    def test_command_line(self):
+        """
+        Test if the compile command writes a module that runs like the program.
+        """
+        filename = os.path.join(self.directory, 'program.lambda')
+        with open(filename, 'w') as file:
+            file.write(PROGRAM)
+        output = os.path.join(self.directory, 'compiled.py')
+        self.assertEqual(main(['compile', filename, '-o', output]), 0)
+        environment = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        completed = subprocess.run([sys.executable, output], capture_output=True, text=True, env=environment)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.splitlines(), [str(result) for result in interpret(PROGRAM)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from vectorize import evaluate_vectorized, np
+
+
+@unittest.skipUnless(np is not None, "NumPy is not installed")
+class TestVectorize(unittest.TestCase):
+    """
+    Unit tests for vectorized evaluation over NumPy arrays.
+    """
+    def setUp(self):
+        self.interpreter = Interpreter()
+
+    def parse(self, code):
+        """
+        Helper method to parse code and return its first AST node.
+        """
+        return Parser(Lexer().tokenize(code)).parse()[0]
+
+    def test_matches_scalar_evaluation(self):
+        """
+        Test if vectorized results match calling the function row by row.
+        """
+        function = self.parse("Lambda (x, y) (y == 0) or (x / y + x % 3 * 2 > 4 and x - y)")
+        x = np.arange(-5, 15)
+        y = np.array([0, 1, 2, 3, -2] * 4)
+        result = evaluate_vectorized(function, [x, y])
+        scalar = self.interpreter.evaluate(function)
+        expected = [scalar(int(a), int(b)) for a, b in zip(x, y)]
+        self.assertEqual([int(value) for value in result], [int(value) for value in expected])
+
+    def test_division_by_zero_reports_row(self):
+        """
+        Test if division by zero is reported for the first row that actually divides by zero.
+        """
+        function = self.parse("Lambda (x, y) (x > 2) and x / y")
+        with self.assertRaises(InterpreterError) as context:
+            evaluate_vectorized(function, {'x': np.array([1, 2, 3, 4]), 'y': np.array([0, 0, 1, 0])})
+        self.assertIn("Division by zero (row 3)", str(context.exception))
+
+    def test_recursive_function_falls_back_to_scalar(self):
+        """
+        Test if a recursive function is evaluated row by row through the interpreter.
+        """
+        function = self.parse("Defun {'name': 'fact', 'arguments': (n)} (n == 0) or (n * fact(n - 1))")
+        result = evaluate_vectorized(function, [np.arange(1, 6)], self.interpreter)
+        self.assertEqual(result.tolist(), [1, 2, 6, 24, 120])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from errors import InterpreterError
+from natives import NativeFunction
+from session import Prelude
+from workspace import Workspace
+
+
+DEFINITIONS = """
+Defun {'name': 'square', 'arguments': (x)} x * x
+Defun {'name': 'sum_squares', 'arguments': (a, b)} square(a) + square(b)
+Defun {'name': 'inc', 'arguments': (x)} x + 1
+"""
+
+
+class TestWorkspace(unittest.TestCase):
+    """
+    Unit tests for incremental re-evaluation in workspaces.
+    """
+    def setUp(self):
+        """
+        Create a workspace with a few definitions and cached results, counting function calls.
+        """
+        self.workspace = Workspace()
+        self.workspace.run(DEFINITIONS)
+        self.calls = []
+        interpreter = self.workspace.interpreter
+        evaluate_call = interpreter.eval_function_call
+
+        def counting_call(node, env):
+            self.calls.append(node.name)
+            return evaluate_call(node, env)
+
+        interpreter.eval_function_call = counting_call
+        self.update = self.workspace.run("sum_squares(3, 4)\ninc(1)\nsquare(5)\nabs(0 - 2)")
+
+    def test_results_cached(self):
+        """
+        Test if running a cached expression again returns its result without evaluating it.
+        """
+        self.assertEqual(self.update.results, [25, 2, 25, 2])
+        self.calls.clear()
+        update = self.workspace.run("inc(1)\nsquare(5)")
+        self.assertEqual(update.results, [2, 25])
+        self.assertEqual(self.calls, [])
+        self.assertEqual((len(update.recomputed), len(update.reused)), (0, 4))
+
+    def test_redefinition_recomputes_dependents_only(self):
+        """
+        Test if redefining a function recomputes only the definitions and results that refer to it.
+        """
+        self.calls.clear()
+        update = self.workspace.run("Defun {'name': 'square', 'arguments': (x)} x * x * x")
+        self.assertEqual(update.defined, ['square'])
+        self.assertEqual(update.redefined, ['sum_squares'])
+        self.assertEqual([cell.text for cell in update.recomputed], ['sum_squares(3, 4)', 'square(5)'])
+        self.assertEqual([cell.text for cell in update.reused], ['inc(1)', 'abs(0 - 2)'])
+        self.assertNotIn('inc', self.calls)
+        self.assertEqual([result for _, result in self.workspace.results()], [91, 2, 125, 2])
+        self.assertIn("Recomputed 2 results, reused 2", update.format_report())
+
+    def test_transitive_dependents(self):
+        """
+        Test if results are recomputed through chains of functions, and follow changed call graphs.
+        """
+        self.workspace.run("Defun {'name': 'inc', 'arguments': (x)} sum_squares(x, 0) + 1")
+        self.assertEqual([result for _, result in self.workspace.results()], [25, 2, 25, 2])
+        update = self.workspace.run("Defun {'name': 'square', 'arguments': (x)} x + x")
+        self.assertEqual(update.redefined, ['sum_squares', 'inc'])
+        self.assertEqual(len(update.recomputed), 3)
+        self.assertEqual([result for _, result in self.workspace.results()], [14, 3, 10, 2])
+
+    def test_unchanged_definition(self):
+        """
+        Test if defining a function again with the same body, in another layout, changes nothing.
+        """
+        self.calls.clear()
+        update = self.workspace.run("Defun {'name': 'square', 'arguments': (x)}\n    x * x")
+        self.assertEqual((update.defined, update.unchanged), ([], ['square']))
+        self.assertEqual(update.recomputed, [])
+        self.assertEqual(self.calls, [])
+
+    def test_errors(self):
+        """
+        Test if a redefinition that breaks a result records the error, and a fix recovers it.
+        """
+        update = self.workspace.run("Defun {'name': 'square', 'arguments': (x)} x / 0")
+        self.assertEqual(len(update.recomputed), 2)
+        self.assertIsInstance(self.workspace.results()[0][1], InterpreterError)
+        self.assertIn("error: Division by zero", update.format_report())
+        with self.assertRaises(InterpreterError):
+            self.workspace.run("square(5)")
+        self.workspace.run("Defun {'name': 'square', 'arguments': (x)} x * x")
+        self.assertEqual([result for _, result in self.workspace.results()], [25, 2, 25, 2])
+        with self.assertRaises(InterpreterError):
+            self.workspace.run("undefined(1)")
+        self.assertEqual(len(self.workspace.cells), 4)
+
+    def test_impure_results_not_cached(self):
+        """
+        Test if expressions referring to impure natives are evaluated every time.
+        """
+        counter = iter(range(100))
+        tick = NativeFunction('tick', lambda: next(counter), 0, pure=False)
+        self.workspace.interpreter.global_env.define('tick', tick)
+        self.assertEqual(self.workspace.run("tick() + 1").results, [1])
+        self.assertEqual(self.workspace.run("tick() + 1").results, [2])
+        self.assertEqual(len(self.workspace.cells), 4)
+
+    def test_shadowing_the_prelude(self):
+        """
+        Test if defining a function that shadows a prelude function recomputes the results using it.
+        """
+        workspace = Workspace(prelude=Prelude("Defun {'name': 'double', 'arguments': (x)} x * 2"))
+        self.assertEqual(workspace.run("double(4)\nabs(0 - 1)").results, [8, 1])
+        update = workspace.run("Defun {'name': 'double', 'arguments': (x)} x + x + 1")
+        self.assertEqual([cell.text for cell in update.recomputed], ['double(4)'])
+        self.assertEqual(workspace.results()[0][1], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,301 @@
+import json
+import os
+import random
+import threading
+import time
+
+
+class Tracer:
+    """
+    The interface through which interpreter activity is reported.
+
+    Subclasses override the events they are interested in; every event does nothing by
+    default. A tracer is attached to an interpreter with install(), which replaces the
+    interpreter's evaluate and eval_function_call methods with traced versions on that
+    instance only. An interpreter without a tracer therefore runs the original methods with
+    no extra branch at all.
+
+    Attributes:
+        trace_nodes (bool): Whether to report the evaluation of every AST node, which is much
+                            more expensive than reporting function calls alone.
+        sampled (bool): Whether the current top-level statement is being traced. Events of
+                        statements that are not sampled are never reported.
+    """
+
+    trace_nodes = False
+
+    def __init__(self):
+        """
+        Initializes the Tracer, tracing every statement.
+        """
+        self.sampled = True
+
+    def statement_start(self, node):
+        """
+        Called before a top-level statement is evaluated.
+
+        Parameters:
+            node (ASTNode): The statement.
+        """
+
+    def statement_end(self, node, error=None):
+        """
+        Called after a top-level statement has been evaluated.
+
+        Parameters:
+            node (ASTNode): The statement.
+            error (Exception, optional): The error the statement raised, if any.
+        """
+
+    def function_enter(self, name, node):
+        """
+        Called before a function call (including the evaluation of its arguments).
+
+        Parameters:
+            name (str): The name of the called function ('lambda' for an anonymous function).
+            node (FunctionCall): The call.
+        """
+
+    def function_exit(self, name, node, error=None):
+        """
+        Called after a function call has returned or raised.
+
+        Parameters:
+            name (str): The name of the called function.
+            node (FunctionCall): The call.
+            error (Exception, optional): The error the call raised, if any.
+        """
+
+    def node_start(self, node):
+        """
+        Called before any AST node is evaluated, if trace_nodes is set.
+
+        Parameters:
+            node (ASTNode): The node.
+        """
+
+    def node_end(self, node, error=None):
+        """
+        Called after any AST node has been evaluated, if trace_nodes is set.
+
+        Parameters:
+            node (ASTNode): The node.
+            error (Exception, optional): The error the node raised, if any.
+        """
+
+
+class RingBuffer:
+    """
+    A fixed-size buffer that keeps the most recent events, overwriting the oldest.
+
+    Attributes:
+        capacity (int): The maximum number of events kept.
+        dropped (int): The number of events that have been overwritten.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initializes an empty RingBuffer, allocating all of its slots up front.
+
+        Parameters:
+            capacity (int): The maximum number of events kept.
+        """
+        self.capacity = capacity
+        self.dropped = 0
+        self._slots = [None] * capacity
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, event):
+        """
+        Adds an event, overwriting the oldest one if the buffer is full.
+
+        Parameters:
+            event: The event.
+        """
+        self._slots[self._next] = event
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self.dropped += 1
+
+    def __iter__(self):
+        """
+        Iterates over the events from oldest to newest.
+        """
+        start = (self._next - self._count) % self.capacity
+        for i in range(self._count):
+            yield self._slots[(start + i) % self.capacity]
+
+
+class RecordingTracer(Tracer):
+    """
+    A tracer that records timed spans of statements, function calls and (optionally) nodes
+    into a ring buffer, for export as a Chrome trace.
+
+    Sampling is decided per top-level statement (head-based): a statement is either traced
+    with all of the calls it makes or not at all, so recorded call trees are always complete.
+
+    Events are (category, name, start, duration, args) tuples, with times in nanoseconds
+    from time.perf_counter_ns; errors are recorded as events with no duration.
+
+    Attributes:
+        events (RingBuffer): The recorded events.
+        sample_rate (float): The fraction of top-level statements that are traced.
+    """
+
+    def __init__(self, capacity=65536, sample_rate=1.0, trace_nodes=False, seed=None):
+        """
+        Initializes the RecordingTracer.
+
+        Parameters:
+            capacity (int, optional): The number of events kept in the ring buffer.
+            sample_rate (float, optional): The fraction of top-level statements that are traced.
+            trace_nodes (bool, optional): Whether to record a span for every evaluated node.
+            seed (int, optional): The seed of the random sampling decisions, for reproducible traces.
+        """
+        super().__init__()
+        self.events = RingBuffer(capacity)
+        self.sample_rate = sample_rate
+        self.trace_nodes = trace_nodes
+        self._random = random.Random(seed)
+        self._starts = []
+        self._unwinding = False
+
+    def _begin(self):
+        self._unwinding = False
+        self._starts.append(time.perf_counter_ns())
+
+    def _end(self, category, name, node, error):
+        start = self._starts.pop()
+        now = time.perf_counter_ns()
+        self.events.append((category, name, start, now - start, {'line': node.line, 'column': node.column}))
+        # An error ends every enclosing span too, but is only reported where it was raised
+        if error is not None and not self._unwinding:
+            self.events.append(('error', type(error).__name__, now, None,
+                                {'line': node.line, 'column': node.column, 'message': str(error)}))
+        self._unwinding = error is not None
+
+    def statement_start(self, node):
+        self.sampled = self._random.random() < self.sample_rate
+        if self.sampled:
+            self._begin()
+
+    def statement_end(self, node, error=None):
+        if self.sampled:
+            self._end('statement', type(node).__name__, node, error)
+        self.sampled = True
+
+    def function_enter(self, name, node):
+        self._begin()
+
+    def function_exit(self, name, node, error=None):
+        self._end('function', name, node, error)
+
+    def node_start(self, node):
+        self._begin()
+
+    def node_end(self, node, error=None):
+        self._end('node', type(node).__name__, node, error)
+
+    def write_chrome_trace(self, file):
+        """
+        Writes the recorded events as Chrome trace-event JSON, which can be loaded in
+        chrome://tracing or Perfetto.
+
+        Parameters:
+            file (TextIO): The file to write to.
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        trace_events = []
+        for category, name, start, duration, args in self.events:
+            event = {'name': name, 'cat': category, 'ts': start / 1000, 'pid': pid, 'tid': tid, 'args': args}
+            if duration is None:
+                event.update(ph='i', s='t')
+            else:
+                event.update(ph='X', dur=duration / 1000)
+            trace_events.append(event)
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                   'otherData': {'dropped_events': self.events.dropped}}, file)
+
+
+def install(interpreter, tracer):
+    """
+    Attaches a tracer to an interpreter by overriding its evaluate and eval_function_call
+    methods on the instance. The class methods are untouched, so other interpreters keep
+    running without any tracing overhead.
+
+    Parameters:
+        interpreter (Interpreter): The interpreter to trace.
+        tracer (Tracer): The tracer to report events to.
+    """
+    uninstall(interpreter)
+    eval_function_call = interpreter.eval_function_call
+    evaluate = interpreter.evaluate
+
+    def traced_function_call(node, env):
+        if not tracer.sampled:
+            return eval_function_call(node, env)
+        name = node.name if isinstance(node.name, str) else 'lambda'
+        tracer.function_enter(name, node)
+        try:
+            result = eval_function_call(node, env)
+        except Exception as e:
+            tracer.function_exit(name, node, e)
+            raise
+        tracer.function_exit(name, node)
+        return result
+
+    def traced_evaluate(node, env=None):
+        if not tracer.sampled:
+            return evaluate(node, env)
+        tracer.node_start(node)
+        try:
+            result = evaluate(node, env)
+        except Exception as e:
+            tracer.node_end(node, e)
+            raise
+        tracer.node_end(node)
+        return result
+
+    interpreter.eval_function_call = traced_function_call
+    if tracer.trace_nodes:
+        interpreter.evaluate = traced_evaluate
+
+
+def evaluate_statement(interpreter, tracer, node):
+    """
+    Evaluates a top-level statement, reporting its start and end to a tracer.
+
+    Parameters:
+        interpreter (Interpreter): The traced interpreter.
+        tracer (Tracer): The tracer installed on the interpreter.
+        node (ASTNode): The statement.
+
+    Returns:
+        The result of the statement.
+    """
+    tracer.statement_start(node)
+    try:
+        result = interpreter.evaluate(node)
+    except Exception as e:
+        tracer.statement_end(node, e)
+        raise
+    tracer.statement_end(node)
+    return result
+
+
+def uninstall(interpreter):
+    """
+    Detaches the tracer from an interpreter, if any, restoring its original methods.
+
+    Parameters:
+        interpreter (Interpreter): The traced interpreter.
+    """
+    for name in ('evaluate', 'eval_function_call'):
+        interpreter.__dict__.pop(name, None)
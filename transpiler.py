@@ -0,0 +1,690 @@
+import builtins
+import keyword
+import linecache
+import os
+import sys
+from itertools import islice
+
+from errors import InterpreterError
+from interpreter import Interpreter
+from lexer import Lexer
+from natives import REGISTRY
+from parser import Parser, Number, Bool, String, Identifier, BinaryOp, FunctionDef, FunctionCall, UnaryOp, Lambda, \
+    ListLiteral, walk
+from pvector import PersistentVector
+from rope import Rope
+from source import SourceBuffer
+
+
+# The names a generated module defines for itself, including the helpers it imports from this module
+MODULE_NAMES = {'SOURCE', 'LINES', 'run', '_statements', '_Rope', '_vector', '_divide', '_modulo', '_unary',
+                '_native', '_run', '_main'}
+
+# Precedence levels of the generated Python expressions, from loosest to tightest
+LAMBDA_LEVEL, OR_LEVEL, AND_LEVEL, NOT_LEVEL, COMPARISON_LEVEL, ADDITIVE_LEVEL, MULTIPLICATIVE_LEVEL, ATOM_LEVEL = \
+    range(8)
+OPERATOR_LEVELS = {
+    'or': OR_LEVEL, 'and': AND_LEVEL,
+    '==': COMPARISON_LEVEL, '!=': COMPARISON_LEVEL, '<': COMPARISON_LEVEL,
+    '<=': COMPARISON_LEVEL, '>': COMPARISON_LEVEL, '>=': COMPARISON_LEVEL,
+    '+': ADDITIVE_LEVEL, '-': ADDITIVE_LEVEL,
+    '*': MULTIPLICATIVE_LEVEL, '/': MULTIPLICATIVE_LEVEL, '%': MULTIPLICATIVE_LEVEL,
+}
+# Division and modulo go through a helper that checks for zero, unless the divisor is a nonzero literal
+CHECKED_OPERATORS = {'/': ('_divide', '//'), '%': ('_modulo', '%')}
+
+
+class Transpiler:
+    """
+    Translates a .lambda program ahead of time into the source of a Python module.
+
+    Each Defun becomes a Python function of the same name, and Lambdas become Python
+    lambdas, so that calls no longer go through the interpreter: no AST is walked and no
+    environment is created. Operators keep the interpreter's semantics: division and modulo
+    check for a zero divisor and divide integers, 'and'/'or' return the value that decided
+    them, comparisons do not chain, and strings and lists are Ropes and PersistentVectors.
+    The module's run() evaluates the top-level statements in order and yields their results,
+    as Interpreter.evaluate would, and the module can be imported and its functions called
+    from Python.
+
+    Every function is defined as soon as the module is imported, with its last definition
+    in the program. A function defined more than once, or shadowing a native function, is
+    rebound by run() when a top-level expression evaluated before its last definition could
+    see another one. Calling a function with the wrong number of arguments is an error,
+    where the interpreter ignores extra arguments and leaves missing parameters unbound.
+
+    Names are kept, except that names that are Python keywords, that end with '_', or that
+    the module needs for itself get an extra '_' (a Defun named 'run' becomes 'run_'), and
+    so do undefined names that Python would find among its builtins.
+
+    The module embeds the .lambda position of the code of every node that can fail, by line
+    and column of the Python code (LINES), so that errors are reported by run(), or by
+    source_error, at the position the interpreter would report.
+
+    Attributes:
+        source_name (str): The path of the .lambda file, as recorded in the module.
+    """
+
+    def __init__(self, source_name='<string>'):
+        """
+        Initializes a Transpiler.
+
+        Parameters:
+            source_name (str, optional): The path of the .lambda file, relative to the
+                                         directory of the generated module.
+        """
+        self.source_name = source_name
+        self._names = {}
+        self._reserved = set()
+        self._global_names = set()
+        self._lines = []
+        self._positions = {}
+        self._parts = []
+        self._width = 0
+        self._spans = []
+        self._locals = frozenset()
+
+    def transpile(self, statements, source=None):
+        """
+        Translates the statements of a program into the source of a Python module.
+
+        Parameters:
+            statements (list): The top-level statements (ASTNodes), in order.
+            source (SourceBuffer, optional): The source of the program, for the context of errors.
+
+        Returns:
+            str: The Python source of the module.
+
+        Raises:
+            InterpreterError: If a Defun refers to an undefined variable, as Interpreter.evaluate
+                              would report it, or the program cannot be translated (see check).
+        """
+        definitions = {}
+        for index, node in enumerate(statements):
+            if isinstance(node, FunctionDef):
+                definitions.setdefault(node.name, []).append(index)
+        expressions = [index for index, node in enumerate(statements) if not isinstance(node, FunctionDef)]
+
+        # Names whose earlier definitions can be seen by a top-level expression need rebinding
+        rebound = [name for name, indices in definitions.items()
+                   if len(indices) + (name in REGISTRY) > 1 and expressions and expressions[0] < indices[-1]]
+        self._reserved = set(MODULE_NAMES)
+        for name in rebound:
+            count = len(definitions[name]) + (name in REGISTRY)
+            self._reserved.update(version_name(name, k) for k in range(count))
+        self._global_names = set(definitions) | set(REGISTRY)
+        referenced = set()
+        for statement in statements:
+            for node in walk(statement):
+                if isinstance(node, (Identifier, FunctionCall)) and isinstance(node.name, str):
+                    referenced.add(node.name)
+        natives = [name for name in REGISTRY if name in rebound or (name in referenced and name not in definitions)]
+
+        self.check(statements, source)
+        self._names, self._positions = {}, {}
+        self._lines = [
+            '"""',
+            f"Python translation of {os.path.basename(self.source_name)}, generated by transpiler.py.",
+            "",
+            "Do not edit: change the .lambda file and translate it again instead. Each Defun is a",
+            "function of this module, and run() evaluates the top-level statements in order.",
+            '"""',
+            "from transpiler import Rope as _Rope, vector as _vector, divide as _divide, modulo as _modulo",
+            "from transpiler import unary_operator as _unary, native as _native, run_statements as _run, main as _main",
+            "",
+            "SOURCE = " + repr(self.source_name),
+        ]
+        if natives:
+            self.line("")
+            self.line("# Native functions")
+            for name in natives:
+                self.line(f"{self.python_name(name)} = _native({name!r})")
+                if name in rebound:
+                    self.line(f"{version_name(name, 0)} = {self.python_name(name)}")
+        versions = {name: int(name in REGISTRY) for name in rebound}
+        for node in statements:
+            if isinstance(node, FunctionDef):
+                self.function(node)
+                if node.name in versions:
+                    self.line(f"{version_name(node.name, versions[node.name])} = {self.python_name(node.name)}")
+                    versions[node.name] += 1
+
+        self.statements_function(statements, rebound)
+        self.blank_lines()
+        self.line("def run():")
+        self.line('    """')
+        self.line("    Evaluates the top-level statements of the program in order, yielding the result of each.")
+        self.line("")
+        self.line("    Raises:")
+        self.line("        InterpreterError: If a statement fails, at its position in the .lambda file.")
+        self.line('    """')
+        self.line("    return _run(_statements(), __name__)")
+
+        self.blank_lines()
+        self.line("# The code of the nodes that can fail, by line of this module: the columns of each")
+        self.line("# node's code (in bytes, as Python reports them), and its line and column in the program")
+        self.line("LINES = {")
+        for number, spans in self._positions.items():
+            self.line(f"    {number}: {tuple(spans)!r},")
+        self.line("}")
+        self.line("")
+        self.line("if __name__ == '__main__':")
+        self.line("    _main(run())")
+        return '\n'.join(self._lines) + '\n'
+
+    def statements_function(self, statements, rebound):
+        """
+        Appends _statements(), the generator behind run() that evaluates the top-level
+        statements in order and yields their results.
+
+        Parameters:
+            statements (list): The top-level statements, in order.
+            rebound (list): The names run() rebinds to each of their definitions in turn.
+        """
+        self.blank_lines()
+        self.line("def _statements():")
+        indent = "    "
+        if rebound:
+            rebound_names = [self.python_name(name) for name in rebound]
+            self.line(f"    global {', '.join(rebound_names)}")
+            for name, python_name in zip(rebound, rebound_names):
+                self.line(f"    {python_name} = {version_name(name, 0)}")
+            self.line("    try:")
+            indent = "        "
+        versions = {name: int(name in REGISTRY) for name in rebound}
+        for node in statements:
+            if isinstance(node, FunctionDef):
+                if node.name in versions:
+                    if versions[node.name]:  # The first version is bound before the first statement
+                        self.line(f"{indent}{self.python_name(node.name)} = "
+                                  f"{version_name(node.name, versions[node.name])}")
+                    versions[node.name] += 1
+                message = f"Function '{node.name}' defined"
+                self.line(f"{indent}yield {message!r}")
+            else:
+                self.statement(f"{indent}yield ", node)
+        if not statements:
+            self.line(f"{indent}yield from ()")
+        if rebound:
+            self.line("    finally:")
+            for name in rebound:
+                self.line(f"        {self.python_name(name)} = {version_name(name, versions[name] - 1)}")
+
+    def check(self, statements, source):
+        """
+        Checks the Defuns of a program for undefined variables, as Interpreter.evaluate does
+        when it defines them, and rejects what has no Python translation: parameter lists
+        that repeat a name and calls of anything but a name or a Lambda.
+
+        Parameters:
+            statements (list): The top-level statements, in order.
+            source (SourceBuffer): The source of the program, for the context of errors.
+
+        Raises:
+            InterpreterError: If a Defun refers to a name that is neither one of its parameters
+                              nor defined before it, or the program cannot be translated.
+        """
+        checker = Interpreter()
+        checker.set_source(source)
+        for statement in statements:
+            for node in walk(statement):
+                if isinstance(node, (FunctionDef, Lambda)) and len(set(node.params)) != len(node.params):
+                    name = next(param for i, param in enumerate(node.params) if param in node.params[:i])
+                    raise InterpreterError(f"Parameter '{name}' is repeated", node.line, node.column,
+                                           checker.get_context(node))
+                if isinstance(node, FunctionCall) and not isinstance(node.name, (str, Lambda)):
+                    raise InterpreterError("Only named functions and lambdas can be called", node.line,
+                                           node.column, checker.get_context(node))
+            if isinstance(statement, FunctionDef):
+                try:
+                    checker.check_undefined_variables(statement.body, set(statement.params), checker.global_env)
+                except NameError as e:
+                    raise InterpreterError(str(e), statement.line, statement.column, checker.get_context(statement))
+                checker.global_env.define(statement.name, statement)
+
+    def python_name(self, name):
+        """
+        Returns the Python name of a name of the program.
+
+        Parameters:
+            name (str): The name in the program.
+
+        Returns:
+            str: The name, with an extra '_' if it would clash with Python or the module.
+        """
+        python_name = self._names.get(name)
+        if python_name is None:
+            python_name = name
+            if keyword.iskeyword(name) or name.endswith('_') or name in self._reserved \
+                    or (hasattr(builtins, name) and name not in self._global_names):
+                python_name = name + '_'
+            self._names[name] = python_name
+        return python_name
+
+    def line(self, text):
+        """
+        Appends a line of code to the module.
+
+        Parameters:
+            text (str): The line, without its line break.
+        """
+        self._lines.append(text)
+
+    def blank_lines(self):
+        # Two blank lines before a top-level definition
+        self._lines.extend(["", ""])
+
+    def function(self, node):
+        """
+        Appends the Python function of a Defun.
+
+        Parameters:
+            node (FunctionDef): The definition.
+        """
+        self.blank_lines()
+        self.line(f"# Line {node.line}")
+        params = ', '.join(self.python_name(param) for param in node.params)
+        self.line(f"def {self.python_name(node.name)}({params}):")
+        self._locals = frozenset(node.params)
+        self.statement("    return ", node.body)
+        self._locals = frozenset()
+
+    def statement(self, prefix, node):
+        """
+        Appends a line made of a prefix and an expression, recording the positions of the
+        expression's nodes.
+
+        Parameters:
+            prefix (str): The code before the expression, such as 'return '.
+            node (ASTNode): The expression.
+        """
+        self._parts = [prefix]
+        self._width = len(prefix.encode('utf-8'))
+        self._spans = []
+        self.expression(node, root=True)
+        self._spans.sort(key=lambda span: (span[0], -span[1]))
+        self._positions[len(self._lines) + 1] = self._spans
+        self.line(''.join(self._parts))
+
+    def write(self, text):
+        # Appends code to the current line, counting its width in bytes, as Python reports columns
+        self._parts.append(text)
+        self._width += len(text.encode('utf-8'))
+
+    def level(self, node):
+        """
+        Returns the precedence level of the Python code of an expression.
+
+        Parameters:
+            node (ASTNode): The expression.
+
+        Returns:
+            int: One of the *_LEVEL constants.
+        """
+        if isinstance(node, BinaryOp):
+            if node.op in CHECKED_OPERATORS and not is_nonzero_number(node.right):
+                return ATOM_LEVEL
+            return OPERATOR_LEVELS.get(node.op, ATOM_LEVEL)
+        if isinstance(node, UnaryOp):
+            return NOT_LEVEL if node.op == 'not' else ATOM_LEVEL
+        if isinstance(node, Lambda):
+            return LAMBDA_LEVEL
+        return ATOM_LEVEL
+
+    def operand(self, node, minimum):
+        """
+        Writes an expression, in parentheses if its level is below a minimum.
+
+        Parameters:
+            node (ASTNode): The expression.
+            minimum (int): The lowest level that needs no parentheses.
+        """
+        if self.level(node) < minimum:
+            self.write('(')
+            self.expression(node)
+            self.write(')')
+        else:
+            self.expression(node)
+
+    def expression(self, node, root=False):
+        """
+        Writes the Python code of an expression, recording the position of its code if
+        evaluating it can fail.
+
+        Parameters:
+            node (ASTNode): The expression.
+            root (bool, optional): Whether it is the whole expression of a line, whose position
+                                   is recorded regardless, for errors that no node accounts for.
+        """
+        start = self._width
+        fallible = True
+        if isinstance(node, (Number, Bool)):
+            self.write(repr(node.value))
+            fallible = False
+        elif isinstance(node, String):
+            self.write(f"_Rope({node.value!r})")
+            fallible = False
+        elif isinstance(node, Identifier):
+            self.write(self.python_name(node.name))
+            fallible = node.name not in self._locals  # Parameters are always bound
+        elif isinstance(node, ListLiteral):
+            self.write('_vector((')
+            for i, element in enumerate(node.elements):
+                if i:
+                    self.write(', ')
+                self.expression(element)
+            self.write(',))' if len(node.elements) == 1 else '))')
+            fallible = False
+        elif isinstance(node, Lambda):
+            params = ', '.join(self.python_name(param) for param in node.params)
+            self.write(f"lambda {params}: " if params else "lambda: ")
+            outer = self._locals
+            self._locals = outer | set(node.params)
+            self.expression(node.body)
+            self._locals = outer
+            fallible = False
+        elif isinstance(node, UnaryOp):
+            if node.op == 'not':
+                self.write('not ')
+                self.operand(node.operand, NOT_LEVEL)
+                fallible = False
+            else:
+                # Evaluates the operand before failing, as the interpreter does
+                self.write(f"_unary({node.op!r}, ")
+                self.expression(node.operand)
+                self.write(')')
+        elif isinstance(node, BinaryOp):
+            self.binary(node)
+            fallible = node.op not in ('and', 'or')
+        elif isinstance(node, FunctionCall):
+            if isinstance(node.name, Lambda):
+                self.operand(node.name, ATOM_LEVEL)
+            else:
+                self.write(self.python_name(node.name))
+            self.write('(')
+            for i, arg in enumerate(node.args):
+                if i:
+                    self.write(', ')
+                self.expression(arg)
+            self.write(')')
+        else:
+            raise TypeError(f"Unknown node type: {type(node)}")
+        if fallible or root:
+            self._spans.append((start, self._width, node.line, node.column))
+
+    def binary(self, node):
+        """
+        Writes the Python code of a binary operation.
+
+        Parameters:
+            node (BinaryOp): The operation.
+        """
+        level = self.level(node)
+        if level == ATOM_LEVEL:
+            helper, _ = CHECKED_OPERATORS[node.op]
+            self.write(f"{helper}(")
+            self.expression(node.left)
+            self.write(', ')
+            self.expression(node.right)
+            self.write(')')
+            return
+        # The language's operators are all left-associative, and its comparisons do not chain
+        self.operand(node.left, level + 1 if level == COMPARISON_LEVEL else level)
+        self.write(f" {CHECKED_OPERATORS.get(node.op, (None, node.op))[1]} ")
+        self.operand(node.right, level + 1)
+
+
+def version_name(name, version):
+    """
+    Returns the name under which a generated module keeps one of the definitions of a name
+    that run() rebinds.
+
+    Parameters:
+        name (str): The name in the program.
+        version (int): The position of the definition among those of the name, counting a
+                       native function first.
+
+    Returns:
+        str: The Python name of the definition.
+    """
+    return f"_{name}_{version}"
+
+
+def is_nonzero_number(node):
+    # Whether a divisor is a literal that cannot be zero
+    return isinstance(node, Number) and node.value != 0
+
+
+def transpile(code, source_name='<string>'):
+    """
+    Translates the code of a program into the source of a Python module.
+
+    Parameters:
+        code (str): The source code of the program.
+        source_name (str, optional): The path of the .lambda file, as recorded in the module.
+
+    Returns:
+        str: The Python source of the module.
+
+    Raises:
+        InterpreterError: If the code cannot be lexed or parsed, or a Defun refers to an
+                          undefined variable.
+    """
+    source = SourceBuffer(code)
+    parser = Parser(Lexer().tokenize(code))
+    parser.source = source
+    return Transpiler(source_name).transpile(parser.parse(), source)
+
+
+def transpile_file(filename, output=None):
+    """
+    Translates a .lambda file into a Python module next to it, or at the given path.
+
+    Parameters:
+        filename (str): The path to the .lambda file.
+        output (str, optional): The path of the module. Defaults to the .lambda path with a
+                                .py extension.
+
+    Returns:
+        str: The path of the module.
+
+    Raises:
+        ValueError: If the file does not have a .lambda extension.
+        InterpreterError: If the program cannot be lexed or parsed, or a Defun refers to an
+                          undefined variable.
+    """
+    if not filename.endswith('.lambda'):
+        raise ValueError("File must have a .lambda extension")
+    if output is None:
+        output = filename[:-len('.lambda')] + '.py'
+    with open(filename, 'r') as file:
+        code = file.read()
+    source_name = os.path.relpath(os.path.abspath(filename), os.path.dirname(os.path.abspath(output)))
+    module = transpile(code, source_name.replace(os.sep, '/'))
+    with open(output, 'w') as file:
+        file.write(module)
+    return output
+
+
+# Runtime support of the generated modules
+
+def divide(left, right):
+    """
+    Integer division, as in Interpreter.eval_binary_op.
+
+    Raises:
+        ZeroDivisionError: If the divisor is zero.
+    """
+    if right == 0:
+        raise ZeroDivisionError("Division by zero")
+    return left // right
+
+
+def modulo(left, right):
+    """
+    The remainder of integer division, as in Interpreter.eval_binary_op.
+
+    Raises:
+        ZeroDivisionError: If the divisor is zero.
+    """
+    if right == 0:
+        raise ZeroDivisionError("Modulo by zero")
+    return left % right
+
+
+def unary_operator(op, operand):
+    """
+    A prefix '+' or '-', which the interpreter parses but cannot evaluate.
+
+    Raises:
+        InterpreterError: Always.
+    """
+    raise InterpreterError(f"Unknown unary operator: {op}")
+
+
+def vector(elements):
+    """
+    The value of a list literal.
+    """
+    return PersistentVector.from_iterable(elements)
+
+
+def native(name):
+    """
+    The native function of a name, as defined in every interpreter's global environment.
+    """
+    return REGISTRY[name]
+
+
+def run_statements(statements, module_name):
+    """
+    Runs the top-level statements of a generated module, reporting errors at their position
+    in the .lambda file.
+
+    Parameters:
+        statements (generator): The module's _statements(), which yields each result.
+        module_name (str): The name of the module.
+
+    Yields:
+        The result of each statement.
+
+    Raises:
+        InterpreterError: If a statement fails (see source_error).
+    """
+    module = sys.modules[module_name]
+    while True:
+        try:
+            result = next(statements)
+        except StopIteration:
+            return
+        except Exception as e:
+            raise source_error(e, module) from e
+        yield result
+
+
+def source_error(error, module):
+    """
+    Converts an exception raised by the code of a generated module into the InterpreterError
+    the interpreter would raise, at the .lambda position of the innermost node that failed.
+
+    Parameters:
+        error (Exception): The exception, with its traceback.
+        module (module): The generated module.
+
+    Returns:
+        InterpreterError: The error, with the line and column of the node in the program and
+                          the context of its line, if the .lambda file can be read.
+    """
+    namespace = vars(module)
+    innermost = None
+    traceback = error.__traceback__
+    while traceback is not None:
+        if traceback.tb_frame.f_globals is namespace:
+            innermost = traceback
+        traceback = traceback.tb_next
+
+    if isinstance(error, InterpreterError):
+        message = error.message
+    elif isinstance(error, NameError) and getattr(error, 'name', None):
+        # Names that clash with Python get an extra '_'; no other name ends with one
+        name = error.name[:-1] if error.name.endswith('_') else error.name
+        message = f"Name '{name}' is not defined"
+    else:
+        message = str(error)
+    if innermost is None and isinstance(error, InterpreterError):
+        return error  # Raised by run(), or by the transpiler: it is already at its position
+    position = node_position(innermost, module.LINES) if innermost is not None else None
+    if position is None:
+        return InterpreterError(message)
+    line, column = position
+    text = source_line(module, line)
+    if text is not None:
+        context = f"Line {line}: {text}\n" + " " * (column + 6) + "^"
+    else:
+        context = f"Line {line}: <line not available>"
+    return InterpreterError(message, line, column, context)
+
+
+def node_position(traceback, lines):
+    """
+    Finds the .lambda position of the code a frame of a generated module was executing.
+
+    Parameters:
+        traceback (traceback): The traceback entry of the frame.
+        lines (dict): The module's LINES.
+
+    Returns:
+        tuple: The line and column of the innermost node whose code holds the failed
+               instruction (of the whole line's expression if Python does not report the
+               instruction's columns), or None if the line is not mapped.
+    """
+    spans = lines.get(traceback.tb_lineno)
+    if not spans:
+        return None
+    best = max(spans, key=lambda span: span[1] - span[0])
+    positions = getattr(traceback.tb_frame.f_code, 'co_positions', None)
+    if positions is not None and traceback.tb_lasti >= 0:
+        position = next(islice(positions(), traceback.tb_lasti // 2, None), None)
+        if position is not None and position[0] == traceback.tb_lineno and position[2] is not None:
+            _, end_line, start, end = position
+            if end_line != traceback.tb_lineno:
+                end = best[1]
+            for span in spans:
+                if span[0] <= start and end <= span[1] and span[1] - span[0] < best[1] - best[0]:
+                    best = span
+    return best[2], best[3]
+
+
+def source_line(module, line):
+    """
+    Reads a line of the .lambda file of a generated module, for the context of errors.
+
+    Parameters:
+        module (module): The generated module.
+        line (int): The 1-based line number.
+
+    Returns:
+        str: The text of the line, or None if the file cannot be read.
+    """
+    path = module.SOURCE
+    if not os.path.isabs(path) and getattr(module, '__file__', None):
+        path = os.path.join(os.path.dirname(module.__file__), path)
+    text = linecache.getline(path, line)
+    return text.rstrip('\r\n') if text else None
+
+
+def main(results):
+    """
+    Prints the results of a generated module's run(), as `main.py run` does, when the module
+    is run as a script.
+
+    Parameters:
+        results (iterable): The results of run().
+    """
+    try:
+        for result in results:
+            if result is not None:
+                print(result)
+    except InterpreterError as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,205 @@
+from errors import InterpreterError
+from interpreter import Interpreter
+from parser import Number, Bool, Identifier, BinaryOp, UnaryOp, FunctionDef, walk
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for vectorized evaluation
+    np = None
+
+
+ARITHMETIC_UFUNCS = {
+    '+': 'add',
+    '-': 'subtract',
+    '*': 'multiply',
+    '/': 'floor_divide',  # Integer division, as in Interpreter.eval_binary_op
+    '%': 'remainder',  # Takes the sign of the divisor, like Python's %
+}
+COMPARISON_UFUNCS = {
+    '==': 'equal',
+    '!=': 'not_equal',
+    '<': 'less',
+    '<=': 'less_equal',
+    '>': 'greater',
+    '>=': 'greater_equal',
+}
+VECTORIZABLE_NODES = (Number, Bool, Identifier, BinaryOp, UnaryOp)
+
+
+def evaluate_vectorized(function, arrays, interpreter=None):
+    """
+    Evaluates the body of a function over whole arrays of arguments at once.
+
+    Each row of the input arrays is one call of the function. Arithmetic, comparison and
+    boolean operators in the body are mapped to NumPy ufuncs, so the body is evaluated once
+    per operator instead of once per row. 'and'/'or' keep their short-circuit, value-returning
+    semantics row by row, and a division or modulo by zero is reported for the first row where
+    it is actually evaluated.
+
+    Bodies that call functions (including recursive ones) or create lambdas cannot be
+    vectorized; for those the function is called once per row through the interpreter.
+
+    Values are computed as int64/bool arrays, so unlike the interpreter they can overflow,
+    and a result column mixing booleans and integers comes back as integers.
+
+    Parameters:
+        function (Lambda | FunctionDef): The function to evaluate.
+        arrays (dict | sequence): The argument arrays, by parameter name or in parameter order.
+        interpreter (Interpreter, optional): The interpreter used for scalar fallback; it must
+                                             define any functions the body calls.
+
+    Returns:
+        numpy.ndarray: The result of the function for each row.
+
+    Raises:
+        InterpreterError: If evaluation fails; the message names the offending row.
+        ImportError: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError("Vectorized evaluation requires NumPy")
+    if not isinstance(arrays, dict):
+        arrays = dict(zip(function.params, arrays))
+    missing = [param for param in function.params if param not in arrays]
+    if missing:
+        raise InterpreterError(f"Missing argument arrays for: {', '.join(missing)}", function.line, function.column)
+    env = {param: np.asarray(arrays[param]) for param in function.params}
+    shape = np.broadcast(*env.values()).shape if env else ()
+    rows = shape[0] if shape else 1
+
+    if not is_vectorizable(function):
+        return evaluate_rows(function, env, rows, interpreter or Interpreter())
+
+    result = evaluate_node(function.body, env, None)
+    return np.broadcast_to(result, (rows,)).copy()
+
+
+def is_vectorizable(function):
+    """
+    Checks whether a function body only uses operations that can be evaluated on arrays.
+
+    Parameters:
+        function (Lambda | FunctionDef): The function to check.
+
+    Returns:
+        bool: True if the body has no calls, lambdas or unknown names.
+    """
+    for node in walk(function.body):
+        if not isinstance(node, VECTORIZABLE_NODES):
+            return False
+        if isinstance(node, Identifier) and node.name not in function.params:
+            return False
+        if isinstance(node, UnaryOp) and node.op != 'not':
+            return False
+        if isinstance(node, BinaryOp) and node.op not in ARITHMETIC_UFUNCS and node.op not in COMPARISON_UFUNCS \
+                and node.op not in ('and', 'or'):
+            return False
+    return True
+
+
+def evaluate_node(node, env, mask):
+    """
+    Evaluates an AST node over arrays.
+
+    Parameters:
+        node (ASTNode): The node to evaluate.
+        env (dict): The argument arrays, by parameter name.
+        mask (numpy.ndarray): The rows in which the node is actually evaluated (None for all rows).
+
+    Returns:
+        The result array, or a scalar if the node does not depend on any argument.
+    """
+    if isinstance(node, (Number, Bool)):
+        return node.value
+    elif isinstance(node, Identifier):
+        return env[node.name]
+    elif isinstance(node, UnaryOp):
+        return np.logical_not(truth(evaluate_node(node.operand, env, mask)))
+
+    left = evaluate_node(node.left, env, mask)
+    if node.op in ('and', 'or'):
+        left_true = truth(left)
+        # Only the rows where the left operand does not decide the result evaluate the right one
+        needed = np.logical_not(left_true) if node.op == 'or' else left_true
+        right = evaluate_node(node.right, env, needed if mask is None else mask & needed)
+        return np.where(needed, right, left)
+
+    right = evaluate_node(node.right, env, mask)
+    if node.op in COMPARISON_UFUNCS:
+        return getattr(np, COMPARISON_UFUNCS[node.op])(left, right)
+
+    left, right = as_int(left), as_int(right)
+    if node.op in ('/', '%'):
+        zero = np.equal(right, 0)
+        if mask is not None:
+            zero = zero & mask
+        if np.any(zero):
+            row = int(np.flatnonzero(np.atleast_1d(zero))[0])
+            message = "Division by zero" if node.op == '/' else "Modulo by zero"
+            raise InterpreterError(f"{message} (row {row})", node.line, node.column)
+        right = np.where(np.equal(right, 0), 1, right)  # Rows that are masked out or short-circuited
+    return getattr(np, ARITHMETIC_UFUNCS[node.op])(left, right)
+
+
+def truth(value):
+    """
+    Returns the Python truthiness of each element.
+
+    Parameters:
+        value: An array or scalar.
+
+    Returns:
+        The boolean array (or scalar) of truth values.
+    """
+    return np.not_equal(value, 0)
+
+
+def as_int(value):
+    """
+    Converts boolean arrays and scalars to integers, as Python arithmetic on booleans does.
+
+    Parameters:
+        value: An array or scalar.
+
+    Returns:
+        The value, with booleans converted to int64.
+    """
+    if isinstance(value, np.ndarray) and value.dtype == np.bool_:
+        return value.astype(np.int64)
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    return value
+
+
+def evaluate_rows(function, env, rows, interpreter):
+    """
+    Evaluates a function one row at a time through the interpreter.
+
+    Parameters:
+        function (Lambda | FunctionDef): The function to evaluate.
+        env (dict): The argument arrays, by parameter name.
+        rows (int): The number of rows.
+        interpreter (Interpreter): The interpreter used to call the function.
+
+    Returns:
+        numpy.ndarray: The result of the function for each row.
+
+    Raises:
+        InterpreterError: If a call fails; the message names the offending row.
+    """
+    if isinstance(function, FunctionDef):
+        try:
+            func = interpreter.global_env.lookup(function.name)
+        except NameError:
+            interpreter.evaluate(function)
+            func = interpreter.global_env.lookup(function.name)
+    else:
+        func = interpreter.eval_lambda(function, interpreter.global_env)
+
+    columns = [np.broadcast_to(env[param], (rows,)).tolist() for param in function.params]
+    results = []
+    for row, args in enumerate(zip(*columns) if columns else [()] * rows):
+        try:
+            results.append(func(*args))
+        except InterpreterError as e:
+            raise InterpreterError(f"{e.message} (row {row})", e.line, e.column, e.context)
+    return np.array(results)
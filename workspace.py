@@ -0,0 +1,309 @@
+from errors import InterpreterError, innermost_error
+from interpreter import Interpreter
+from lexer import Lexer
+from natives import NativeFunction
+from parser import Parser, Identifier, FunctionDef, FunctionCall, walk, structure
+from source import SourceBuffer
+
+
+class Cell:
+    """
+    A top-level expression of a workspace, with its cached result.
+
+    Attributes:
+        node (ASTNode): The expression.
+        source (SourceBuffer): The code the expression was read from, for error reporting.
+        names (frozenset): The names the expression refers to, directly or through the
+                           functions it calls.
+        result: The result of the last evaluation, if it succeeded.
+        error (InterpreterError): The error of the last evaluation, if it failed.
+    """
+
+    __slots__ = ('node', 'source', 'names', 'result', 'error')
+
+    def __init__(self, node, source):
+        """
+        Initializes a Cell that has not been evaluated yet.
+
+        Parameters:
+            node (ASTNode): The expression.
+            source (SourceBuffer): The code the expression was read from.
+        """
+        self.node = node
+        self.source = source
+        self.names = frozenset()
+        self.result = None
+        self.error = None
+
+    @property
+    def text(self):
+        """
+        The first line of the expression's code.
+        """
+        line = self.source.line_text(self.node.line)
+        return line.strip() if line is not None else f"<line {self.node.line}>"
+
+
+class Update:
+    """
+    The outcome of running code in a workspace.
+
+    Attributes:
+        results (list): The result of each top-level statement of the code.
+        defined (list): The functions that were defined or whose definition changed.
+        unchanged (list): The functions that were defined again without any change.
+        redefined (list): The functions whose definitions were evaluated again because a
+                          function they refer to changed.
+        recomputed (list): The cells evaluated again because a function they refer to changed.
+        reused (list): The cells cached before the code ran that were not evaluated again,
+                       whether or not the code ran them.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty Update.
+        """
+        self.results = []
+        self.defined = []
+        self.unchanged = []
+        self.redefined = []
+        self.recomputed = []
+        self.reused = []
+
+    def format_report(self):
+        """
+        Formats what the update recomputed and what it reused.
+
+        Returns:
+            str: The report, one line per kind of work.
+        """
+        lines = []
+        if self.defined:
+            lines.append(f"Defined: {', '.join(self.defined)}")
+        if self.unchanged:
+            lines.append(f"Unchanged: {', '.join(self.unchanged)}")
+        if self.redefined:
+            lines.append(f"Redefined dependents: {', '.join(self.redefined)}")
+        lines.append(f"Recomputed {len(self.recomputed)} results, reused {len(self.reused)}")
+        for cell in self.recomputed:
+            outcome = f"error: {innermost_error(cell.error).message}" if cell.error is not None else cell.result
+            lines.append(f"  {cell.text} => {outcome}")
+        return '\n'.join(lines)
+
+
+class Workspace:
+    """
+    A long-lived set of definitions and top-level expressions kept up to date incrementally.
+
+    The result of every top-level expression is cached together with the names it refers to,
+    directly or through the functions it calls. When a Defun changes a function, only the
+    definitions and cached results that (transitively) refer to it are evaluated again;
+    everything else is reused. Running an expression that is already cached returns its
+    result without evaluating it, and defining a function again with the same body changes
+    nothing. Expressions referring to impure native functions are never cached.
+
+    Attributes:
+        interpreter (Interpreter): The interpreter holding the definitions.
+        cells (dict): The cached expressions, by structure, in the order they were first run.
+    """
+
+    def __init__(self, memo_store=None, prelude=None):
+        """
+        Initializes an empty Workspace.
+
+        Parameters:
+            memo_store (MemoStore, optional): A persistent store through which function calls are memoized.
+            prelude (Prelude, optional): Shared definitions layered under the workspace's own.
+        """
+        self.interpreter = Interpreter(memo_store, prelude)
+        self.cells = {}
+        self._lexer = Lexer()
+        self._definitions = {}
+        self._function_names = {}
+
+    def run(self, code):
+        """
+        Runs code in the workspace, updating the definitions and cached results it affects.
+
+        Parameters:
+            code (str): The code to run.
+
+        Returns:
+            Update: The results of the code's statements, and what was recomputed and reused.
+
+        Raises:
+            InterpreterError: If a statement of the code fails. The statements before it
+                              have taken effect.
+        """
+        source = SourceBuffer(code)
+        parser = Parser(self._lexer.tokenize(code))
+        parser.source = source
+        update = Update()
+        cached = list(self.cells.values())
+        for node in parser.parse():
+            self.interpreter.set_source(source)
+            if isinstance(node, FunctionDef):
+                update.results.append(self.define(node, update))
+            else:
+                update.results.append(self.evaluate(node))
+        recomputed = set(update.recomputed)
+        update.reused = [cell for cell in cached if cell not in recomputed]
+        return update
+
+    def results(self):
+        """
+        Returns the cached result of every expression, in the order they were first run.
+
+        Returns:
+            list: Each cell's expression node and its result (or InterpreterError).
+        """
+        return [(cell.node, cell.error if cell.error is not None else cell.result) for cell in self.cells.values()]
+
+    def define(self, node, update):
+        """
+        Defines a function, then evaluates again the definitions and cached results that
+        refer to it, unless its definition did not change.
+
+        Parameters:
+            node (FunctionDef): The definition.
+            update (Update): The update to record the work in.
+
+        Returns:
+            str: The message of the definition.
+        """
+        previous = self._definitions.get(node.name)
+        if previous is not None and structure(previous) == structure(node):
+            update.unchanged.append(node.name)
+            return f"Function '{node.name}' defined"
+        affected = self.dependents(node.name)
+        message = self.interpreter.evaluate(node)
+        self._definitions[node.name] = node
+        self._function_names.clear()
+        update.defined.append(node.name)
+
+        # Functions look names up when called, so dependents already call the new definition;
+        # evaluating them again re-checks them and refreshes their memoization
+        for name in affected:
+            self.interpreter.evaluate(self._definitions[name])
+            update.redefined.append(name)
+        for cell in self.cells.values():
+            if node.name in cell.names:
+                self.compute(cell)
+                if cell not in update.recomputed:
+                    update.recomputed.append(cell)
+        return message
+
+    def evaluate(self, node):
+        """
+        Evaluates a top-level expression, or returns its cached result.
+
+        Parameters:
+            node (ASTNode): The expression, read from the interpreter's current source.
+
+        Returns:
+            The result of the expression.
+
+        Raises:
+            InterpreterError: If the expression fails.
+        """
+        key = structure(node)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = Cell(node, self.interpreter.source)
+            self.compute(cell)
+            if cell.error is None and self.is_pure(cell.names):
+                self.cells[key] = cell
+        if cell.error is not None:
+            raise cell.error
+        return cell.result
+
+    def compute(self, cell):
+        """
+        Evaluates a cell, recording its result or error and the names it refers to.
+
+        Parameters:
+            cell (Cell): The cell.
+        """
+        cell.names = self.names(cell.node)
+        previous = self.interpreter.source
+        self.interpreter.set_source(cell.source)
+        try:
+            cell.result, cell.error = self.interpreter.evaluate(cell.node), None
+        except InterpreterError as e:
+            cell.result, cell.error = None, e
+        finally:
+            self.interpreter.set_source(previous)
+
+    def dependents(self, name):
+        """
+        Returns the functions defined in the workspace that refer to a function, directly or
+        through other functions.
+
+        Parameters:
+            name (str): The name of the function.
+
+        Returns:
+            list: The names of the dependent functions, in the order they were first defined.
+        """
+        return [other for other in self._definitions if other != name and name in self.function_names(other)]
+
+    def names(self, node):
+        """
+        Collects the names an AST refers to, directly or through the functions it calls.
+
+        Parameters:
+            node (ASTNode): The AST.
+
+        Returns:
+            frozenset: The names.
+        """
+        names = set()
+        for child in walk(node):
+            if isinstance(child, (Identifier, FunctionCall)) and isinstance(child.name, str):
+                names.add(child.name)
+        for name in list(names):
+            if name in self.interpreter.definitions:
+                names.update(self.function_names(name))
+        return frozenset(names)
+
+    def function_names(self, name):
+        """
+        Collects the names a function refers to, directly or through the functions it calls,
+        computed once per set of definitions.
+
+        Parameters:
+            name (str): The name of the function.
+
+        Returns:
+            frozenset: The names, including the function's own.
+        """
+        names = self._function_names.get(name)
+        if names is None:
+            found = set()
+            for definition in self.interpreter.function_dependencies(name):
+                found.add(definition.name)
+                for child in walk(definition.body):
+                    if isinstance(child, (Identifier, FunctionCall)) and isinstance(child.name, str):
+                        found.add(child.name)
+            names = self._function_names[name] = frozenset(found)
+        return names
+
+    def is_pure(self, names):
+        """
+        Checks whether none of the names refers to an impure native function, so that a
+        result depending on them can be cached.
+
+        Parameters:
+            names (iterable): The names.
+
+        Returns:
+            bool: True if no impure native function is referred to.
+        """
+        for name in names:
+            try:
+                value = self.interpreter.global_env.lookup(name)
+            except NameError:
+                continue
+            if isinstance(value, NativeFunction) and not value.pure:
+                return False
+        return True